@@ -0,0 +1,172 @@
+"""
+Recall and latency of Qdrant collection profiles and Matryoshka dimensions.
+
+Usage:
+    uv run python -m benchmarks.quantization_benchmark [--points 20000] [--queries 200]
+        [--k 10] [--dims 1536,512,256] [--profiles default,scalar,binary] [--synthetic]
+
+Vectors are sampled from QDRANT_COLLECTION_NAME (or generated with --synthetic) and
+the last --queries of them are held out as queries. Ground truth is exact cosine
+search over the full-size vectors, so recall also covers the loss from truncation.
+Every (profile, dimension) pair is loaded into a temporary collection on QDRANT_URL;
+quantization needs a Qdrant server, the in-process local mode ignores it.
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+from qdrant_client.models import Batch, CollectionStatus
+
+from src.config import get_settings
+from src.core.collection_migration import truncate
+from src.core.vector_store import (
+    COLLECTION_PROFILES,
+    DENSE_VECTOR_NAME,
+    CollectionProfile,
+    create_collection,
+    get_collection_layout,
+    get_qdrant_client,
+    get_search_params,
+)
+
+settings = get_settings()
+
+UPSERT_BATCH = 512
+
+
+def load_vectors(count: int, synthetic: bool) -> np.ndarray:
+    if synthetic:
+        rng = np.random.default_rng(0)
+        # Clustered like real embeddings rather than uniform on the sphere
+        centers = rng.normal(size=(64, settings.EMBEDDING_DIMENSION))
+        vectors = centers[rng.integers(0, 64, count)] + 0.6 * rng.normal(
+            size=(count, settings.EMBEDDING_DIMENSION)
+        )
+        return vectors.astype(np.float32)
+
+    client = get_qdrant_client()
+    dense = get_collection_layout().dense
+    rows: list[list[float]] = []
+    offset = None
+    while len(rows) < count:
+        points, offset = client.scroll(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            limit=min(1000, count - len(rows)),
+            offset=offset,
+            with_payload=False,
+            with_vectors=[dense] if dense else True,
+        )
+        rows.extend(p.vector[dense] if isinstance(p.vector, dict) else p.vector for p in points)
+        if offset is None:
+            break
+    return np.asarray(rows, dtype=np.float32)
+
+
+def ram_mb(points: int, dimension: int, profile: CollectionProfile) -> float:
+    """Approximate RAM for vector storage, excluding the HNSW graph."""
+    if profile.quantization == "binary":
+        per_vector = dimension / 8
+    elif profile.quantization == "scalar":
+        per_vector = dimension
+    else:
+        per_vector = dimension * 4
+    if not profile.on_disk and profile.quantization:
+        per_vector += dimension * 4
+    return points * per_vector / 1024**2
+
+
+def wait_until_indexed(name: str, timeout: float = 600) -> None:
+    client = get_qdrant_client()
+    deadline = time.time() + timeout
+    while client.get_collection(name).status != CollectionStatus.GREEN:
+        if time.time() > deadline:
+            raise TimeoutError(f"{name} was not indexed within {timeout}s")
+        time.sleep(0.5)
+
+
+def run(
+    name: str,
+    profile: CollectionProfile,
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    k: int,
+) -> tuple[float, float, float]:
+    client = get_qdrant_client()
+    create_collection(name, corpus.shape[1], profile)
+    try:
+        for start in range(0, len(corpus), UPSERT_BATCH):
+            end = min(start + UPSERT_BATCH, len(corpus))
+            client.upsert(
+                collection_name=name,
+                points=Batch(
+                    ids=list(range(start, end)), vectors={DENSE_VECTOR_NAME: corpus[start:end]}
+                ),
+            )
+        wait_until_indexed(name)
+
+        params = get_search_params(profile)
+        recalls, timings = [], []
+        for query, expected in zip(queries, truth):
+            started = time.perf_counter()
+            points = client.query_points(
+                collection_name=name,
+                query=query.tolist(),
+                using=DENSE_VECTOR_NAME,
+                limit=k,
+                search_params=params,
+            ).points
+            timings.append((time.perf_counter() - started) * 1000)
+            recalls.append(len({p.id for p in points} & set(expected.tolist())) / k)
+    finally:
+        client.delete_collection(name)
+
+    timings.sort()
+    return statistics.mean(recalls), statistics.median(timings), timings[int(len(timings) * 0.95)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dims", default=str(settings.EMBEDDING_DIMENSION))
+    parser.add_argument("--profiles", default=",".join(COLLECTION_PROFILES))
+    parser.add_argument("--synthetic", action="store_true", help="Random clustered vectors")
+    args = parser.parse_args()
+
+    vectors = load_vectors(args.points + args.queries, args.synthetic)
+    if len(vectors) <= args.queries:
+        raise SystemExit(
+            f"Only {len(vectors)} vectors available; use --synthetic or fewer --queries"
+        )
+    corpus_full, queries_full = vectors[: -args.queries], vectors[-args.queries :]
+
+    unit = corpus_full / np.linalg.norm(corpus_full, axis=1, keepdims=True)
+    similarity = queries_full @ unit.T
+    truth = np.argsort(-similarity, axis=1)[:, : args.k]
+
+    print(
+        f"{len(corpus_full)} points, {len(queries_full)} queries, recall@{args.k} "
+        f"vs exact {vectors.shape[1]}-d search\n"
+    )
+    print(f"{'profile':<9} {'dims':>5} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8} {'RAM MB':>8}")
+
+    for dimension in (int(d) for d in args.dims.split(",")):
+        corpus = np.asarray([truncate(v.tolist(), dimension) for v in corpus_full], np.float32)
+        queries = np.asarray([truncate(v.tolist(), dimension) for v in queries_full], np.float32)
+        for profile_name in args.profiles.split(","):
+            profile = COLLECTION_PROFILES[profile_name]
+            recall, p50, p95 = run(
+                f"bench_{profile_name}_{dimension}", profile, corpus, queries, truth, args.k
+            )
+            print(
+                f"{profile_name:<9} {dimension:>5} {recall:>7.3f} {p50:>8.2f} {p95:>8.2f} "
+                f"{ram_mb(len(corpus), dimension, profile):>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+End-to-end retrieval latency, runnable without any external service.
+
+Usage:
+    QDRANT_URL=:memory: uv run python -m benchmarks.retrieval_benchmark [--chunks 10000]
+        [--queries 200] [--k 10] [--concurrency 1,16,50] [--dimension 1536]
+        [--modes flat,two_level] [--top-documents 20]
+
+Synthetic chunks (random text, sparse BM25 vectors, and vectors clustered by topic and
+by document, --chunks-per-document each) are loaded into a throwaway collection on
+whatever QDRANT_URL selects, so with ":memory:" or a directory path it runs on a bare CI
+box; point it at a server to compare. Query embeddings are seeded into the query
+embedding cache, so no embedding API is called, and the search result cache is disabled.
+
+Each query runs the same dense and hybrid search calls as retrieve_node, --concurrency
+at a time on one event loop. two_level first picks the --top-documents documents by
+centroid and searches only their chunks; its recall is the share of the flat top-k it
+returns. Compare corpus sizes with e.g. --chunks 10000 and --chunks 100000 --dimension 256.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+import numpy as np
+from qdrant_client.models import Batch, Filter
+
+from src.config import get_settings
+from src.core.caching.query_cache import get_query_embedding_cache
+from src.core.document_processing.incremental import document_id_for
+from src.core.retrieval.document_index import (
+    document_collection_name,
+    ensure_document_index,
+    scope_to_top_documents,
+)
+from src.core.retrieval.search import SearchHit, hybrid_search, similarity_search
+from src.core.retrieval.sparse import sparse_document_vector
+from src.core.retrieval.tokenizer import simple_lemmas
+from src.core.vector_store import (
+    close_async_qdrant_client,
+    ensure_collection_exists,
+    get_async_qdrant_client,
+    get_collection_layout,
+    get_qdrant_client,
+)
+
+settings = get_settings()
+
+COLLECTION_NAME = "bench_retrieval"
+UPSERT_BATCH = 512
+TOPICS = 64
+VOCABULARY = [f"term{i}" for i in range(5000)]
+
+Search = Callable[[str], Awaitable[list[SearchHit]]]
+
+
+def make_corpus(count: int, per_document: int, dimension: int) -> tuple[list[str], np.ndarray]:
+    rng = np.random.default_rng(0)
+    words = random.Random(0)
+    documents = (count + per_document - 1) // per_document
+    topics = rng.normal(size=(TOPICS, dimension))
+    centers = topics[rng.integers(0, TOPICS, documents)] + 0.5 * rng.normal(
+        size=(documents, dimension)
+    )
+    vectors = centers[np.arange(count) // per_document] + 0.6 * rng.normal(size=(count, dimension))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    texts = [" ".join(words.choices(VOCABULARY, k=150)) for _ in range(count)]
+    return texts, vectors.astype(np.float32)
+
+
+async def load(texts: list[str], vectors: np.ndarray, per_document: int) -> float:
+    client = get_async_qdrant_client()
+    layout = get_collection_layout()
+    started = time.perf_counter()
+    for start in range(0, len(texts), UPSERT_BATCH):
+        end = min(start + UPSERT_BATCH, len(texts))
+        lemmas = [simple_lemmas(text) for text in texts[start:end]]
+        await client.upsert(
+            collection_name=COLLECTION_NAME,
+            points=Batch(
+                ids=list(range(start, end)),
+                vectors={
+                    layout.dense: vectors[start:end],
+                    layout.sparse: [sparse_document_vector(terms) for terms in lemmas],
+                },
+                payloads=[
+                    {
+                        "page_content": text,
+                        "lemmas": terms,
+                        "document_id": document_id_for(f"doc-{i // per_document}.txt"),
+                        "filename": f"doc-{i // per_document}.txt",
+                        "file_extension": ".txt",
+                        "chunk_index": i % per_document,
+                    }
+                    for i, text, terms in zip(range(start, end), texts[start:end], lemmas)
+                ],
+            ),
+            wait=end == len(texts),
+        )
+    return time.perf_counter() - started
+
+
+def make_queries(texts: list[str], vectors: np.ndarray, count: int) -> list[str]:
+    """Queries near random chunks, with their embeddings seeded into the cache."""
+    rng = np.random.default_rng(1)
+    words = random.Random(1)
+    cache = get_query_embedding_cache()
+    queries = []
+    for i, target in enumerate(rng.integers(0, len(texts), count)):
+        query = f"{i} " + " ".join(words.sample(texts[target].split(), 6))
+        embedding = vectors[target] + 0.05 * rng.normal(size=vectors.shape[1])
+        cache.put(query, (embedding / np.linalg.norm(embedding)).tolist())  # type: ignore[union-attr]
+        queries.append(query)
+    return queries
+
+
+def two_level(search: Callable[[str, Filter | None], Awaitable[list[SearchHit]]]) -> Search:
+    async def scoped(query: str) -> list[SearchHit]:
+        return await search(query, await scope_to_top_documents(query, None))
+
+    return scoped
+
+
+async def run(
+    queries: list[str], search: Search, concurrency: int
+) -> tuple[float, float, float, dict[str, set[str]]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    timings: list[float] = []
+    results: dict[str, set[str]] = {}
+
+    async def one(query: str) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            hits = await search(query)
+            timings.append((time.perf_counter() - started) * 1000)
+            results[query] = {hit.point_id for hit in hits}
+
+    await search(queries[0])  # warm-up
+    started = time.perf_counter()
+    await asyncio.gather(*(one(query) for query in queries))
+    elapsed = time.perf_counter() - started
+
+    timings.sort()
+    p50, p95 = statistics.median(timings), timings[int(len(timings) * 0.95)]
+    return p50, p95, len(queries) / elapsed, results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=10_000)
+    parser.add_argument("--chunks-per-document", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--concurrency", default="1,16,50")
+    parser.add_argument("--dimension", type=int, default=settings.EMBEDDING_DIMENSION)
+    parser.add_argument("--modes", default="flat,two_level")
+    parser.add_argument("--top-documents", type=int, default=settings.DOCUMENT_TOP_N)
+    args = parser.parse_args()
+
+    settings.QDRANT_COLLECTION_NAME = COLLECTION_NAME
+    settings.EMBEDDING_DIMENSION = args.dimension
+    settings.DOCUMENT_TOP_N = args.top_documents
+    settings.SEARCH_CACHE_TTL_SECONDS = 0
+    settings.QUERY_EMBEDDING_CACHE_SIZE = args.queries + 1
+    settings.TOKENIZER_MODE = "simple"
+
+    client = get_qdrant_client()
+    for name in (COLLECTION_NAME, document_collection_name()):
+        if client.collection_exists(name):
+            client.delete_collection(name)
+    ensure_collection_exists()
+
+    try:
+        texts, vectors = make_corpus(args.chunks, args.chunks_per_document, args.dimension)
+        load_seconds = await load(texts, vectors, args.chunks_per_document)
+        started = time.perf_counter()
+        ensure_document_index()
+        index_seconds = time.perf_counter() - started
+        queries = make_queries(texts, vectors, args.queries)
+        print(
+            f"{settings.QDRANT_URL}: {args.chunks} chunks x {args.dimension} dims loaded in "
+            f"{load_seconds:.1f}s, document vectors built in {index_seconds:.1f}s; "
+            f"{args.queries} queries, k={args.k}\n"
+        )
+        print(
+            f"{'mode':<10} {'search':<7} {'conc':>5} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'QPS':>8} {'recall':>7}"
+        )
+
+        searches = {
+            "dense": lambda query, scope=None: similarity_search(query, args.k, scope),
+            "hybrid": lambda query, scope=None: hybrid_search(query, args.k, scope),
+        }
+        reference: dict[str, dict[str, set[str]]] = {}
+        for mode in args.modes.split(","):
+            for kind, search in searches.items():
+                for concurrency in (int(c) for c in args.concurrency.split(",")):
+                    p50, p95, qps, results = await run(
+                        queries, search if mode == "flat" else two_level(search), concurrency
+                    )
+                    if mode == "flat":
+                        reference.setdefault(kind, results)
+                    expected = reference.get(kind)
+                    recall = (
+                        statistics.mean(
+                            len(results[q] & expected[q]) / max(len(expected[q]), 1)
+                            for q in queries
+                        )
+                        if expected
+                        else float("nan")
+                    )
+                    print(
+                        f"{mode:<10} {kind:<7} {concurrency:>5} {p50:>8.2f} {p95:>8.2f} "
+                        f"{qps:>8.1f} {recall:>7.3f}"
+                    )
+    finally:
+        for name in (COLLECTION_NAME, document_collection_name()):
+            client.delete_collection(name)
+        await close_async_qdrant_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
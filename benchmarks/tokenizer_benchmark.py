@@ -0,0 +1,113 @@
+"""
+Compare BM25 tokenization modes on retrieval-sized workloads.
+
+Usage:
+    uv run python -m benchmarks.tokenizer_benchmark [--file corpus.txt] [--docs 10] [--rounds 20]
+
+Each round tokenizes --docs chunks, the number of fused documents per query.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from collections.abc import Callable
+
+import spacy
+
+from src.core.retrieval import tokenizer
+from src.core.retrieval.tokenizer import (
+    FAST_EXCLUDED_COMPONENTS,
+    lemmas_from_doc,
+    simple_lemmas,
+    tokenize_many,
+)
+
+CHUNK_CHARS = 1200
+
+_WORDS = (
+    "the researchers measured retrieval latency across several indexing strategies and "
+    "reported that batched embedding requests reduced ingestion time while running "
+    "queries against documents stored in vector databases improved answers"
+).split()
+
+
+def load_chunks(path: str | None, count: int) -> list[str]:
+    if path:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        chunks = [text[i : i + CHUNK_CHARS] for i in range(0, len(text), CHUNK_CHARS)]
+    else:
+        rng = random.Random(0)
+        chunks = [" ".join(rng.choices(_WORDS, k=CHUNK_CHARS // 7)) for _ in range(count * 20)]
+    return chunks
+
+
+def run(name: str, rounds: list[list[str]], fn: Callable[[list[str]], list[list[str]]]) -> None:
+    fn(rounds[0])  # warm-up
+    timings = []
+    for texts in rounds:
+        start = time.perf_counter()
+        fn(texts)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{name:<28} median {statistics.median(timings):8.2f} ms/round   "
+        f"p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:8.2f} ms"
+    )
+
+
+def agreement(left: list[list[str]], right: list[list[str]]) -> float:
+    scores = []
+    for a, b in zip(left, right):
+        union = set(a) | set(b)
+        scores.append(len(set(a) & set(b)) / len(union) if union else 1.0)
+    return statistics.mean(scores)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--file", help="Text file to draw chunks from (default: synthetic)")
+    parser.add_argument("--docs", type=int, default=10, help="Chunks tokenized per round")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    chunks = load_chunks(args.file, args.docs)
+    rounds = [
+        [chunks[(r * args.docs + i) % len(chunks)] for i in range(args.docs)]
+        for r in range(args.rounds)
+    ]
+    print(f"{args.rounds} rounds x {args.docs} chunks of ~{CHUNK_CHARS} chars\n")
+
+    run("simple (pure Python)", rounds, lambda texts: [simple_lemmas(t) for t in texts])
+
+    try:
+        full = spacy.load("en_core_web_sm")
+        fast = spacy.load("en_core_web_sm", exclude=FAST_EXCLUDED_COMPONENTS)
+    except OSError:
+        print("\nen_core_web_sm is not installed; skipping spaCy modes")
+        return
+
+    run("full, per text", rounds, lambda texts: [lemmas_from_doc(full(t)) for t in texts])
+    run("fast, per text", rounds, lambda texts: [lemmas_from_doc(fast(t)) for t in texts])
+    run(
+        "fast, nlp.pipe",
+        rounds,
+        lambda texts: [lemmas_from_doc(doc) for doc in fast.pipe(texts)],
+    )
+
+    tokenizer._nlp = fast
+    tokenize_many([text for texts in rounds for text in texts])  # fill the cache
+    run("fast, tokenize_many cached", rounds, tokenize_many)
+
+    sample = [text for texts in rounds for text in texts]
+    spacy_tokens = [lemmas_from_doc(doc) for doc in fast.pipe(sample)]
+    full_tokens = [lemmas_from_doc(doc) for doc in full.pipe(sample)]
+    print(f"\nfast vs full term agreement (Jaccard):   {agreement(spacy_tokens, full_tokens):.3f}")
+    print(
+        "simple vs fast term agreement (Jaccard): "
+        f"{agreement([simple_lemmas(t) for t in sample], spacy_tokens):.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
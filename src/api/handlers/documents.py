@@ -0,0 +1,20 @@
+from typing import Any
+
+from fastapi import HTTPException
+
+from src.core.ingestion.jobs import get_ingestion_queue
+from src.utils.logger import logger
+
+
+async def handle_delete_document(document_id: str) -> dict[str, Any]:
+    processor = get_ingestion_queue().processor
+    try:
+        chunks_deleted = await processor.delete_document(document_id)
+    except Exception as e:
+        logger.error(f"Failed to delete document {document_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Delete failed: {str(e)}")
+
+    if chunks_deleted == 0:
+        raise HTTPException(status_code=404, detail=f"Document {document_id} not found")
+
+    return {"document_id": document_id, "chunks_deleted": chunks_deleted}
@@ -0,0 +1,25 @@
+from typing import Any
+
+from fastapi import HTTPException
+
+from src.core.ingestion.jobs import get_ingestion_queue
+
+
+async def handle_get_job(job_id: str) -> dict[str, Any]:
+    job = get_ingestion_queue().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "filenames": [file["filename"] for file in job["files"]],
+        "progress": job["progress"],
+        "timings": job["timings"],
+        "results": [result for result in job["results"] if "error" not in result],
+        "failures": [result for result in job["results"] if "error" in result],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
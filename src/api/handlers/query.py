@@ -4,11 +4,61 @@ from typing import Any
 from fastapi import HTTPException
 
 from src.api.schemas import QueryRequest
+from src.config import get_settings
 from src.core.agent import get_agent
+from src.core.caching.answer_cache import AnswerCache, CachedAnswer, get_answer_cache
+from src.core.caching.corpus_version import get_corpus_version
+from src.core.caching.query_cache import aembed_query
 from src.core.evaluation.metrics import QueryEvaluation, get_evaluation_tracker
 from src.guardrails.guardrails_wrapper import get_guardrails
 from src.utils.logger import logger
 
+settings = get_settings()
+
+
+def cache_scope(request: QueryRequest) -> str:
+    """Request options besides the question that change the answer."""
+    filters = request.filters.model_dump_json(exclude_none=True) if request.filters else ""
+    return f"{request.fusion_method or ''}|{filters}"
+
+
+async def lookup_cached_answer(
+    cache: AnswerCache, request: QueryRequest, version: int
+) -> tuple[CachedAnswer | None, list[float] | None]:
+    """
+    Try the exact tier, then the semantic tier of the answer cache.
+
+    Args:
+        cache: Answer cache
+        request: Query request
+        version: Current corpus version
+
+    Returns:
+        Cached answer or None, and the question embedding if one was computed
+    """
+    scope = cache_scope(request)
+    cached = cache.get(request.question, scope, version)
+    if cached is not None:
+        logger.info("Answer cache hit (exact)")
+        return cached, None
+
+    if not settings.ANSWER_CACHE_SEMANTIC:
+        cache.record_miss()
+        return None, None
+
+    try:
+        embedding = await aembed_query(request.question)
+    except Exception as e:
+        logger.warning(f"Question embedding failed: {e}, skipping semantic cache lookup")
+        cache.record_miss()
+        return None, None
+
+    similar = cache.get_similar(embedding, scope, version)
+    if similar is None:
+        return None, embedding
+    logger.info(f"Answer cache hit (semantic, similarity {similar[1]:.3f})")
+    return similar[0], embedding
+
 
 async def handle_query(request: QueryRequest) -> dict[str, Any]:
     start_time = time.time()
@@ -16,26 +66,46 @@ async def handle_query(request: QueryRequest) -> dict[str, Any]:
     try:
         logger.info(f"Received query: {request.question}")
 
+        cache = get_answer_cache()
+        corpus_version = get_corpus_version()
+        question_embedding = None
+        if cache is not None:
+            cached, question_embedding = await lookup_cached_answer(cache, request, corpus_version)
+            if cached is not None:
+                return {
+                    "question": request.question,
+                    "answer": cached.answer,
+                    "sources_count": cached.sources_count,
+                }
+
         guardrails = get_guardrails()
 
         rag_result: dict[str, str | list[str] | int | bool] = {}
 
         async def run_rag_agent(question: str) -> str:
             agent = get_agent()
-            inputs: dict[str, str | bool | list[str] | int] = {
+            inputs: dict[str, str | bool | list[str] | int | None] = {
                 "question": question,
                 "generation": "",
                 "web_search": False,
                 "explicit_web_search": False,
+                "used_web_search": False,
                 "documents": [],
                 "retrieval_attempts": 0,
                 "generation_attempts": 0,
+                "fusion_method": request.fusion_method,
+                "filters": (
+                    request.filters.model_dump(exclude_none=True) if request.filters else None
+                ),
             }
-            result = agent.invoke(inputs)  # type: ignore[arg-type]
+            result = await agent.ainvoke(inputs)  # type: ignore[arg-type]
 
             rag_result["generation"] = result.get("generation", "No answer generated")
             rag_result["documents"] = result.get("documents", [])
             rag_result["web_search"] = result.get("web_search", False)
+            # web_search is reset once web results are graded; these two are not
+            rag_result["used_web_search"] = result.get("used_web_search", False)
+            rag_result["explicit_web_search"] = result.get("explicit_web_search", False)
             rag_result["generation_attempts"] = result.get("generation_attempts", 1)
             rag_result["hallucination_grounded"] = result.get("hallucination_grounded", "yes")
             rag_result["answer_quality"] = result.get("answer_quality", "yes")
@@ -69,7 +139,9 @@ async def handle_query(request: QueryRequest) -> dict[str, Any]:
             docs_relevant=sources_count,
             hallucination_check=str(rag_result.get("hallucination_grounded", "yes")),
             quality_check=str(rag_result.get("answer_quality", "yes")),
-            web_search_triggered=bool(rag_result.get("web_search", False)),
+            web_search_triggered=bool(
+                rag_result.get("used_web_search") or rag_result.get("web_search")
+            ),
             generation_attempts=generation_attempts,
             latency_ms=latency_ms,
         )
@@ -80,6 +152,18 @@ async def handle_query(request: QueryRequest) -> dict[str, Any]:
         logger.info(f"Evaluation: {evaluation.to_dict()}")
         logger.info(f"Query completed. Answer length: {len(answer)}, Sources: {sources_count}")
 
+        # Only answers built from the corpus; web results go stale on their own schedule
+        used_web = rag_result.get("used_web_search") or rag_result.get("explicit_web_search")
+        if cache is not None and rag_result.get("generation") and not used_web:
+            cache.put(
+                request.question,
+                cache_scope(request),
+                corpus_version,
+                answer,
+                sources_count,
+                question_embedding,
+            )
+
         return {
             "question": request.question,
             "answer": answer,
@@ -1,30 +1,92 @@
-import os
+import asyncio
+import hashlib
+import tarfile
 import uuid
+import zipfile
 from pathlib import Path
 from typing import Any
 
+import aiofiles
+import aiofiles.os
 from fastapi import HTTPException, UploadFile
 
 from src.config import get_settings
-from src.core.document_processing.document_processor import DocumentProcessor
+from src.core.document_processing.incremental import document_id_for, document_key_for
+from src.core.ingestion.archives import ArchiveTooLargeError, extract_archive, is_archive
+from src.core.ingestion.jobs import QueueFullError, get_ingestion_queue
 from src.utils.logger import logger
 
 settings = get_settings()
 
+ALLOWED_EXTENSIONS = {".pdf", ".docx", ".txt"}
 
-async def handle_upload(file: UploadFile) -> dict[str, Any]:
+
+async def save_upload(
+    file: UploadFile, file_path: Path, max_size_mb: int | None = None
+) -> tuple[int, str]:
+    """
+    Stream an upload to disk in fixed-size chunks, hashing it in the same pass.
+
+    Args:
+        file: Incoming upload
+        file_path: Destination path
+        max_size_mb: Size limit, defaults to MAX_UPLOAD_SIZE_MB
+
+    Returns:
+        Tuple of (bytes written, sha256 hex digest)
+    """
+    max_size_mb = max_size_mb or settings.MAX_UPLOAD_SIZE_MB
+    max_bytes = max_size_mb * 1024 * 1024
+
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"File too large. Maximum: {max_size_mb} MB")
+
+    hasher = hashlib.sha256()
+    size = 0
+
+    async with aiofiles.open(file_path, "wb") as f:
+        while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=413, detail=f"File too large. Maximum: {max_size_mb} MB"
+                )
+            hasher.update(chunk)
+            await f.write(chunk)
+
+    return size, hasher.hexdigest()
+
+
+async def discard_upload(file_path: Path) -> None:
+    if file_path.exists():
+        await aiofiles.os.remove(file_path)
+        logger.info(f"Cleaned up temp file {file_path}")
+
+
+async def discard_uploads(files: list[dict[str, Any]]) -> None:
+    for file_info in files:
+        await discard_upload(Path(file_info["path"]))
+
+
+async def handle_upload(file: UploadFile, document_key: str | None = None) -> dict[str, Any]:
     if not file.filename:
         raise HTTPException(status_code=400, detail="No filename provided")
+    document_key = document_key or file.filename
 
-    allowed_extensions = {".pdf", ".docx", ".txt"}
     file_ext = Path(file.filename).suffix.lower()
 
-    if file_ext not in allowed_extensions:
+    if file_ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
-            detail=f"Unsupported file type. Allowed: {', '.join(allowed_extensions)}",
+            detail=f"Unsupported file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}",
         )
 
+    queue = get_ingestion_queue()
+    try:
+        queue.ensure_capacity()
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
     upload_dir = Path(settings.UPLOAD_DIR)
     upload_dir.mkdir(parents=True, exist_ok=True)
 
@@ -32,24 +94,137 @@ async def handle_upload(file: UploadFile) -> dict[str, Any]:
     file_path = upload_dir / temp_filename
 
     try:
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
+        file_size, content_hash = await save_upload(file, file_path)
+
+        logger.info(
+            f"Saved uploaded file to {file_path} ({file_size} bytes, sha256={content_hash})"
+        )
+
+        # The worker owns the file from here and removes it when the job finishes
+        job_id = queue.submit(
+            [
+                {
+                    "path": str(file_path),
+                    "filename": file.filename,
+                    "content_hash": content_hash,
+                    "document_key": document_key,
+                    "file_size": file_size,
+                }
+            ]
+        )
+
+    except QueueFullError as e:
+        await discard_upload(file_path)
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except HTTPException:
+        await discard_upload(file_path)
+        raise
+    except Exception as e:
+        await discard_upload(file_path)
+        logger.error(f"Failed to queue document: {e}")
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "filename": file.filename,
+        "file_size": file_size,
+        "content_hash": content_hash,
+        "document_key": document_key,
+        "document_id": document_id_for(document_key),
+    }
+
+
+async def handle_bulk_upload(files: list[UploadFile], source: str | None = None) -> dict[str, Any]:
+    queue = get_ingestion_queue()
+    try:
+        queue.ensure_capacity()
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+    upload_dir = Path(settings.UPLOAD_DIR)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+
+    accepted: list[dict[str, Any]] = []
+    skipped: list[dict[str, str]] = []
+
+    try:
+        for file in files:
+            if not file.filename:
+                skipped.append({"filename": "", "reason": "No filename provided"})
+                continue
+
+            if is_archive(file.filename):
+                archive_path = upload_dir / f"{uuid.uuid4()}.archive"
+                try:
+                    await save_upload(file, archive_path, settings.MAX_BULK_UPLOAD_SIZE_MB)
+                    members, skipped_members = await asyncio.to_thread(
+                        extract_archive,
+                        archive_path,
+                        file.filename,
+                        upload_dir,
+                        ALLOWED_EXTENSIONS,
+                        settings.MAX_ARCHIVE_EXTRACTED_MB * 1024 * 1024,
+                        settings.BULK_MAX_FILES - len(accepted),
+                    )
+                finally:
+                    await discard_upload(archive_path)
+                accepted.extend(members)
+                skipped.extend(skipped_members)
+                continue
 
-        logger.info(f"Saved uploaded file to {file_path}")
+            file_ext = Path(file.filename).suffix.lower()
+            if file_ext not in ALLOWED_EXTENSIONS:
+                skipped.append(
+                    {"filename": file.filename, "reason": f"Unsupported file type: {file_ext}"}
+                )
+                continue
+            if len(accepted) >= settings.BULK_MAX_FILES:
+                raise ArchiveTooLargeError(f"More than {settings.BULK_MAX_FILES} documents")
 
-        processor = DocumentProcessor()
-        result = await processor.process_and_store(str(file_path), file.filename)
+            # Registered before writing so a partial file is cleaned up on failure
+            file_path = upload_dir / f"{uuid.uuid4()}{file_ext}"
+            file_info = {"path": str(file_path), "filename": file.filename, "content_hash": ""}
+            accepted.append(file_info)
+            file_info["file_size"], file_info["content_hash"] = await save_upload(file, file_path)
 
-        return result
+        if not accepted:
+            raise HTTPException(status_code=400, detail="No supported documents in upload")
 
-    except ValueError as e:
-        logger.error(f"Validation error: {e}")
-        raise HTTPException(status_code=400, detail=str(e))
+        # Scope document identity by source so equal filenames from elsewhere don't collide
+        if source:
+            for file_info in accepted:
+                file_info["document_key"] = f"{source}/{file_info['filename']}"
+
+        # The worker owns the files from here and removes them as the job progresses
+        job_id = queue.submit(accepted)
+
+    except QueueFullError as e:
+        await discard_uploads(accepted)
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except ArchiveTooLargeError as e:
+        await discard_uploads(accepted)
+        raise HTTPException(status_code=413, detail=str(e))
+    except (zipfile.BadZipFile, tarfile.TarError) as e:
+        await discard_uploads(accepted)
+        raise HTTPException(status_code=400, detail=f"Invalid archive: {e}")
+    except HTTPException:
+        await discard_uploads(accepted)
+        raise
     except Exception as e:
-        logger.error(f"Failed to process document: {e}")
-        raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
-    finally:
-        if file_path.exists():
-            os.remove(file_path)
-            logger.info(f"Cleaned up temp file {file_path}")
+        await discard_uploads(accepted)
+        logger.error(f"Failed to queue bulk upload: {e}")
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+    logger.info(
+        f"Bulk upload queued as job {job_id}: {len(accepted)} files, {len(skipped)} skipped"
+    )
+
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "files_accepted": len(accepted),
+        "filenames": [file_info["filename"] for file_info in accepted],
+        "document_ids": [document_id_for(document_key_for(file_info)) for file_info in accepted],
+        "skipped": skipped,
+    }
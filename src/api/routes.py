@@ -1,10 +1,22 @@
 from typing import Any
 
-from fastapi import APIRouter, File, UploadFile
+from fastapi import APIRouter, File, Form, UploadFile
 
+from src.api.handlers.documents import handle_delete_document
+from src.api.handlers.jobs import handle_get_job
 from src.api.handlers.query import handle_query
-from src.api.handlers.upload import handle_upload
-from src.api.schemas import QueryRequest, QueryResponse, UploadResponse
+from src.api.handlers.upload import handle_bulk_upload, handle_upload
+from src.api.schemas import (
+    BulkUploadAcceptedResponse,
+    DeleteDocumentResponse,
+    JobStatusResponse,
+    QueryRequest,
+    QueryResponse,
+    UploadAcceptedResponse,
+)
+from src.core.caching.answer_cache import get_answer_cache
+from src.core.caching.llm_memo import get_llm_memo
+from src.core.caching.query_cache import get_query_embedding_cache, get_search_result_cache
 from src.core.evaluation.metrics import get_evaluation_tracker
 
 router = APIRouter()
@@ -15,10 +27,30 @@ async def ping():
     return {"message": "pong"}
 
 
-@router.post("/upload", response_model=UploadResponse)
-async def upload_document(file: UploadFile = File(...)):
-    result = await handle_upload(file)
-    return UploadResponse(**result)
+@router.post("/upload", response_model=UploadAcceptedResponse, status_code=202)
+async def upload_document(file: UploadFile = File(...), document_key: str | None = Form(None)):
+    result = await handle_upload(file, document_key)
+    return UploadAcceptedResponse(**result)
+
+
+@router.post("/upload/bulk", response_model=BulkUploadAcceptedResponse, status_code=202)
+async def upload_documents_bulk(
+    files: list[UploadFile] = File(...), source: str | None = Form(None)
+):
+    result = await handle_bulk_upload(files, source)
+    return BulkUploadAcceptedResponse(**result)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    result = await handle_get_job(job_id)
+    return JobStatusResponse(**result)
+
+
+@router.delete("/documents/{document_id}", response_model=DeleteDocumentResponse)
+async def delete_document(document_id: str):
+    result = await handle_delete_document(document_id)
+    return DeleteDocumentResponse(**result)
 
 
 @router.post("/query", response_model=QueryResponse)
@@ -31,3 +63,16 @@ async def query_documents(request: QueryRequest):
 async def get_evaluation_stats() -> dict[str, Any]:
     tracker = get_evaluation_tracker()
     return tracker.get_stats()
+
+
+@router.get("/cache/stats")
+async def get_cache_stats() -> dict[str, Any]:
+    answer_cache = get_answer_cache()
+    embedding_cache = get_query_embedding_cache()
+    search_cache = get_search_result_cache()
+    return {
+        "answer_cache": answer_cache.get_stats() if answer_cache else None,
+        "graders": get_llm_memo().get_stats(),
+        "query_embeddings": embedding_cache.get_stats() if embedding_cache else None,
+        "search_results": search_cache.get_stats() if search_cache else None,
+    }
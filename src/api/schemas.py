@@ -1,8 +1,28 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 
+class QueryFilters(BaseModel):
+    document_ids: list[str] | None = Field(None, description="Only chunks of these documents")
+    filenames: list[str] | None = Field(None, description="Only chunks of these files")
+    file_types: list[str] | None = Field(None, description="File extensions, e.g. pdf or .docx")
+    entities: list[str] | None = Field(
+        None, description="Chunks mentioning any of these entities (case-insensitive)"
+    )
+    keywords: list[str] | None = Field(
+        None, description="Chunks with any of these keywords (case-insensitive)"
+    )
+
+
 class QueryRequest(BaseModel):
     question: str = Field(..., description="User question to answer", min_length=1)
+    fusion_method: Literal["weighted", "rrf", "zscore"] | None = Field(
+        None, description="Score fusion strategy; defaults to FUSION_METHOD"
+    )
+    filters: QueryFilters | None = Field(
+        None, description="Restrict retrieval to matching chunks; all given filters must match"
+    )
 
 
 class QueryResponse(BaseModel):
@@ -15,7 +35,76 @@ class UploadResponse(BaseModel):
     document_id: str
     filename: str
     chunks_created: int
+    chunks_added: int | None = Field(None, description="Chunks embedded by this upload")
+    chunks_removed: int | None = Field(
+        None, description="Stored chunks deleted because the new version no longer has them"
+    )
     file_size: int
+    content_hash: str | None = Field(None, description="sha256 of the uploaded file")
+    chunks_per_second: float = Field(0.0, description="Embedding throughput for this upload")
+    deduplicated: bool = Field(False, description="File was already ingested and was skipped")
+
+
+class UploadAcceptedResponse(BaseModel):
+    job_id: str = Field(..., description="Poll GET /api/jobs/{job_id} for progress")
+    status: str
+    filename: str
+    file_size: int
+    content_hash: str
+    document_key: str = Field(
+        ..., description="Document identity: the document_key form field, else the filename"
+    )
+    document_id: str = Field(
+        ...,
+        description=(
+            "Derived from document_key; if a document with this ID exists, this upload "
+            "replaces its chunks"
+        ),
+    )
+
+
+class SkippedFile(BaseModel):
+    filename: str
+    reason: str
+
+
+class BulkUploadAcceptedResponse(BaseModel):
+    job_id: str = Field(..., description="Poll GET /api/jobs/{job_id} for progress")
+    status: str
+    files_accepted: int
+    filenames: list[str]
+    document_ids: list[str] = Field(
+        ...,
+        description=(
+            "Per accepted file, derived from source/filename (or the filename alone); an "
+            "existing document with the same ID is replaced"
+        ),
+    )
+    skipped: list[SkippedFile] = Field(..., description="Uploads and archive members ignored")
+
+
+class FailedFile(BaseModel):
+    filename: str
+    error: str
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "completed", "failed"]
+    stage: str = Field(..., description="Current pipeline stage")
+    filenames: list[str]
+    progress: dict[str, int] = Field(..., description="Page, chunk and file counts")
+    timings: dict[str, float] = Field(..., description="Seconds spent per stage")
+    results: list[UploadResponse] = Field(..., description="Per-file results so far")
+    failures: list[FailedFile] = Field(default_factory=list, description="Files that failed")
+    error: str | None = None
+    created_at: float
+    updated_at: float
+
+
+class DeleteDocumentResponse(BaseModel):
+    document_id: str
+    chunks_deleted: int
 
 
 class HealthResponse(BaseModel):
@@ -26,11 +26,95 @@ class Settings(BaseSettings):
     QDRANT_URL: str = ""
     QDRANT_API_KEY: str = ""
     QDRANT_COLLECTION_NAME: str = "documents"
+    QDRANT_UPSERT_BATCH_SIZE: int = 256
+    QDRANT_UPSERT_CONCURRENCY: int = 4
+    QDRANT_PREFER_GRPC: bool = False
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_POOL_SIZE: int = 64  # HTTP connections, or gRPC channels with QDRANT_PREFER_GRPC
+    QDRANT_KEEPALIVE_SECONDS: float = 30.0
+    QDRANT_TIMEOUT: int = 30
+    # default: float32 in RAM; scalar: int8 in RAM + originals on disk; binary: 1-bit in RAM
+    QDRANT_COLLECTION_PROFILE: Literal["default", "scalar", "binary"] = "default"
+    QDRANT_SEARCH_OVERSAMPLING: float = 0.0  # 0 = profile default
+    QDRANT_SEARCH_RESCORE: bool = True
+    QDRANT_HNSW_M: int = 16
+    QDRANT_HNSW_EF_CONSTRUCT: int = 100
+    QDRANT_HNSW_EF: int = 0  # Search-time beam width, 0 = Qdrant default
 
     EMBEDDING_MODEL: str = "text-embedding-3-small"
     EMBEDDING_DIMENSION: int = 1536
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_BATCH_MAX_TOKENS: int = 100_000
+    EMBEDDING_MAX_CONCURRENCY: int = 4
+    EMBEDDING_MAX_RETRIES: int = 3
+    EMBEDDING_CACHE_ENABLED: bool = True
 
     UPLOAD_DIR: str = "./uploads"
+    DATA_DIR: str = "./data"
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    MAX_UPLOAD_SIZE_MB: int = 256
+    MAX_BULK_UPLOAD_SIZE_MB: int = 1024
+    MAX_ARCHIVE_EXTRACTED_MB: int = 4096
+    BULK_MAX_FILES: int = 10_000
+
+    EXTRACTION_WORKERS: int = 0  # 0 = one per CPU core
+    EXTRACTION_PAGES_PER_TASK: int = 25
+
+    INGESTION_WORKERS: int = 2
+    INGESTION_QUEUE_MAX: int = 100
+    INGESTION_FILES_PER_BATCH: int = 200
+
+    STREAMING_MIN_FILE_MB: int = 20  # 0 = stream every file
+    STREAMING_QUEUE_SIZE: int = 4
+    STREAMING_BUFFER_CHARS: int = 12_000
+
+    FUSION_METHOD: Literal["weighted", "rrf", "zscore"] = "weighted"
+    FUSION_ALPHA: float = 0.6
+    FUSION_RRF_K: int = 60
+
+    RETRIEVAL_K: int = 10
+    RETRIEVAL_FETCH_K: int = 20  # Candidates fetched when dedup or MMR thins them out
+    DEDUP_ENABLED: bool = True
+    DEDUP_THRESHOLD: float = 0.8
+    MMR_ENABLED: bool = False
+    MMR_LAMBDA: float = 0.7
+    CONTEXT_EXPANSION_WINDOW: int = 0  # Neighbouring chunks added on each side of a hit
+    # two_level: pick DOCUMENT_TOP_N documents by centroid, then search only their chunks
+    RETRIEVAL_MODE: Literal["flat", "two_level"] = "flat"
+    DOCUMENT_TOP_N: int = 20
+    # Query variants from one LLM call, searched in one batch and fused by RRF (1 = off)
+    MULTI_QUERY_COUNT: int = 1
+
+    BM25_MAX_SEGMENTS: int = 8
+    BM25_TOP_K: int = 10
+
+    # server: one Qdrant query fusing dense and sparse prefetches; client: Python BM25 + fusion
+    HYBRID_SEARCH: Literal["server", "client"] = "server"
+    HYBRID_FUSION: Literal["rrf", "dbsf"] = "rrf"
+    HYBRID_PREFETCH_LIMIT: int = 40
+
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_MAX_ENTRIES: int = 1024
+    ANSWER_CACHE_TTL_SECONDS: int = 3600
+    ANSWER_CACHE_SEMANTIC: bool = True
+    ANSWER_CACHE_SIMILARITY: float = 0.95
+
+    # Memo for temperature-0 grader calls; sqlite shares it across worker processes
+    LLM_MEMO_BACKEND: Literal["memory", "sqlite", "off"] = "memory"
+    LLM_MEMO_MAX_ENTRIES: int = 50_000
+    LLM_MEMO_TTL_SECONDS: int = 86_400
+
+    QUERY_EMBEDDING_CACHE_SIZE: int = 2048  # 0 = off
+    SEARCH_CACHE_TTL_SECONDS: int = 60  # 0 = off
+    SEARCH_CACHE_MAX_ENTRIES: int = 512
+
+    # full: whole spaCy pipeline; fast: without parser/NER; simple: pure-Python suffix rules
+    TOKENIZER_MODE: Literal["full", "fast", "simple"] = "fast"
+    TOKENIZER_CACHE_SIZE: int = 4096
+
+    SPACY_BATCH_SIZE: int = 64
+    SPACY_N_PROCESS: int = 1
+
     HOST: str = "0.0.0.0"
     PORT: int = 8000
 
@@ -0,0 +1,231 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from threading import Lock
+from typing import Any
+
+import numpy as np
+
+from src.config import get_settings
+from src.utils.logger import logger
+
+settings = get_settings()
+
+
+@dataclass
+class CachedAnswer:
+    answer: str
+    sources_count: int
+    scope: str
+    created_at: float
+    slot: int = -1  # Row in the embedding matrix, -1 when stored without an embedding
+
+
+def normalize_question(question: str) -> str:
+    """Case, whitespace and trailing punctuation don't change the question."""
+    return " ".join(question.lower().split()).rstrip("?.! ")
+
+
+class AnswerCache:
+    """
+    In-process cache of final answers for /api/query.
+
+    Two tiers: an exact match on the normalized question, then a cosine-similarity
+    lookup of the question embedding against the embeddings of cached questions.
+    Entries belong to one corpus version and are dropped when it changes; beyond that
+    they expire after ttl_seconds and the least recently used go first when full.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, similarity_threshold: float):
+        """
+        Args:
+            max_entries: Maximum cached answers
+            ttl_seconds: Lifetime of an entry
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+
+        self._entries: OrderedDict[str, CachedAnswer] = OrderedDict()
+        # Unit-norm question embeddings, allocated on the first put with an embedding
+        self._vectors: np.ndarray | None = None
+        self._slot_keys: list[str | None] = [None] * max_entries
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        self._version: int | None = None
+        self._lock = Lock()
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(question: str, scope: str) -> str:
+        return f"{scope}\x00{normalize_question(question)}"
+
+    def _sync_version(self, version: int) -> None:
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                logger.info(
+                    f"Corpus version {self._version} -> {version}, "
+                    f"dropping {len(self._entries)} cached answers"
+                )
+            for key in list(self._entries):
+                self._remove(key)
+            self._version = version
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        if entry.slot >= 0:
+            self._slot_keys[entry.slot] = None
+            self._free_slots.append(entry.slot)
+
+    def _expired(self, entry: CachedAnswer, now: float) -> bool:
+        return now - entry.created_at > self.ttl_seconds
+
+    def get(self, question: str, scope: str, version: int) -> CachedAnswer | None:
+        """
+        Exact-tier lookup. Misses are not counted here; call get_similar or record_miss.
+
+        Args:
+            question: User question
+            scope: Request options that change the answer (e.g. fusion method)
+            version: Current corpus version
+
+        Returns:
+            Cached answer, or None
+        """
+        key = self._key(question, scope)
+        now = time.time()
+        with self._lock:
+            self._sync_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._expired(entry, now):
+                self._remove(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry
+
+    def get_similar(
+        self, embedding: list[float], scope: str, version: int
+    ) -> tuple[CachedAnswer, float] | None:
+        """
+        Semantic-tier lookup; counts a miss when nothing is similar enough.
+
+        Args:
+            embedding: Question embedding
+            scope: Request options that change the answer
+            version: Current corpus version
+
+        Returns:
+            Closest cached answer and its similarity, or None
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        now = time.time()
+
+        with self._lock:
+            self._sync_version(version)
+            if self._vectors is not None and self._vectors.shape[1] == len(query):
+                similarities = self._vectors @ query
+                candidates = np.flatnonzero(similarities >= self.similarity_threshold)
+                for slot in candidates[np.argsort(-similarities[candidates])]:
+                    key = self._slot_keys[slot]
+                    if key is None:
+                        continue
+                    entry = self._entries[key]
+                    if entry.scope != scope:
+                        continue
+                    if self._expired(entry, now):
+                        self._remove(key)
+                        self.expirations += 1
+                        continue
+                    self._entries.move_to_end(key)
+                    self.semantic_hits += 1
+                    return entry, float(similarities[slot])
+            self.misses += 1
+            return None
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def put(
+        self,
+        question: str,
+        scope: str,
+        version: int,
+        answer: str,
+        sources_count: int,
+        embedding: list[float] | None = None,
+    ) -> None:
+        """
+        Cache an answer produced against the given corpus version.
+
+        Args:
+            question: User question
+            scope: Request options that change the answer
+            version: Corpus version read before the answer was generated
+            answer: Final answer
+            sources_count: Documents the answer used
+            embedding: Question embedding for the semantic tier
+        """
+        key = self._key(question, scope)
+        with self._lock:
+            # The corpus changed while this answer was being generated
+            if self._version is not None and version < self._version:
+                return
+            self._sync_version(version)
+
+            if key in self._entries:
+                self._remove(key)
+            while len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+            entry = CachedAnswer(answer, sources_count, scope, time.time())
+            if embedding is not None:
+                vector = np.asarray(embedding, dtype=np.float32)
+                if self._vectors is None or self._vectors.shape[1] != len(vector):
+                    self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+                entry.slot = self._free_slots.pop()
+                self._vectors[entry.slot] = vector / (np.linalg.norm(vector) or 1.0)
+                self._slot_keys[entry.slot] = key
+            self._entries[key] = entry
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "corpus_version": self._version,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_answer_cache() -> AnswerCache | None:
+    if not settings.ANSWER_CACHE_ENABLED:
+        return None
+
+    return AnswerCache(
+        max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+        similarity_threshold=settings.ANSWER_CACHE_SIMILARITY,
+    )
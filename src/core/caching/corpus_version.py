@@ -0,0 +1,37 @@
+import os
+from pathlib import Path
+from threading import Lock
+
+from src.config import get_settings
+
+settings = get_settings()
+
+_lock = Lock()
+
+
+def _version_path() -> Path:
+    return Path(settings.DATA_DIR) / "corpus_version"
+
+
+def get_corpus_version() -> int:
+    """
+    Version of the indexed corpus, bumped whenever ingestion or deletion changes it.
+
+    Kept in a file under DATA_DIR so every worker process sees the same version.
+    """
+    try:
+        return int(_version_path().read_text())
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def bump_corpus_version() -> int:
+    """Mark the corpus as changed, invalidating caches tagged with the previous version."""
+    path = _version_path()
+    with _lock:
+        version = get_corpus_version() + 1
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(str(version))
+        os.replace(tmp, path)
+    return version
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Any, Protocol
+
+from src.config import get_settings
+from src.utils.logger import logger
+
+settings = get_settings()
+
+
+class MemoBackend(Protocol):
+    def get(self, key: str) -> str | None: ...
+
+    def put_many(self, items: list[tuple[str, str]]) -> None: ...
+
+
+class MemoryMemoBackend:
+    """Per-process LRU memo with a TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if time.time() - item[1] > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return item[0]
+
+    def put_many(self, items: list[tuple[str, str]]) -> None:
+        now = time.time()
+        with self._lock:
+            for key, value in items:
+                self._entries[key] = (value, now)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteMemoBackend:
+    """Memo shared by every worker process on the host; the oldest entries go first when full."""
+
+    # Expired and overflow rows are deleted every this many puts, not on each one
+    EVICT_EVERY = 100
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS memo "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS memo_created ON memo (created_at)")
+        self._conn.commit()
+        self._lock = Lock()
+        self._puts = 0
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM memo WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.ttl_seconds),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put_many(self, items: list[tuple[str, str]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO memo (key, value, created_at) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in items],
+            )
+            self._puts += 1
+            if self._puts % self.EVICT_EVERY == 0:
+                self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        # The table may run up to EVICT_EVERY puts per process over max_entries in between
+        self._conn.execute("DELETE FROM memo WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM memo WHERE key IN "
+            "(SELECT key FROM memo ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+
+class LLMMemo:
+    """Memoizes deterministic (temperature 0) LLM calls by prompt template, model and inputs."""
+
+    def __init__(self, backend: MemoBackend | None, model: str):
+        """
+        Args:
+            backend: Where results are kept; None disables memoization
+            model: LLM provider and model, part of every key
+        """
+        self.backend = backend
+        self.model = model
+        self._counts: dict[str, list[int]] = {}
+        self._lock = Lock()
+
+    def key(self, name: str, template: str, inputs: tuple[str, ...]) -> str:
+        # Editing a prompt template changes its key, so stale results are never served
+        payload = json.dumps([name, self.model, template, *inputs])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, name: str, hits: int, misses: int) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(name, [0, 0])
+            counts[0] += hits
+            counts[1] += misses
+
+    def cached_many(
+        self,
+        name: str,
+        template: str,
+        inputs: list[tuple[str, ...]],
+        compute: Callable[[list[tuple[str, ...]]], list[str]],
+    ) -> list[str]:
+        """
+        Return memoized results, calling compute once for all the misses.
+
+        Args:
+            name: Grader name, for hit/miss counts
+            template: Prompt template text the inputs are formatted into
+            inputs: One tuple of prompt inputs per call
+            compute: Runs the LLM for the given inputs, results in the same order
+
+        Returns:
+            One result per input, in order
+        """
+        if self.backend is None:
+            return compute(inputs)
+
+        keys = [self.key(name, template, item) for item in inputs]
+        results: list[str | None] = [self.backend.get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        self._count(name, len(inputs) - len(misses), len(misses))
+
+        if misses:
+            computed = compute([inputs[i] for i in misses])
+            for i, value in zip(misses, computed):
+                results[i] = value
+            self.backend.put_many([(keys[i], value) for i, value in zip(misses, computed)])
+
+        return results  # type: ignore[return-value]
+
+    def cached(
+        self, name: str, template: str, inputs: tuple[str, ...], compute: Callable[[], str]
+    ) -> str:
+        """Single-call form of cached_many."""
+        return self.cached_many(name, template, [inputs], lambda _: [compute()])[0]
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                }
+                for name, (hits, misses) in self._counts.items()
+            }
+
+
+@lru_cache(maxsize=1)
+def get_llm_memo() -> LLMMemo:
+    backend: MemoBackend | None = None
+    if settings.LLM_MEMO_BACKEND == "memory":
+        backend = MemoryMemoBackend(settings.LLM_MEMO_MAX_ENTRIES, settings.LLM_MEMO_TTL_SECONDS)
+    elif settings.LLM_MEMO_BACKEND == "sqlite":
+        path = str(Path(settings.DATA_DIR) / "llm_memo.sqlite3")
+        logger.info(f"Using LLM memo at {path}")
+        backend = SQLiteMemoBackend(
+            path, settings.LLM_MEMO_MAX_ENTRIES, settings.LLM_MEMO_TTL_SECONDS
+        )
+
+    return LLMMemo(backend, f"{settings.LLM_PROVIDER}/{settings.get_llm_model()}")
@@ -0,0 +1,202 @@
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
+from threading import Lock
+from typing import Any
+
+import numpy as np
+
+from src.config import get_settings
+from src.core.caching.corpus_version import get_corpus_version
+from src.core.vector_store import get_embeddings
+from src.utils.logger import logger
+
+settings = get_settings()
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.blake2b("\x00".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def embedding_hash(embedding: list[float]) -> str:
+    return hashlib.blake2b(
+        np.asarray(embedding, dtype=np.float32).tobytes(), digest_size=16
+    ).hexdigest()
+
+
+class QueryEmbeddingCache:
+    """LRU of query embeddings keyed by (model, whitespace-normalized text)."""
+
+    def __init__(self, max_entries: int, model: str):
+        self.max_entries = max_entries
+        self.model = model
+        self._entries: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        return _digest(self.model, " ".join(text.split()))
+
+    def get(self, text: str) -> list[float] | None:
+        key = self._key(text)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, text: str, embedding: list[float]) -> None:
+        with self._lock:
+            self._entries[self._key(text)] = embedding
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class SearchResultCache:
+    """Short-lived search results for one collection version; a version bump clears them."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[list, float]] = OrderedDict()
+        self._version: int | None = None
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _sync_version(self, version: int) -> None:
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key: str, version: int) -> list | None:
+        with self._lock:
+            self._sync_version(version)
+            item = self._entries.get(key)
+            if item is None or time.time() - item[1] > self.ttl_seconds:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(item[0])
+
+    def put(self, key: str, version: int, results: list) -> None:
+        with self._lock:
+            # Results computed against a version that has since been replaced
+            if self._version is not None and version < self._version:
+                return
+            self._sync_version(version)
+            self._entries[key] = (list(results), time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "collection_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_query_embedding_cache() -> QueryEmbeddingCache | None:
+    if settings.QUERY_EMBEDDING_CACHE_SIZE <= 0:
+        return None
+    return QueryEmbeddingCache(
+        settings.QUERY_EMBEDDING_CACHE_SIZE,
+        f"{settings.EMBEDDING_MODEL}/{settings.EMBEDDING_DIMENSION}",
+    )
+
+
+@lru_cache(maxsize=1)
+def get_search_result_cache() -> SearchResultCache | None:
+    if settings.SEARCH_CACHE_TTL_SECONDS <= 0:
+        return None
+    return SearchResultCache(settings.SEARCH_CACHE_MAX_ENTRIES, settings.SEARCH_CACHE_TTL_SECONDS)
+
+
+async def aembed_query(text: str) -> list[float]:
+    """Embed a query, reusing the embedding of an identical earlier query."""
+    cache = get_query_embedding_cache()
+    embedding = cache.get(text) if cache else None
+    if embedding is None:
+        embedding = await get_embeddings().aembed_query(text)
+        if cache:
+            cache.put(text, embedding)
+    return embedding
+
+
+async def aembed_queries(texts: list[str]) -> list[list[float]]:
+    """
+    Embed several queries, sending all cache misses in one embedding request.
+
+    Args:
+        texts: Queries to embed
+
+    Returns:
+        Embeddings in the order of texts
+    """
+    cache = get_query_embedding_cache()
+    embeddings = [cache.get(text) if cache else None for text in texts]
+    misses = list(dict.fromkeys(text for text, e in zip(texts, embeddings) if e is None))
+    if misses:
+        computed = dict(zip(misses, await get_embeddings().aembed_documents(misses)))
+        if cache:
+            for text, embedding in computed.items():
+                cache.put(text, embedding)
+        embeddings = [e if e is not None else computed[t] for t, e in zip(texts, embeddings)]
+    return embeddings  # type: ignore[return-value]
+
+
+async def cached_search(key_parts: tuple[Any, ...], search: Callable[[], Awaitable[list]]) -> list:
+    """
+    Serve a search from the result cache, or run it and cache the results.
+
+    Args:
+        key_parts: Everything the results depend on besides the collection contents:
+            search kind, embedding hash, k, filters
+        search: Runs the search
+
+    Returns:
+        Search results
+    """
+    cache = get_search_result_cache()
+    if cache is None:
+        return await search()
+
+    version = get_corpus_version()
+    key = _digest(*(repr(part) for part in key_parts))
+    results = cache.get(key, version)
+    if results is not None:
+        logger.info("Search result cache hit")
+        return results
+
+    results = await search()
+    cache.put(key, version, results)
+    return results
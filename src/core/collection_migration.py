@@ -0,0 +1,197 @@
+"""
+Bring the Qdrant collection in line with the configured profile and embedding size.
+
+Usage:
+    uv run python -m src.core.collection_migration [--dry-run]
+
+Quantization, on-disk storage and HNSW settings are changed in place. A new
+EMBEDDING_DIMENSION (Matryoshka truncation of text-embedding-3 vectors) or a
+collection from before hybrid search (one unnamed vector, no sparse vectors) needs
+the collection re-created: points are copied to a staging collection, converted on
+the way, and copied back under the original name. Point IDs and payloads are kept,
+so the BM25 index and job history stay valid; a crashed run resumes from staging.
+Pause ingestion while it runs: uploads written to the old collection are not copied.
+"""
+
+import argparse
+
+import numpy as np
+from qdrant_client.models import Disabled, PointStruct, VectorParamsDiff
+
+from src.config import get_settings
+from src.core.caching.corpus_version import bump_corpus_version
+from src.core.retrieval.document_index import document_collection_name
+from src.core.retrieval.sparse import sparse_document_vector
+from src.core.vector_store import (
+    DENSE_VECTOR_NAME,
+    SPARSE_VECTOR_NAME,
+    create_collection,
+    ensure_collection_exists,
+    get_collection_layout,
+    get_collection_profile,
+    get_qdrant_client,
+    hnsw_config,
+    quantization_config,
+)
+from src.utils.logger import logger
+
+settings = get_settings()
+
+BATCH_SIZE = 256
+
+
+def staging_name() -> str:
+    return f"{settings.QDRANT_COLLECTION_NAME}__migration"
+
+
+def truncate(vector: list[float], dimension: int) -> list[float]:
+    """Matryoshka truncation: keep the leading dimensions and re-normalize."""
+    head = np.asarray(vector[:dimension], dtype=np.float32)
+    return (head / (np.linalg.norm(head) or 1.0)).tolist()
+
+
+def copy_points(source: str, target: str, dimension: int) -> int:
+    """
+    Copy every point from source to target as named dense + sparse vectors.
+
+    Args:
+        source: Collection to read
+        target: Collection to write, already created
+        dimension: Dense size in target
+
+    Returns:
+        Number of points copied
+    """
+    client = get_qdrant_client()
+    copied = 0
+    offset = None
+
+    while True:
+        points, offset = client.scroll(
+            collection_name=source,
+            limit=BATCH_SIZE,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if points:
+            converted = []
+            for point in points:
+                vectors = point.vector if isinstance(point.vector, dict) else {"": point.vector}
+                dense = vectors.get(DENSE_VECTOR_NAME, vectors.get(""))
+                named = {DENSE_VECTOR_NAME: truncate(dense, dimension)}  # type: ignore[arg-type]
+                sparse = vectors.get(SPARSE_VECTOR_NAME)
+                if sparse is None and (point.payload or {}).get("lemmas"):
+                    sparse = sparse_document_vector(point.payload["lemmas"])  # type: ignore[index]
+                if sparse is not None:
+                    named[SPARSE_VECTOR_NAME] = sparse
+                converted.append(PointStruct(id=point.id, vector=named, payload=point.payload))
+            client.upsert(collection_name=target, points=converted, wait=True)
+            copied += len(points)
+            logger.info(f"Copied {copied} points {source} -> {target}")
+        if offset is None:
+            return copied
+
+
+def point_count(name: str) -> int:
+    return get_qdrant_client().count(collection_name=name, exact=True).count
+
+
+def dense_size(name: str) -> int:
+    vectors = get_qdrant_client().get_collection(name).config.params.vectors
+    if isinstance(vectors, dict):
+        return vectors[DENSE_VECTOR_NAME].size
+    return vectors.size  # type: ignore[union-attr]
+
+
+def migrate(dry_run: bool = False) -> None:
+    client = get_qdrant_client()
+    name = settings.QDRANT_COLLECTION_NAME
+    staging = staging_name()
+    profile = get_collection_profile()
+    dimension = settings.EMBEDDING_DIMENSION
+
+    if client.collection_exists(staging):
+        if client.collection_exists(name) and point_count(name) > point_count(staging):
+            # The last run died while filling staging; the original is still complete
+            logger.info(f"Discarding incomplete '{staging}'")
+            if not dry_run:
+                client.delete_collection(staging)
+        else:
+            logger.info(f"Resuming: restoring '{name}' from '{staging}'")
+            if not dry_run:
+                restore(staging, dimension)
+            return
+
+    if not client.collection_exists(name):
+        logger.info(f"Collection '{name}' does not exist; creating it")
+        if not dry_run:
+            ensure_collection_exists()
+        return
+
+    get_collection_layout.cache_clear()
+    layout = get_collection_layout()
+    current = dense_size(name)
+    if current < dimension:
+        raise ValueError(
+            f"Collection vectors have {current} dimensions, EMBEDDING_DIMENSION is {dimension}; "
+            "vectors can only be truncated, re-ingest to grow them"
+        )
+    if current > dimension and not settings.EMBEDDING_MODEL.startswith("text-embedding-3"):
+        raise ValueError(f"{settings.EMBEDDING_MODEL} embeddings can't be truncated")
+
+    if layout.dense == DENSE_VECTOR_NAME and layout.sparse and current == dimension:
+        logger.info(
+            f"Updating '{name}' in place: profile {settings.QDRANT_COLLECTION_PROFILE}, "
+            f"hnsw m={settings.QDRANT_HNSW_M} ef_construct={settings.QDRANT_HNSW_EF_CONSTRUCT}"
+        )
+        if not dry_run:
+            client.update_collection(
+                collection_name=name,
+                vectors_config={DENSE_VECTOR_NAME: VectorParamsDiff(on_disk=profile.on_disk)},
+                hnsw_config=hnsw_config(),
+                quantization_config=quantization_config(profile) or Disabled.DISABLED,
+            )
+        return
+
+    logger.info(
+        f"Re-creating '{name}': {current} -> {dimension} dimensions, "
+        f"layout dense={layout.dense or '(unnamed)'} sparse={layout.sparse}, "
+        f"profile {settings.QDRANT_COLLECTION_PROFILE}"
+    )
+    if dry_run:
+        return
+
+    create_collection(staging, dimension, profile)
+    copy_points(name, staging, dimension)
+    client.delete_collection(name)
+    restore(staging, dimension)
+
+
+def restore(staging: str, dimension: int) -> None:
+    """Re-create the collection from the staging copy, then drop staging."""
+    client = get_qdrant_client()
+    name = settings.QDRANT_COLLECTION_NAME
+    # A run that died mid-restore left a partial collection; staging is complete
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    create_collection(name, dimension)
+    copied = copy_points(staging, name, dimension)
+    ensure_collection_exists()
+    client.delete_collection(staging)
+    # Rebuilt from the migrated chunks, at the new dimension, when the API starts
+    if client.collection_exists(document_collection_name()):
+        client.delete_collection(document_collection_name())
+    bump_corpus_version()
+    logger.info(f"Migrated '{name}': {copied} points")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dry-run", action="store_true", help="Report the plan, change nothing")
+    args = parser.parse_args()
+    migrate(dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
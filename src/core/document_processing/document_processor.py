@@ -1,61 +1,694 @@
-import uuid
+import asyncio
+import time
+from collections import Counter
+from collections.abc import Callable
 from pathlib import Path
 
+import numpy as np
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from qdrant_client.models import PointStruct
+from qdrant_client.models import (
+    Batch,
+    DeleteOperation,
+    FieldCondition,
+    Filter,
+    MatchValue,
+    PointIdsList,
+    SetPayload,
+    SetPayloadOperation,
+)
 
 from src.config import get_settings
+from src.core.caching.corpus_version import bump_corpus_version
+from src.core.document_processing.embedder import BatchEmbedder
+from src.core.document_processing.embedding_cache import get_embedding_cache
+from src.core.document_processing.incremental import (
+    ChunkDiff,
+    chunk_hash,
+    document_id_for,
+    document_key_for,
+    point_id_for,
+)
 from src.core.document_processing.text_processor import TextExtractor, get_spacy_model
-from src.core.vector_store import get_embeddings, get_qdrant_client
+from src.core.retrieval.document_index import update_document_vector
+from src.core.retrieval.inverted_index import get_bm25_index
+from src.core.retrieval.sparse import sparse_document_vector
+from src.core.retrieval.tokenizer import index_terms
+from src.core.vector_store import (
+    get_async_qdrant_client,
+    get_collection_layout,
+    get_embeddings,
+    use_server_hybrid,
+)
 from src.utils.logger import logger
 
 settings = get_settings()
 
+# Called as progress(stage, **counts) as a document moves through ingestion
+ProgressCallback = Callable[..., None]
+
+# Shorter chunks are mostly headers, page numbers and other extraction noise
+MIN_CHUNK_CHARS = 100
+
+
+class StreamingChunker:
+    """Splits a stream of text segments into the same overlapping chunks as a one-shot split."""
+
+    def __init__(self, splitter: RecursiveCharacterTextSplitter, buffer_chars: int):
+        """
+        Initialize with an empty buffer.
+
+        Args:
+            splitter: Splitter created with add_start_index=True
+            buffer_chars: Text to collect before splitting
+        """
+        self.splitter = splitter
+        self.buffer_chars = buffer_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        """
+        Add a segment and return the chunks that can no longer change.
+
+        Args:
+            text: Next text segment
+
+        Returns:
+            Completed chunks, possibly empty
+        """
+        self._buffer += text
+        if len(self._buffer) < self.buffer_chars:
+            return []
+
+        chunks = self.splitter.create_documents([self._buffer])
+        if len(chunks) < 2:
+            return []
+
+        # The last chunk may still grow with the next segment, so the buffer restarts where
+        # it begins; keeping the raw text rather than the stripped chunk preserves the
+        # whitespace between this segment and the next
+        self._buffer = self._buffer[chunks[-1].metadata["start_index"] :]
+        return [chunk.page_content for chunk in chunks[:-1]]
+
+    def flush(self) -> list[str]:
+        chunks = self.splitter.split_text(self._buffer) if self._buffer.strip() else []
+        self._buffer = ""
+        return chunks
+
 
 class DocumentProcessor:
     def __init__(self):
         self.extractor = TextExtractor()
         self.embeddings = get_embeddings()
-        self.qdrant_client = get_qdrant_client()
+        self.embedder = BatchEmbedder(self.embeddings, cache=get_embedding_cache())
+        self.qdrant_client = get_async_qdrant_client()
+        self.bm25_index = get_bm25_index()
         self.nlp = get_spacy_model()
 
-    async def process_and_store(self, file_path: str, filename: str) -> dict:
-        document_id = str(uuid.uuid4())
-        logger.info(f"Processing document {filename} with ID {document_id}")
+    async def process_and_store(
+        self,
+        file_path: str,
+        filename: str,
+        content_hash: str | None = None,
+        progress: ProgressCallback | None = None,
+        document_key: str | None = None,
+    ) -> dict:
+        file = {
+            "path": file_path,
+            "filename": filename,
+            "content_hash": content_hash,
+            "document_key": document_key,
+            "file_size": Path(file_path).stat().st_size,
+        }
+        [result] = await self.process_batch([file], progress)
+        if isinstance(result, Exception):
+            raise result
+        return result
 
-        raw_text = await self.extractor.extract_from_file(file_path, filename)
-        if not raw_text.strip():
-            raise ValueError("No text extracted from document")
+    async def process_batch(
+        self, files: list[dict], progress: ProgressCallback | None = None
+    ) -> list[dict | Exception]:
+        """
+        Ingest several files through shared enrichment, embedding and storage passes.
 
-        chunks = self._chunk_text(raw_text)
-        logger.info(f"Created {len(chunks)} chunks")
+        Chunks from all files go through one nlp.pipe run and one BatchEmbedder call,
+        so embedding batches fill across file boundaries. A file whose document key (its
+        document_key, else its filename) is already ingested updates that document: only
+        chunks not stored yet are embedded, and stored chunks missing from the new version
+        are deleted.
 
-        enriched_chunks = self._enrich_chunks(chunks, filename)
-        logger.info(f"Enriched {len(enriched_chunks)} chunks with metadata")
+        Args:
+            files: Files to ingest, each with path, filename, file_size, optional
+                content_hash and optional document_key
+            progress: Optional callback, called as progress(stage, **counts)
 
-        chunk_texts = [chunk["text"] for chunk in enriched_chunks]
-        vectors = [self.embeddings.embed_query(text) for text in chunk_texts]
+        Returns:
+            Per-file result dict, or the exception that stopped that file, in input order
+        """
+        report = progress or (lambda stage, **counts: None)
+        results: list[dict | Exception | None] = [None] * len(files)
+        streaming_min_bytes = settings.STREAMING_MIN_FILE_MB * 1024 * 1024
+
+        # Same bytes under another document key are ingested as that document; the
+        # embedding cache spares re-embedding them
+        document_ids = [document_id_for(document_key_for(file)) for file in files]
+        ingested = await self._find_ingested_many(
+            {
+                (file["content_hash"], document_id)
+                for file, document_id in zip(files, document_ids)
+                if file["content_hash"]
+            }
+        )
+
+        pending = []
+        streamed = []
+        deferred = []
+        claimed_ids: set[str] = set()
+        first_by_hash: dict[tuple[str, str], int] = {}
+        duplicates: dict[int, int] = {}
+        for i, (file, document_id) in enumerate(zip(files, document_ids)):
+            if file.get("file_size") is None:
+                # Recorded at upload; jobs queued before that was done have none
+                try:
+                    file["file_size"] = Path(file["path"]).stat().st_size
+                except OSError as e:
+                    logger.error(f"Cannot read {file['filename']}: {e}")
+                    results[i] = e
+                    continue
+
+            content_hash = file["content_hash"]
+            existing = ingested.get((content_hash, document_id)) if content_hash else None
+            if existing:
+                logger.info(
+                    f"File {file['filename']} (sha256={content_hash}) already "
+                    f"ingested as {document_id}, skipping"
+                )
+                results[i] = self._deduplicated_result(existing, file)
+            elif (content_hash, document_id) in first_by_hash:
+                duplicates[i] = first_by_hash[(content_hash, document_id)]
+            elif document_id in claimed_ids:
+                # Another version of the same document is in this batch; apply it after
+                deferred.append(i)
+            else:
+                claimed_ids.add(document_id)
+                if content_hash:
+                    first_by_hash[(content_hash, document_id)] = i
+                if file["file_size"] >= streaming_min_bytes:
+                    streamed.append(i)
+                else:
+                    pending.append(i)
+
+        report("extracting")
+        extracted = await asyncio.gather(
+            *(
+                self.extractor.extract_pages(files[i]["path"], files[i]["filename"])
+                for i in pending
+            ),
+            return_exceptions=True,
+        )
+
+        report("chunking", pages=sum(len(p) for p in extracted if isinstance(p, list)))
+        documents = []
+        for i, pages in zip(pending, extracted):
+            if isinstance(pages, BaseException):
+                logger.error(f"Extraction failed for {files[i]['filename']}: {pages}")
+                results[i] = pages if isinstance(pages, Exception) else RuntimeError(str(pages))
+                continue
+
+            raw_text = "\n".join(page for page in pages if page)
+            if not raw_text.strip():
+                results[i] = ValueError("No text extracted from document")
+                continue
+
+            document_id = document_id_for(document_key_for(files[i]))
+            logger.info(f"Processing document {files[i]['filename']} with ID {document_id}")
+            chunks = self._chunk_text(raw_text)
+            documents.append((i, document_id, chunks))
+
+        try:
+            await self._store_documents(files, documents, results, report)
+        except Exception as e:
+            # Points written by the failed pass were deleted; the other files go on
+            logger.error(f"Ingestion failed for {len(documents)} files in this batch: {e}")
+            for i, _, _ in documents:
+                results[i] = e
+
+        # Large files go one at a time through the pipeline so memory stays flat
+        for i in streamed:
+            try:
+                results[i] = await self._process_streaming(files[i], report)
+            except Exception as e:
+                logger.error(f"Streaming ingestion failed for {files[i]['filename']}: {e}")
+                results[i] = e
+
+        if deferred:
+            try:
+                deferred_results: list[dict | Exception] = await self.process_batch(
+                    [files[i] for i in deferred], progress
+                )
+            except Exception as e:
+                logger.error(f"Ingestion failed for {len(deferred)} deferred files: {e}")
+                deferred_results = [e] * len(deferred)
+            for i, result in zip(deferred, deferred_results):
+                results[i] = result
+
+        # Identical files within the batch point at the copy that was ingested
+        for i, original in duplicates.items():
+            result = results[original]
+            results[i] = (
+                self._deduplicated_result(result, files[i]) if isinstance(result, dict) else result
+            )
+
+        return results  # type: ignore[return-value]
+
+    async def _store_documents(
+        self,
+        files: list[dict],
+        documents: list[tuple[int, str, list[str]]],
+        results: list[dict | Exception | None],
+        report: ProgressCallback,
+    ) -> None:
+        """
+        Diff, enrich, embed and store the chunks of extracted documents in shared passes.
+
+        A failure in a shared pass propagates with none of the documents' new points
+        kept; a document whose final diff fails gets the exception as its result.
+
+        Args:
+            files: Files of the batch
+            documents: (file index, document ID, chunks) per extracted file
+            results: Per-file results, filled in place
+            report: Progress callback
+        """
+        stored = await self._load_stored_chunks_many(
+            [document_id for _, document_id, _ in documents]
+        )
+        diffs: list[tuple[int, ChunkDiff, list[tuple[int, str]]]] = []
+        for i, document_id, chunks in documents:
+            diff = ChunkDiff(document_id, stored[document_id])
+            new_chunks = [
+                (index, chunk) for chunk in chunks if (index := diff.add(chunk)) is not None
+            ]
+            diffs.append((i, diff, new_chunks))
+            if diff.stored:
+                logger.info(
+                    f"Updating {files[i]['filename']}: {diff.added} new, {len(diff.kept)} "
+                    f"unchanged, {len(diff.removed)} removed chunks"
+                )
+
+        # CPU-bound and blocking: keep them off the event loop shared with queries
+        report("enriching", chunks_total=sum(len(new) for _, _, new in diffs))
+        enriched = await asyncio.to_thread(
+            self._enrich_documents,
+            [(files[i]["filename"], [chunk for _, chunk in new]) for i, _, new in diffs],
+        )
+        for (_, _, new_chunks), enriched_chunks in zip(diffs, enriched):
+            for (index, _), chunk in zip(new_chunks, enriched_chunks):
+                chunk["chunk_index"] = index
+        logger.info(f"Enriched {sum(len(e) for e in enriched)} chunks with metadata")
+
+        report("embedding", chunks_embedded=0)
+        chunk_texts = [chunk["text"] for doc_chunks in enriched for chunk in doc_chunks]
+        vectors, embedding_stats = await self.embedder.embed(
+            chunk_texts, on_progress=lambda done: report("embedding", chunks_embedded=done)
+        )
         logger.info(f"Generated {len(vectors)} embeddings")
+        # float32 rows take a fraction of the memory of Python float lists
+        vector_matrix = np.asarray(vectors, dtype=np.float32)
+        del vectors
+
+        report("storing")
+        point_ids: list[str] = []
+        payloads: list[dict] = []
+        written: dict[int, list[str]] = {}
+        for (i, diff, _), enriched_chunks in zip(diffs, enriched):
+            file = files[i]
+            doc_ids, doc_payloads = self._build_payloads(
+                diff.document_id, file["filename"], enriched_chunks
+            )
+            written[i] = doc_ids
+            point_ids.extend(doc_ids)
+            payloads.extend(doc_payloads)
+            results[i] = {
+                "document_id": diff.document_id,
+                "filename": file["filename"],
+                "chunks_created": diff.chunk_count,
+                "chunks_added": diff.added,
+                "chunks_removed": len(diff.removed),
+                "file_size": file["file_size"],
+                "content_hash": file["content_hash"],
+                "chunks_per_second": round(embedding_stats.chunks_per_second, 2),
+            }
+
+        if point_ids:
+            try:
+                latencies = await self._store_in_qdrant(point_ids, vector_matrix, payloads)
+            except Exception:
+                await self._delete_points(point_ids)
+                raise
+            report(
+                "storing",
+                chunks_stored=len(point_ids),
+                upsert_batches=len(latencies),
+                upsert_max_ms=round(max(latencies) * 1000),
+            )
+        # New chunks are stored before old ones go, so a document never disappears mid-update
+        for i, diff, _ in diffs:
+            try:
+                await self._apply_chunk_diff(diff, files[i]["content_hash"])
+            except Exception as e:
+                logger.error(f"Could not finish updating {files[i]['filename']}: {e}")
+                await self._delete_points(written[i])
+                results[i] = e
+
+    async def _process_streaming(self, file: dict, report: ProgressCallback) -> dict:
+        """
+        Ingest one large file as a pipeline of bounded queues.
+
+        Extraction, chunking, enrichment, embedding and upserts run concurrently,
+        so only a few batches of chunks are held in memory at a time and the first
+        chunks are searchable before the last page has been parsed. Chunks already
+        stored for the document are skipped and stale ones deleted at the end.
+
+        Args:
+            file: File to ingest, with path, filename and optional content_hash
+            report: Progress callback
+
+        Returns:
+            Result dict for the file
+        """
+        filename = file["filename"]
+        document_id = document_id_for(document_key_for(file))
+        logger.info(f"Streaming document {filename} with ID {document_id}")
+        diff = ChunkDiff(document_id, await self._load_stored_chunks(document_id))
+
+        start = time.perf_counter()
+        batch_size = settings.EMBEDDING_BATCH_SIZE
+        embed_workers = settings.EMBEDDING_MAX_CONCURRENCY
+        to_enrich: asyncio.Queue[list[tuple[int, str]] | None] = asyncio.Queue(
+            settings.STREAMING_QUEUE_SIZE
+        )
+        to_embed: asyncio.Queue[list[dict] | None] = asyncio.Queue(settings.STREAMING_QUEUE_SIZE)
+        to_store: asyncio.Queue[tuple[list[dict], np.ndarray] | None] = asyncio.Queue(
+            settings.STREAMING_QUEUE_SIZE
+        )
+        counts = {"pages": 0, "chunks_total": 0, "chunks_embedded": 0, "chunks_stored": 0}
+        has_text = False
+        written: list[str] = []
+
+        def select(chunks: list[str]) -> list[tuple[int, str]]:
+            return [
+                (index, chunk)
+                for chunk in chunks
+                if len(chunk.strip()) >= MIN_CHUNK_CHARS and (index := diff.add(chunk)) is not None
+            ]
+
+        async def emit(chunks: list[tuple[int, str]]) -> None:
+            await to_enrich.put(chunks)
+            counts["chunks_total"] += len(chunks)
+            report("streaming", **counts)
+
+        async def produce() -> None:
+            nonlocal has_text
+            chunker = StreamingChunker(self._make_splitter(), settings.STREAMING_BUFFER_CHARS)
+            ready: list[tuple[int, str]] = []
+            async for segment in self.extractor.iter_pages(file["path"], filename):
+                counts["pages"] += 1
+                has_text = has_text or bool(segment.strip())
+                ready.extend(select(chunker.feed(segment)))
+                while len(ready) >= batch_size:
+                    await emit(ready[:batch_size])
+                    ready = ready[batch_size:]
+
+            ready.extend(select(chunker.flush()))
+            if ready:
+                await emit(ready)
+            await to_enrich.put(None)
+
+        async def enrich() -> None:
+            while (chunks := await to_enrich.get()) is not None:
+                enriched = await asyncio.to_thread(
+                    self._enrich_chunks, [chunk for _, chunk in chunks], filename
+                )
+                for (index, _), chunk in zip(chunks, enriched):
+                    chunk["chunk_index"] = index
+                await to_embed.put(enriched)
+            for _ in range(embed_workers):
+                await to_embed.put(None)
+
+        async def embed() -> None:
+            while (enriched := await to_embed.get()) is not None:
+                vectors, _ = await self.embedder.embed([chunk["text"] for chunk in enriched])
+                counts["chunks_embedded"] += len(vectors)
+                await to_store.put((enriched, np.asarray(vectors, dtype=np.float32)))
+            await to_store.put(None)
+
+        async def store() -> None:
+            finished = 0
+            while finished < embed_workers:
+                item = await to_store.get()
+                if item is None:
+                    finished += 1
+                    continue
+                enriched, vectors = item
+                point_ids, payloads = self._build_payloads(document_id, filename, enriched)
+                written.extend(point_ids)
+                await self._store_in_qdrant(point_ids, vectors, payloads)
+                counts["chunks_stored"] += len(point_ids)
+                report("streaming", **counts)
+
+        try:
+            try:
+                async with asyncio.TaskGroup() as group:
+                    group.create_task(produce())
+                    group.create_task(enrich())
+                    for _ in range(embed_workers):
+                        group.create_task(embed())
+                    group.create_task(store())
+            except ExceptionGroup as eg:
+                raise eg.exceptions[0] from None
 
-        self._store_in_qdrant(document_id, filename, enriched_chunks, vectors)
+            if not has_text:
+                raise ValueError("No text extracted from document")
 
+            await self._apply_chunk_diff(diff, file["content_hash"])
+        except Exception:
+            # Without content_hash the partial chunks would not deduplicate a retry, but
+            # they would still be searched; drop them
+            await self._delete_points(written)
+            raise
+
+        elapsed = time.perf_counter() - start
+        chunks_added = counts["chunks_stored"]
+        logger.info(
+            f"Streamed {filename}: {counts['pages']} segments, {diff.chunk_count} chunks "
+            f"({chunks_added} new) in {elapsed:.2f}s"
+        )
         return {
             "document_id": document_id,
             "filename": filename,
-            "chunks_created": len(chunks),
-            "file_size": Path(file_path).stat().st_size,
+            "chunks_created": diff.chunk_count,
+            "chunks_added": chunks_added,
+            "chunks_removed": len(diff.removed),
+            "file_size": file["file_size"],
+            "content_hash": file["content_hash"],
+            "chunks_per_second": round(chunks_added / elapsed, 2) if elapsed > 0 else 0.0,
         }
 
-    def _chunk_text(self, text: str) -> list[str]:
-        splitter = RecursiveCharacterTextSplitter(
+    async def _load_stored_chunks_many(
+        self, document_ids: list[str]
+    ) -> dict[str, dict[str, tuple[str, int]]]:
+        stored = await asyncio.gather(*(self._load_stored_chunks(d) for d in document_ids))
+        return dict(zip(document_ids, stored))
+
+    async def _load_stored_chunks(self, document_id: str) -> dict[str, tuple[str, int]]:
+        """
+        Fetch the chunk hashes already stored for a document.
+
+        Args:
+            document_id: Document to look up
+
+        Returns:
+            Mapping of chunk_hash to (point ID, chunk_index)
+        """
+        document_filter = Filter(
+            must=[FieldCondition(key="document_id", match=MatchValue(value=document_id))]
+        )
+        stored: dict[str, tuple[str, int]] = {}
+        offset = None
+        while True:
+            points, offset = await self.qdrant_client.scroll(
+                collection_name=settings.QDRANT_COLLECTION_NAME,
+                scroll_filter=document_filter,
+                limit=1000,
+                offset=offset,
+                with_payload=["chunk_hash", "chunk_index"],
+                with_vectors=False,
+            )
+            for point in points:
+                payload = point.payload or {}
+                if "chunk_hash" in payload:
+                    stored[payload["chunk_hash"]] = (str(point.id), payload["chunk_index"])
+            if offset is None:
+                return stored
+
+    async def _apply_chunk_diff(self, diff: ChunkDiff, content_hash: str | None) -> None:
+        """
+        Finish storing a document version: reindex moved chunks, delete chunks it no longer
+        has, then mark every chunk with the file's content_hash.
+
+        Deduplication matches content_hash, so it is only written once the whole version
+        is stored; chunks left by a failed run never make a retry look already ingested,
+        and the old hash stops deduplicating uploads of the previous version.
+        """
+        batch_size = settings.QDRANT_UPSERT_BATCH_SIZE
+        operations: list[SetPayloadOperation | DeleteOperation] = []
+
+        for point_id, index in diff.moved.items():
+            operations.append(
+                SetPayloadOperation(
+                    set_payload=SetPayload(payload={"chunk_index": index}, points=[point_id])
+                )
+            )
+        removed = diff.removed
+        for start in range(0, len(removed), batch_size):
+            operations.append(
+                DeleteOperation(delete=PointIdsList(points=removed[start : start + batch_size]))
+            )
+        operations.append(
+            SetPayloadOperation(
+                set_payload=SetPayload(
+                    payload={"content_hash": content_hash},
+                    filter=Filter(
+                        must=[
+                            FieldCondition(
+                                key="document_id", match=MatchValue(value=diff.document_id)
+                            )
+                        ]
+                    ),
+                )
+            )
+        )
+
+        for start in range(0, len(operations), batch_size):
+            await self.qdrant_client.batch_update_points(
+                collection_name=settings.QDRANT_COLLECTION_NAME,
+                update_operations=operations[start : start + batch_size],
+            )
+        await asyncio.to_thread(self.bm25_index.delete, removed)
+        if diff.added or removed:
+            await self._update_document_vector(diff.document_id)
+            bump_corpus_version()
+        if removed or diff.moved:
+            logger.info(
+                f"Document {diff.document_id}: deleted {len(removed)} stale chunks, "
+                f"reindexed {len(diff.moved)}"
+            )
+
+    async def delete_document(self, document_id: str) -> int:
+        """
+        Delete every chunk of a document from Qdrant and the BM25 index.
+
+        Args:
+            document_id: Document to delete
+
+        Returns:
+            Number of chunks deleted
+        """
+        stored = await self._load_stored_chunks(document_id)
+        point_ids = [point_id for point_id, _ in stored.values()]
+        await self._delete_points(point_ids)
+        if point_ids:
+            await self._update_document_vector(document_id)
+            bump_corpus_version()
+        logger.info(f"Deleted document {document_id} ({len(point_ids)} chunks)")
+        return len(point_ids)
+
+    async def _delete_points(self, point_ids: list[str]) -> None:
+        """Delete points from Qdrant and the BM25 index."""
+        for start in range(0, len(point_ids), settings.QDRANT_UPSERT_BATCH_SIZE):
+            await self.qdrant_client.delete(
+                collection_name=settings.QDRANT_COLLECTION_NAME,
+                points_selector=PointIdsList(
+                    points=point_ids[start : start + settings.QDRANT_UPSERT_BATCH_SIZE]
+                ),
+            )
+        await asyncio.to_thread(self.bm25_index.delete, point_ids)
+
+    @staticmethod
+    async def _update_document_vector(document_id: str) -> None:
+        # Only two-level retrieval reads document vectors; switching to it rebuilds them
+        if settings.RETRIEVAL_MODE != "two_level":
+            return
+        # The chunks are stored; a stale centroid only affects two-level retrieval ranking
+        try:
+            await update_document_vector(document_id)
+        except Exception as e:
+            logger.warning(f"Could not update document vector for {document_id}: {e}")
+
+    async def _find_ingested_many(self, keys: set[tuple[str, str]]) -> dict[tuple[str, str], dict]:
+        pairs = list(keys)
+        existing = await asyncio.gather(*(self._find_ingested(*pair) for pair in pairs))
+        return {pair: found for pair, found in zip(pairs, existing) if found}
+
+    @staticmethod
+    def _deduplicated_result(existing: dict, file: dict) -> dict:
+        return {
+            "document_id": existing["document_id"],
+            "chunks_created": existing["chunks_created"],
+            "filename": file["filename"],
+            "file_size": file["file_size"],
+            "content_hash": file["content_hash"],
+            "deduplicated": True,
+        }
+
+    async def _find_ingested(self, content_hash: str, document_id: str) -> dict | None:
+        """
+        Look up a file already stored in full as the given document.
+
+        Args:
+            content_hash: sha256 of the file
+            document_id: Document the file is being ingested as
+
+        Returns:
+            document_id and chunk count, or None if that document has other content
+        """
+        content_filter = Filter(
+            must=[
+                FieldCondition(key="content_hash", match=MatchValue(value=content_hash)),
+                FieldCondition(key="document_id", match=MatchValue(value=document_id)),
+            ]
+        )
+        points, _ = await self.qdrant_client.scroll(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            scroll_filter=content_filter,
+            limit=1,
+            with_payload=["document_id"],
+            with_vectors=False,
+        )
+        if not points or not points[0].payload:
+            return None
+
+        result = await self.qdrant_client.count(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            count_filter=content_filter,
+            exact=True,
+        )
+        return {"document_id": points[0].payload["document_id"], "chunks_created": result.count}
+
+    @staticmethod
+    def _make_splitter() -> RecursiveCharacterTextSplitter:
+        return RecursiveCharacterTextSplitter(
             chunk_size=1200,
             chunk_overlap=240,
             separators=["\n\n", "\n", ". ", "! ", "? ", "; ", ", ", " ", ""],
             length_function=len,
+            add_start_index=True,  # For StreamingChunker; split_text ignores it
         )
-        chunks = splitter.split_text(text)
 
-        chunks = [chunk for chunk in chunks if len(chunk.strip()) >= 100]
+    def _chunk_text(self, text: str) -> list[str]:
+        chunks = self._make_splitter().split_text(text)
+
+        chunks = [chunk for chunk in chunks if len(chunk.strip()) >= MIN_CHUNK_CHARS]
 
         logger.info(
             f"Chunked into {len(chunks)} pieces, avg size: {
@@ -65,47 +698,58 @@ class DocumentProcessor:
         return chunks
 
     def _enrich_chunks(self, chunks: list[str], filename: str) -> list[dict]:
-        enriched = []
-        file_ext = Path(filename).suffix.lower()
-
-        for i, chunk in enumerate(chunks):
-            doc = self.nlp(chunk)
-
-            entities = []
-            entity_labels = []
-            for ent in doc.ents:
-                entities.append(ent.text)
-                entity_labels.append(ent.label_)
-
-            keywords = [
-                token.text
-                for token in doc
-                if token.pos_ in {"NOUN", "PROPN"} and not token.is_stop and len(token.text) > 2
-            ]
+        return self._enrich_documents([(filename, chunks)])[0]
 
-            enriched.append(
-                {
-                    "text": chunk,
-                    "chunk_index": i,
-                    "chunk_length": len(chunk),
-                    "entities": entities[:10],
-                    "entity_types": entity_labels[:10],
-                    "keywords": list(set(keywords))[:15],
-                    "file_extension": file_ext,
-                }
-            )
+    def _enrich_documents(self, documents: list[tuple[str, list[str]]]) -> list[list[dict]]:
+        all_chunks = [chunk for _, chunks in documents for chunk in chunks]
+        docs = self.nlp.pipe(
+            all_chunks, batch_size=settings.SPACY_BATCH_SIZE, n_process=settings.SPACY_N_PROCESS
+        )
+
+        enriched_documents = []
+        for filename, chunks in documents:
+            enriched = []
+            file_ext = Path(filename).suffix.lower()
+
+            for i, (chunk, doc) in enumerate(zip(chunks, docs)):
+                # Lowercased so filters match regardless of case (build_filter lowercases too)
+                entity_labels: dict[str, str] = {}
+                for ent in doc.ents:
+                    entity_labels.setdefault(ent.text.lower(), ent.label_)
+
+                # Most frequent first, ties in order of appearance
+                keywords = Counter(
+                    token.text.lower()
+                    for token in doc
+                    if token.pos_ in {"NOUN", "PROPN"} and not token.is_stop and len(token.text) > 2
+                )
+
+                enriched.append(
+                    {
+                        "text": chunk,
+                        "chunk_index": i,
+                        "chunk_length": len(chunk),
+                        "entities": list(entity_labels)[:10],
+                        "entity_types": list(entity_labels.values())[:10],
+                        "keywords": [keyword for keyword, _ in keywords.most_common(15)],
+                        "lemmas": index_terms(chunk, doc),
+                        "file_extension": file_ext,
+                    }
+                )
+
+            enriched_documents.append(enriched)
 
-        return enriched
+        return enriched_documents
 
-    def _store_in_qdrant(
+    def _build_payloads(
         self,
         document_id: str,
         filename: str,
         enriched_chunks: list[dict],
-        vectors: list[list[float]],
-    ):
-        points = []
-        for chunk_data, vector in zip(enriched_chunks, vectors):
+    ) -> tuple[list[str], list[dict]]:
+        point_ids = []
+        payloads = []
+        for chunk_data in enriched_chunks:
             payload = {
                 "document_id": document_id,
                 "filename": filename,
@@ -115,16 +759,91 @@ class DocumentProcessor:
                 "entities": chunk_data["entities"],
                 "entity_types": chunk_data["entity_types"],
                 "keywords": chunk_data["keywords"],
+                "lemmas": chunk_data["lemmas"],  # BM25 terms, reused at query time
                 "file_extension": chunk_data["file_extension"],
+                # content_hash is set by _apply_chunk_diff once the document is complete
+                "content_hash": None,
+                "chunk_hash": chunk_hash(chunk_data["text"]),
             }
 
-            points.append(
-                PointStruct(
-                    id=str(uuid.uuid4()),
-                    vector=vector,
-                    payload=payload,
-                )
+            point_ids.append(point_id_for(document_id, payload["chunk_hash"]))
+            payloads.append(payload)
+
+        return point_ids, payloads
+
+    async def _store_in_qdrant(
+        self, point_ids: list[str], vectors: np.ndarray, payloads: list[dict]
+    ) -> list[float]:
+        """
+        Upsert points in batches, several in flight on the pooled async client.
+
+        On hybrid collections each point also gets a sparse BM25 vector built from
+        its payload lemmas. The local BM25 index is updated only for client-side
+        hybrid search.
+
+        Every batch but the last is sent with wait=False; the last one waits until
+        applied. Qdrant applies a shard's updates in order, so on our single-shard
+        collection it is a barrier for the earlier batches too.
+
+        Args:
+            point_ids: Point IDs
+            vectors: float32 matrix, one row per point
+            payloads: Point payloads
+
+        Returns:
+            Latency of each upsert batch in seconds
+        """
+        batch_size = settings.QDRANT_UPSERT_BATCH_SIZE
+        bounds = [
+            (start, min(start + batch_size, len(point_ids)))
+            for start in range(0, len(point_ids), batch_size)
+        ]
+        semaphore = asyncio.Semaphore(settings.QDRANT_UPSERT_CONCURRENCY)
+        latencies: list[float] = []
+        layout = get_collection_layout()
+
+        def batch_vectors(start: int, end: int):
+            if not layout.dense:
+                return vectors[start:end]
+            named = {layout.dense: vectors[start:end]}
+            if layout.sparse:
+                named[layout.sparse] = [
+                    sparse_document_vector(payload["lemmas"]) for payload in payloads[start:end]
+                ]
+            return named
+
+        async def upsert(start: int, end: int, wait: bool) -> float:
+            batch_start = time.perf_counter()
+            await self.qdrant_client.upsert(
+                collection_name=settings.QDRANT_COLLECTION_NAME,
+                points=Batch(
+                    ids=point_ids[start:end],
+                    vectors=batch_vectors(start, end),
+                    payloads=payloads[start:end],
+                ),
+                wait=wait,
             )
+            return time.perf_counter() - batch_start
+
+        async def send(start: int, end: int, wait: bool) -> None:
+            async with semaphore:
+                latency = await upsert(start, end, wait)
+            latencies.append(latency)
+            logger.debug(f"Upserted points {start}-{end} in {latency * 1000:.0f} ms")
+
+        await asyncio.gather(*(send(start, end, False) for start, end in bounds[:-1]))
+        await send(*bounds[-1], True)
 
-        self.qdrant_client.upsert(collection_name=settings.QDRANT_COLLECTION_NAME, points=points)
-        logger.info(f"Stored {len(points)} enriched points in Qdrant")
+        logger.info(
+            f"Stored {len(point_ids)} enriched points in Qdrant in {len(bounds)} batches "
+            f"(avg {sum(latencies) / len(latencies) * 1000:.0f} ms, "
+            f"max {max(latencies) * 1000:.0f} ms per batch)"
+        )
+
+        # With server hybrid the sparse vectors serve keyword search; the local index is
+        # only read by client-side fusion
+        if not use_server_hybrid():
+            await asyncio.to_thread(
+                self.bm25_index.add, point_ids, [payload["lemmas"] for payload in payloads]
+            )
+        return latencies
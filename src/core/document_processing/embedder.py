@@ -0,0 +1,164 @@
+import asyncio
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from langchain_openai import OpenAIEmbeddings
+
+from src.config import get_settings
+from src.core.document_processing.embedding_cache import EmbeddingCache
+from src.utils.logger import logger
+
+settings = get_settings()
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 chars per token for English text; good enough to keep requests under the API limit
+    return len(text) // 4 + 1
+
+
+@dataclass
+class EmbeddingStats:
+    chunks: int
+    batches: int
+    retries: int
+    elapsed_s: float
+    cache_hits: int = 0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+class BatchEmbedder:
+    """Embeds texts in size- and token-bounded batches with bounded concurrency."""
+
+    def __init__(
+        self,
+        embeddings: OpenAIEmbeddings,
+        batch_size: int | None = None,
+        max_batch_tokens: int | None = None,
+        max_concurrency: int | None = None,
+        max_retries: int | None = None,
+        cache: EmbeddingCache | None = None,
+    ):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.max_batch_tokens = max_batch_tokens or settings.EMBEDDING_BATCH_MAX_TOKENS
+        self.max_concurrency = max_concurrency or settings.EMBEDDING_MAX_CONCURRENCY
+        self.max_retries = (
+            max_retries if max_retries is not None else settings.EMBEDDING_MAX_RETRIES
+        )
+
+    def make_batches(self, texts: list[str]) -> list[list[int]]:
+        """
+        Group text indices into batches bounded by count and estimated tokens.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List of batches, each a list of indices into texts
+        """
+        batches: list[list[int]] = []
+        current: list[int] = []
+        current_tokens = 0
+
+        for i, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if current and (
+                len(current) >= self.batch_size or current_tokens + tokens > self.max_batch_tokens
+            ):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(i)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+
+        return batches
+
+    async def embed(
+        self, texts: list[str], on_progress: Callable[[int], None] | None = None
+    ) -> tuple[list[list[float]], EmbeddingStats]:
+        """
+        Embed texts, keeping up to max_concurrency batches in flight.
+
+        Texts found in the cache are not sent to the embeddings API; newly
+        computed vectors are written back to it.
+
+        Args:
+            texts: Texts to embed
+            on_progress: Optional callback receiving the number of texts embedded so far
+
+        Returns:
+            Tuple of (vectors in input order, embedding stats)
+        """
+        start = time.perf_counter()
+
+        cached = self.cache.get_many(texts) if self.cache else {}
+        missing = [i for i in range(len(texts)) if i not in cached]
+        missing_texts = [texts[i] for i in missing]
+
+        batches = self.make_batches(missing_texts)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        retries = [0] * len(batches)
+        done = len(cached)
+
+        async def run_batch(batch_no: int, indices: list[int]) -> list[list[float]]:
+            nonlocal done
+            batch_texts = [missing_texts[i] for i in indices]
+            async with semaphore:
+                while True:
+                    try:
+                        batch_vectors = await self.embeddings.aembed_documents(batch_texts)
+                    except Exception as e:
+                        if retries[batch_no] >= self.max_retries:
+                            logger.error(
+                                f"Embedding batch {batch_no} failed after "
+                                f"{retries[batch_no] + 1} attempts: {e}"
+                            )
+                            raise
+                        delay = 0.5 * 2 ** retries[batch_no]
+                        retries[batch_no] += 1
+                        logger.warning(
+                            f"Embedding batch {batch_no} failed ({e}), retrying in {delay:.1f}s"
+                        )
+                        await asyncio.sleep(delay)
+                        continue
+
+                    done += len(batch_vectors)
+                    if on_progress:
+                        on_progress(done)
+                    return batch_vectors
+
+        results = await asyncio.gather(
+            *(run_batch(batch_no, indices) for batch_no, indices in enumerate(batches))
+        )
+
+        vectors: list[list[float]] = [[] for _ in texts]
+        for i, vector in cached.items():
+            vectors[i] = vector
+        for indices, batch_vectors in zip(batches, results):
+            for i, vector in zip(indices, batch_vectors):
+                vectors[missing[i]] = vector
+
+        if self.cache and missing:
+            self.cache.put_many(missing_texts, [vectors[i] for i in missing])
+
+        stats = EmbeddingStats(
+            chunks=len(texts),
+            batches=len(batches),
+            retries=sum(retries),
+            elapsed_s=time.perf_counter() - start,
+            cache_hits=len(cached),
+        )
+        logger.info(
+            f"Embedded {stats.chunks} chunks ({stats.cache_hits} from cache) in "
+            f"{stats.batches} batches ({stats.retries} retries) in {stats.elapsed_s:.2f}s "
+            f"({stats.chunks_per_second:.1f} chunks/s)"
+        )
+        return vectors, stats
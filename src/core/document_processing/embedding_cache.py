@@ -0,0 +1,86 @@
+import hashlib
+import sqlite3
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+
+import numpy as np
+
+from src.config import get_settings
+from src.utils.logger import logger
+
+settings = get_settings()
+
+
+class EmbeddingCache:
+    """Persistent chunk-embedding cache backed by SQLite, vectors stored as float32 blobs."""
+
+    def __init__(self, path: str, model: str, dimension: int):
+        self.model = model
+        self.dimension = dimension
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = Lock()
+
+    def key(self, text: str) -> str:
+        """Content address of a chunk for the configured model and dimension."""
+        digest = hashlib.sha256()
+        digest.update(f"{self.model}\x00{self.dimension}\x00".encode())
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get_many(self, texts: list[str]) -> dict[int, list[float]]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            texts: Chunk texts
+
+        Returns:
+            Mapping of index into texts to cached vector, for hits only
+        """
+        keys = [self.key(text) for text in texts]
+        found: dict[str, bytes] = {}
+
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update(rows)
+
+        return {
+            i: np.frombuffer(found[key], dtype=np.float32).tolist()
+            for i, key in enumerate(keys)
+            if key in found
+        }
+
+    def put_many(self, texts: list[str], vectors: list[list[float]]) -> None:
+        rows = [
+            (self.key(text), np.asarray(vector, dtype=np.float32).tobytes())
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache | None:
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return None
+
+    path = str(Path(settings.DATA_DIR) / "embedding_cache.sqlite3")
+    logger.info(f"Using embedding cache at {path}")
+    return EmbeddingCache(path, settings.EMBEDDING_MODEL, settings.EMBEDDING_DIMENSION)
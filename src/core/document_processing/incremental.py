@@ -0,0 +1,85 @@
+import hashlib
+import uuid
+
+# Fixed namespace so IDs are stable across processes and deployments
+ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "doc-research-agent")
+
+
+def document_id_for(document_key: str) -> str:
+    """
+    Stable document ID for a source; ingesting under the same key updates that document.
+
+    An upload whose key matches an existing document replaces its chunks, so unrelated
+    files must not share a key.
+    """
+    return str(uuid.uuid5(ID_NAMESPACE, document_key))
+
+
+def document_key_for(file: dict) -> str:
+    """The key that identifies a file's document: its document_key, else its filename."""
+    return file.get("document_key") or file["filename"]
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def point_id_for(document_id: str, text_hash: str) -> str:
+    return str(uuid.uuid5(ID_NAMESPACE, f"{document_id}/{text_hash}"))
+
+
+class ChunkDiff:
+    """Compares a document's chunks, fed in order, against the chunks already stored for it."""
+
+    def __init__(self, document_id: str, stored: dict[str, tuple[str, int]]):
+        """
+        Args:
+            document_id: Document being ingested
+            stored: Stored chunks of the document, chunk_hash -> (point ID, chunk_index)
+        """
+        self.document_id = document_id
+        self.stored = stored
+        self.chunk_count = 0
+        self.kept: list[str] = []
+        self.moved: dict[str, int] = {}
+        self._seen: set[str] = set()
+
+    def add(self, text: str) -> int | None:
+        """
+        Record the next chunk of the new version.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            The chunk's index if it has to be embedded and stored, None if it is
+            already stored or repeats an earlier chunk of this document
+        """
+        text_hash = chunk_hash(text)
+        if text_hash in self._seen:
+            return None
+        self._seen.add(text_hash)
+
+        index = self.chunk_count
+        self.chunk_count += 1
+
+        if text_hash in self.stored:
+            point_id, stored_index = self.stored[text_hash]
+            self.kept.append(point_id)
+            if stored_index != index:
+                self.moved[point_id] = index
+            return None
+        return index
+
+    @property
+    def added(self) -> int:
+        return self.chunk_count - len(self.kept)
+
+    @property
+    def removed(self) -> list[str]:
+        """Point IDs of stored chunks that are not in the new version."""
+        return [
+            point_id
+            for text_hash, (point_id, _) in self.stored.items()
+            if text_hash not in self._seen
+        ]
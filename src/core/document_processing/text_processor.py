@@ -1,3 +1,9 @@
+import asyncio
+import multiprocessing
+import os
+from collections import deque
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
 from functools import lru_cache
 from pathlib import Path
 
@@ -6,49 +12,185 @@ import pdfplumber
 import spacy
 from docx import Document as DocxDocument
 
+from src.config import get_settings
 from src.utils.logger import logger
 
+settings = get_settings()
+
+_extraction_pool: ProcessPoolExecutor | None = None
+
+
+# Enrichment needs NER, POS tags and lemmas; the dependency parser is never used
+ENRICHMENT_EXCLUDED_COMPONENTS = ["parser"]
+
 
 @lru_cache(maxsize=1)
 def get_spacy_model():
     try:
-        nlp = spacy.load("en_core_web_sm")
-        logger.info("Loaded spaCy model: en_core_web_sm")
+        nlp = spacy.load("en_core_web_sm", exclude=ENRICHMENT_EXCLUDED_COMPONENTS)
+        logger.info(f"Loaded spaCy model: en_core_web_sm (pipeline: {nlp.pipe_names})")
         return nlp
     except OSError:
         logger.error("spaCy model not found.")
         raise
 
 
+def extraction_workers() -> int:
+    return settings.EXTRACTION_WORKERS or os.cpu_count() or 1
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """Get or create the shared worker pool for CPU-bound text extraction."""
+    global _extraction_pool
+    if _extraction_pool is None:
+        workers = extraction_workers()
+        # spawn: forking a process that already runs an event loop and threads is unsafe
+        _extraction_pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"Started extraction pool with {workers} workers")
+    return _extraction_pool
+
+
+def shutdown_extraction_pool() -> None:
+    global _extraction_pool
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown(wait=False, cancel_futures=True)
+        _extraction_pool = None
+        logger.info("Extraction pool shut down")
+
+
+def _count_pdf_pages(file_path: str) -> int:
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_pdf_page_range(file_path: str, start: int, end: int) -> list[str]:
+    # pdfplumber page numbers are 1-based; only the requested pages are parsed
+    with pdfplumber.open(file_path, pages=list(range(start + 1, end + 1))) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages]
+
+
+def _extract_docx_paragraphs(file_path: str) -> list[str]:
+    doc = DocxDocument(file_path)
+    return [para.text for para in doc.paragraphs]
+
+
 class TextExtractor:
     @staticmethod
     async def extract_from_file(file_path: str, filename: str) -> str:
+        pages = await TextExtractor.extract_pages(file_path, filename)
+        return "\n".join(page for page in pages if page)
+
+    @staticmethod
+    async def extract_pages(file_path: str, filename: str) -> list[str]:
+        """
+        Extract text as a list of pages in document order.
+
+        PDFs yield one entry per page (empty string for pages without text), DOCX
+        files a single entry and TXT files a single entry.
+
+        Args:
+            file_path: Path of the file on disk
+            filename: Original filename, used to pick the extractor
+
+        Returns:
+            List of page texts
+        """
         ext = Path(filename).suffix.lower()
 
         if ext == ".pdf":
-            return TextExtractor._extract_pdf(file_path)
+            return await TextExtractor._extract_pdf(file_path)
         elif ext == ".docx":
-            return TextExtractor._extract_docx(file_path)
+            return [await TextExtractor._extract_docx(file_path)]
         elif ext == ".txt":
-            return await TextExtractor._extract_txt(file_path)
+            return [await TextExtractor._extract_txt(file_path)]
         else:
             raise ValueError(f"Unsupported file type: {ext}")
 
     @staticmethod
-    def _extract_pdf(file_path: str) -> str:
-        text = ""
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        logger.info(f"Extracted {len(text)} chars from PDF")
-        return text
+    async def iter_pages(file_path: str, filename: str) -> AsyncIterator[str]:
+        """
+        Stream a document as consecutive text segments, in order.
+
+        Concatenating the segments gives the same text as extract_from_file. PDF
+        page ranges are parsed in the pool a few ranges ahead of the consumer;
+        TXT files are read in fixed-size blocks.
+
+        Args:
+            file_path: Path of the file on disk
+            filename: Original filename, used to pick the extractor
+
+        Yields:
+            Text segments
+        """
+        ext = Path(filename).suffix.lower()
+
+        if ext == ".pdf":
+            async for page in TextExtractor._iter_pdf_pages(file_path):
+                if page:
+                    yield page + "\n"
+        elif ext == ".txt":
+            async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
+                while block := await f.read(settings.STREAMING_BUFFER_CHARS):
+                    yield block
+        else:
+            for page in await TextExtractor.extract_pages(file_path, filename):
+                yield page
+
+    @staticmethod
+    async def _iter_pdf_pages(file_path: str) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        pool = get_extraction_pool()
+
+        page_count = await loop.run_in_executor(pool, _count_pdf_pages, file_path)
+        step = settings.EXTRACTION_PAGES_PER_TASK
+        max_in_flight = extraction_workers()
+        in_flight: deque[asyncio.Future[list[str]]] = deque()
+
+        for start in range(0, page_count, step):
+            end = min(start + step, page_count)
+            in_flight.append(
+                loop.run_in_executor(pool, _extract_pdf_page_range, file_path, start, end)
+            )
+            if len(in_flight) >= max_in_flight:
+                for page in await in_flight.popleft():
+                    yield page
+
+        while in_flight:
+            for page in await in_flight.popleft():
+                yield page
+
+    @staticmethod
+    async def _extract_pdf(file_path: str) -> list[str]:
+        loop = asyncio.get_running_loop()
+        pool = get_extraction_pool()
+
+        page_count = await loop.run_in_executor(pool, _count_pdf_pages, file_path)
+        step = settings.EXTRACTION_PAGES_PER_TASK
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, _extract_pdf_page_range, file_path, start, end)
+                for start, end in ranges
+            )
+        )
+        pages = [page for page_range in results for page in page_range]
+
+        logger.info(
+            f"Extracted {sum(len(p) for p in pages)} chars from {page_count} PDF pages "
+            f"in {len(ranges)} tasks"
+        )
+        return pages
 
     @staticmethod
-    def _extract_docx(file_path: str) -> str:
-        doc = DocxDocument(file_path)
-        text = "\n".join(para.text for para in doc.paragraphs)
+    async def _extract_docx(file_path: str) -> str:
+        loop = asyncio.get_running_loop()
+        paragraphs = await loop.run_in_executor(
+            get_extraction_pool(), _extract_docx_paragraphs, file_path
+        )
+        text = "\n".join(paragraphs)
         logger.info(f"Extracted {len(text)} chars from DOCX")
         return text
 
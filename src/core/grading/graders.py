@@ -1,3 +1,4 @@
+import json
 from typing import Literal
 
 from langchain_openai import ChatOpenAI
@@ -5,6 +6,7 @@ from pydantic import BaseModel, Field, SecretStr
 
 from src.config import get_settings
 from src.core import prompts
+from src.core.caching.llm_memo import get_llm_memo
 from src.utils.logger import logger
 
 settings = get_settings()
@@ -26,6 +28,10 @@ class GradeHallucinations(BaseModel):
     )
 
 
+class QueryVariants(BaseModel):
+    queries: list[str] = Field(description="Search phrases, the direct rewrite first")
+
+
 class GradeAnswer(BaseModel):
     binary_score: Literal["yes", "no"] = Field(
         description="Answer resolves question, 'yes' or 'no'"
@@ -54,101 +60,186 @@ def get_llm():
 
 
 def route_question(question: str) -> str:
-    llm = get_llm()
-    structured_llm = llm.with_structured_output(RouteQuery)  # type: ignore[misc]
+    def route() -> str:
+        llm = get_llm()
+        structured_llm = llm.with_structured_output(RouteQuery)  # type: ignore[misc]
 
-    messages = [
-        {"role": "system", "content": prompts.ROUTER_SYSTEM_PROMPT},
-        {"role": "user", "content": prompts.ROUTER_USER_PROMPT.format(question=question)},
-    ]
+        messages = [
+            {"role": "system", "content": prompts.ROUTER_SYSTEM_PROMPT},
+            {"role": "user", "content": prompts.ROUTER_USER_PROMPT.format(question=question)},
+        ]
 
-    result: RouteQuery = structured_llm.invoke(messages)  # type: ignore[assignment]
+        result: RouteQuery = structured_llm.invoke(messages)  # type: ignore[assignment]
+        return result.datasource
 
-    logger.info(f"Routed question to: {result.datasource}")
-    return result.datasource
+    datasource = get_llm_memo().cached(
+        "route_question",
+        prompts.ROUTER_SYSTEM_PROMPT + prompts.ROUTER_USER_PROMPT,
+        (question,),
+        route,
+    )
+
+    logger.info(f"Routed question to: {datasource}")
+    return datasource
 
 
 def grade_documents_batch(question: str, documents: list[str]) -> list[str]:
     if not documents:
         return []
 
-    llm = get_llm()
-    structured_llm = llm.with_structured_output(GradeDocuments)  # type: ignore[misc]
+    def grade(pairs: list[tuple[str, ...]]) -> list[str]:
+        llm = get_llm()
+        structured_llm = llm.with_structured_output(GradeDocuments)  # type: ignore[misc]
+
+        batch_messages = []
+        for pair_question, document in pairs:
+            messages = [
+                {"role": "system", "content": prompts.DOCUMENT_GRADER_SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": prompts.DOCUMENT_GRADER_USER_PROMPT.format(
+                        question=pair_question, document=document
+                    ),
+                },
+            ]
+            batch_messages.append(messages)
+
+        results = structured_llm.batch(batch_messages)
+        return [result.binary_score for result in results]  # type: ignore[attr-defined]
+
+    # Only (question, chunk) pairs not graded before reach the LLM batch
+    scores = get_llm_memo().cached_many(
+        "grade_documents",
+        prompts.DOCUMENT_GRADER_SYSTEM_PROMPT + prompts.DOCUMENT_GRADER_USER_PROMPT,
+        [(question, document) for document in documents],
+        grade,
+    )
+    logger.info(f"Batch graded {len(documents)} documents: {scores.count('yes')} relevant")
+
+    return scores
+
+
+def check_hallucination(documents: list[str], generation: str) -> str:
+    docs_text = "\n\n".join(documents)
+
+    def check() -> str:
+        llm = get_llm()
+        structured_llm = llm.with_structured_output(GradeHallucinations)  # type: ignore[misc]
 
-    batch_messages = []
-    for document in documents:
         messages = [
-            {"role": "system", "content": prompts.DOCUMENT_GRADER_SYSTEM_PROMPT},
+            {"role": "system", "content": prompts.HALLUCINATION_GRADER_SYSTEM_PROMPT},
             {
                 "role": "user",
-                "content": prompts.DOCUMENT_GRADER_USER_PROMPT.format(
-                    question=question, document=document
+                "content": prompts.HALLUCINATION_GRADER_USER_PROMPT.format(
+                    documents=docs_text, generation=generation
                 ),
             },
         ]
-        batch_messages.append(messages)
 
-    results = structured_llm.batch(batch_messages)
+        result: GradeHallucinations = structured_llm.invoke(messages)  # type: ignore[assignment]
+        return result.binary_score
 
-    scores = [result.binary_score for result in results]  # type: ignore[attr-defined]
-    logger.info(f"Batch graded {len(documents)} documents: {scores.count('yes')} relevant")
+    score = get_llm_memo().cached(
+        "check_hallucination",
+        prompts.HALLUCINATION_GRADER_SYSTEM_PROMPT + prompts.HALLUCINATION_GRADER_USER_PROMPT,
+        (docs_text, generation),
+        check,
+    )
 
-    return scores
+    logger.info(f"Hallucination check: {score}")
+    return score
 
 
-def check_hallucination(documents: list[str], generation: str) -> str:
-    llm = get_llm()
-    structured_llm = llm.with_structured_output(GradeHallucinations)  # type: ignore[misc]
+def grade_answer_quality(question: str, generation: str) -> str:
+    def grade() -> str:
+        llm = get_llm()
+        structured_llm = llm.with_structured_output(GradeAnswer)  # type: ignore[misc]
 
-    docs_text = "\n\n".join(documents)
+        messages = [
+            {"role": "system", "content": prompts.ANSWER_GRADER_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": prompts.ANSWER_GRADER_USER_PROMPT.format(
+                    question=question, generation=generation
+                ),
+            },
+        ]
 
-    messages = [
-        {"role": "system", "content": prompts.HALLUCINATION_GRADER_SYSTEM_PROMPT},
-        {
-            "role": "user",
-            "content": prompts.HALLUCINATION_GRADER_USER_PROMPT.format(
-                documents=docs_text, generation=generation
-            ),
-        },
-    ]
+        result: GradeAnswer = structured_llm.invoke(messages)  # type: ignore[assignment]
+        return result.binary_score
 
-    result: GradeHallucinations = structured_llm.invoke(messages)  # type: ignore[assignment]
+    score = get_llm_memo().cached(
+        "grade_answer_quality",
+        prompts.ANSWER_GRADER_SYSTEM_PROMPT + prompts.ANSWER_GRADER_USER_PROMPT,
+        (question, generation),
+        grade,
+    )
 
-    logger.info(f"Hallucination check: {result.binary_score}")
-    return result.binary_score
+    logger.info(f"Answer quality: {score}")
+    return score
 
 
-def grade_answer_quality(question: str, generation: str) -> str:
-    llm = get_llm()
-    structured_llm = llm.with_structured_output(GradeAnswer)  # type: ignore[misc]
+def rewrite_query(question: str) -> str:
+    def rewrite() -> str:
+        llm = get_llm()
 
-    messages = [
-        {"role": "system", "content": prompts.ANSWER_GRADER_SYSTEM_PROMPT},
-        {
-            "role": "user",
-            "content": prompts.ANSWER_GRADER_USER_PROMPT.format(
-                question=question, generation=generation
-            ),
-        },
-    ]
+        messages = [
+            {"role": "system", "content": prompts.QUERY_REWRITER_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": prompts.QUERY_REWRITER_USER_PROMPT.format(question=question),
+            },
+        ]
 
-    result: GradeAnswer = structured_llm.invoke(messages)  # type: ignore[assignment]
+        result = llm.invoke(messages)
+        return result.content if isinstance(result.content, str) else str(result.content)
 
-    logger.info(f"Answer quality: {result.binary_score}")
-    return result.binary_score
+    rewritten = get_llm_memo().cached(
+        "rewrite_query",
+        prompts.QUERY_REWRITER_SYSTEM_PROMPT + prompts.QUERY_REWRITER_USER_PROMPT,
+        (question,),
+        rewrite,
+    )
 
+    logger.info(f"Rewritten query: {question} -> {rewritten}")
+    return rewritten
 
-def rewrite_query(question: str) -> str:
-    llm = get_llm()
 
-    messages = [
-        {"role": "system", "content": prompts.QUERY_REWRITER_SYSTEM_PROMPT},
-        {"role": "user", "content": prompts.QUERY_REWRITER_USER_PROMPT.format(question=question)},
-    ]
+def generate_query_variants(question: str, count: int) -> list[str]:
+    """
+    Rewrite a question into several search phrases with one LLM call.
 
-    result = llm.invoke(messages)
+    Args:
+        question: User question
+        count: Number of phrases to ask for
 
-    rewritten = result.content if isinstance(result.content, str) else str(result.content)
+    Returns:
+        Up to count distinct phrases, the direct rewrite first
+    """
 
-    logger.info(f"Rewritten query: {question} -> {rewritten}")
-    return rewritten
+    def generate() -> str:
+        llm = get_llm()
+        structured_llm = llm.with_structured_output(QueryVariants)  # type: ignore[misc]
+
+        messages = [
+            {"role": "system", "content": prompts.MULTI_QUERY_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": prompts.MULTI_QUERY_USER_PROMPT.format(question=question, count=count),
+            },
+        ]
+
+        result: QueryVariants = structured_llm.invoke(messages)  # type: ignore[assignment]
+        return json.dumps(result.queries)
+
+    generated = get_llm_memo().cached(
+        "generate_query_variants",
+        prompts.MULTI_QUERY_SYSTEM_PROMPT + prompts.MULTI_QUERY_USER_PROMPT,
+        (question, str(count)),
+        generate,
+    )
+
+    variants = list(dict.fromkeys(q.strip() for q in json.loads(generated) if q.strip()))
+    variants = variants[:count] or [question]
+    logger.info(f"Query variants: {question} -> {variants}")
+    return variants
@@ -0,0 +1,115 @@
+import hashlib
+import tarfile
+import uuid
+import zipfile
+from pathlib import Path
+from typing import IO, Any
+
+from src.utils.logger import logger
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class ArchiveTooLargeError(ValueError):
+    """Raised when an archive expands past the configured limits."""
+
+
+def is_archive(filename: str) -> bool:
+    return filename.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def extract_archive(
+    archive_path: Path,
+    archive_name: str,
+    dest_dir: Path,
+    allowed_extensions: set[str],
+    max_bytes: int,
+    max_files: int,
+) -> tuple[list[dict[str, Any]], list[dict[str, str]]]:
+    """
+    Unpack supported documents from a zip or tar archive.
+
+    Members are written under random names in dest_dir (never at their archive
+    path, so traversal entries are harmless) and hashed while being copied.
+
+    Args:
+        archive_path: Archive on disk
+        archive_name: Original archive filename, used to label members
+        dest_dir: Directory to write extracted files to
+        allowed_extensions: Document extensions to keep
+        max_bytes: Limit on total uncompressed bytes written
+        max_files: Limit on number of extracted documents
+
+    Returns:
+        Tuple of (extracted files with path, filename, content_hash and file_size,
+            skipped members)
+    """
+    extracted: list[dict[str, Any]] = []
+    skipped: list[dict[str, str]] = []
+    written = 0
+
+    def copy_member(name: str, source: IO[bytes]) -> None:
+        nonlocal written
+        ext = Path(name).suffix.lower()
+        if ext not in allowed_extensions:
+            skipped.append({"filename": name, "reason": f"Unsupported file type: {ext}"})
+            return
+        if len(extracted) >= max_files:
+            raise ArchiveTooLargeError(f"{archive_name} contains more than {max_files} documents")
+
+        file_path = dest_dir / f"{uuid.uuid4()}{ext}"
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            with open(file_path, "wb") as out:
+                while chunk := source.read(_COPY_CHUNK_SIZE):
+                    written += len(chunk)
+                    size += len(chunk)
+                    if written > max_bytes:
+                        raise ArchiveTooLargeError(
+                            f"{archive_name} expands to more than {max_bytes // (1024 * 1024)} MB"
+                        )
+                    hasher.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            file_path.unlink(missing_ok=True)
+            raise
+
+        extracted.append(
+            {
+                "path": str(file_path),
+                "filename": f"{archive_name}/{name}",
+                "content_hash": hasher.hexdigest(),
+                "file_size": size,
+            }
+        )
+
+    try:
+        if archive_name.lower().endswith(".zip"):
+            with zipfile.ZipFile(archive_path) as archive:
+                for info in archive.infolist():
+                    if info.is_dir():
+                        continue
+                    with archive.open(info) as source:
+                        copy_member(info.filename, source)
+        else:
+            with tarfile.open(archive_path, "r:*") as archive:
+                for member in archive:
+                    # Regular files only: links and devices are never followed
+                    if not member.isfile():
+                        continue
+                    source = archive.extractfile(member)
+                    if source is not None:
+                        copy_member(member.name, source)
+    except BaseException:
+        for file in extracted:
+            Path(file["path"]).unlink(missing_ok=True)
+        raise
+
+    logger.info(
+        f"Extracted {len(extracted)} documents ({written} bytes) from {archive_name}, "
+        f"skipped {len(skipped)} members"
+    )
+    return extracted, skipped
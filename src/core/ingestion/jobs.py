@@ -0,0 +1,304 @@
+import asyncio
+import json
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+import aiofiles.os
+
+from src.config import get_settings
+from src.core.document_processing.document_processor import DocumentProcessor
+from src.utils.logger import logger
+
+settings = get_settings()
+
+
+class QueueFullError(Exception):
+    """Raised when the ingestion queue is at capacity."""
+
+
+class JobStore:
+    """SQLite-backed ingestion job queue; jobs survive process restarts."""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                files TEXT NOT NULL,
+                progress TEXT NOT NULL DEFAULT '{}',
+                timings TEXT NOT NULL DEFAULT '{}',
+                results TEXT NOT NULL DEFAULT '[]',
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._conn.commit()
+        self._lock = Lock()
+
+    def create(self, files: list[dict[str, Any]]) -> str:
+        """
+        Enqueue a job.
+
+        Args:
+            files: Files to ingest, each with path, filename, content_hash, file_size and
+                optional document_key
+
+        Returns:
+            New job ID
+        """
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, stage, files, created_at, updated_at) "
+                "VALUES (?, 'queued', 'queued', ?, ?, ?)",
+                (job_id, json.dumps(files), now, now),
+            )
+            self._conn.commit()
+        return job_id
+
+    def claim_next(self) -> dict[str, Any] | None:
+        """Atomically mark the oldest queued job as running and return it."""
+        with self._lock:
+            row = self._conn.execute(
+                "UPDATE jobs SET status = 'running', updated_at = ? "
+                "WHERE id = (SELECT id FROM jobs WHERE status = 'queued' "
+                "ORDER BY created_at LIMIT 1) RETURNING *",
+                (time.time(),),
+            ).fetchone()
+            self._conn.commit()
+        return self._to_dict(row) if row else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        columns = []
+        values = []
+        for name, value in fields.items():
+            columns.append(f"{name} = ?")
+            values.append(json.dumps(value) if name in _JSON_COLUMNS else value)
+        columns.append("updated_at = ?")
+        values.append(time.time())
+
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {', '.join(columns)} WHERE id = ?", (*values, job_id)
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def count_pending(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()
+        return int(row[0])
+
+    def requeue_running(self) -> int:
+        """Return jobs interrupted by a restart to the queue."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', stage = 'queued', updated_at = ? "
+                "WHERE status = 'running'",
+                (time.time(),),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict[str, Any]:
+        job = dict(row)
+        for name in _JSON_COLUMNS:
+            job[name] = json.loads(job[name])
+        return job
+
+
+_JSON_COLUMNS = {"files", "progress", "timings", "results"}
+
+
+class JobProgress:
+    """Progress callback handed to the processor; records stage timings and counts."""
+
+    def __init__(self, store: JobStore, job_id: str, file_count: int, files_done: int = 0):
+        self.store = store
+        self.job_id = job_id
+        self.stage: str | None = None
+        self.stage_started = time.perf_counter()
+        self.progress: dict[str, int] = {"files_total": file_count, "files_done": files_done}
+        self.timings: dict[str, float] = {}
+
+    def __call__(self, stage: str, **counts: int) -> None:
+        now = time.perf_counter()
+        if stage != self.stage:
+            self._close_stage(now)
+            self.stage = stage
+            self.stage_started = now
+        self.progress.update(counts)
+        self.store.update(self.job_id, stage=stage, progress=self.progress, timings=self.timings)
+
+    def files_done(self, count: int) -> None:
+        self._close_stage(time.perf_counter())
+        self.stage = None
+        self.progress["files_done"] = count
+
+    def _close_stage(self, now: float) -> None:
+        if self.stage is not None:
+            elapsed = now - self.stage_started
+            self.timings[self.stage] = round(self.timings.get(self.stage, 0.0) + elapsed, 3)
+
+
+class IngestionQueue:
+    """Bounded pool of background workers draining the persistent job store."""
+
+    def __init__(self, store: JobStore, workers: int, max_pending: int):
+        self.store = store
+        self.workers = workers
+        self.max_pending = max_pending
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._processor: DocumentProcessor | None = None
+
+    @property
+    def processor(self) -> DocumentProcessor:
+        """Processor shared by all workers, created on first use."""
+        if self._processor is None:
+            self._processor = DocumentProcessor()
+        return self._processor
+
+    def submit(self, files: list[dict[str, Any]]) -> str:
+        self.ensure_capacity()
+        job_id = self.store.create(files)
+        self._wakeup.set()
+        logger.info(f"Queued ingestion job {job_id} with {len(files)} file(s)")
+        return job_id
+
+    def ensure_capacity(self) -> None:
+        pending = self.store.count_pending()
+        if pending >= self.max_pending:
+            raise QueueFullError(f"Ingestion queue is full ({pending} pending jobs)")
+
+    async def start(self) -> None:
+        requeued = self.store.requeue_running()
+        if requeued:
+            logger.info(f"Requeued {requeued} ingestion jobs interrupted by restart")
+
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"ingestion-worker-{i}")
+            for i in range(self.workers)
+        ]
+        self._wakeup.set()
+        logger.info(f"Started {self.workers} ingestion workers")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Ingestion workers stopped")
+
+    async def _worker(self, worker_no: int) -> None:
+        while True:
+            job = self.store.claim_next()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=5)
+                except TimeoutError:
+                    pass
+                continue
+
+            logger.info(f"Worker {worker_no} picked up job {job['id']}")
+            await self._run_job(job)
+
+    async def _run_job(self, job: dict[str, Any]) -> None:
+        job_id = job["id"]
+        files = job["files"]
+        # Results are saved after every batch, so a requeued job resumes where it stopped
+        results: list[dict[str, Any]] = job["results"]
+        progress = JobProgress(self.store, job_id, len(files), files_done=len(results))
+        batch_size = settings.INGESTION_FILES_PER_BATCH
+
+        try:
+            for start in range(len(results), len(files), batch_size):
+                batch = files[start : start + batch_size]
+                try:
+                    batch_results = await self.processor.process_batch(batch, progress)
+                except Exception as e:
+                    # Earlier batches are stored; fail this one's files and go on
+                    logger.error(f"Ingestion batch of job {job_id} failed: {e}", exc_info=True)
+                    batch_results = [e] * len(batch)
+
+                for file, result in zip(batch, batch_results):
+                    if isinstance(result, Exception):
+                        results.append({"filename": file["filename"], "error": str(result)})
+                    else:
+                        results.append(result)
+                    await self._remove_file(file["path"])
+
+                progress.files_done(len(results))
+                self.store.update(
+                    job_id, progress=progress.progress, timings=progress.timings, results=results
+                )
+
+            failed = [result for result in results if "error" in result]
+            if files and len(failed) == len(files):
+                error = failed[0]["error"] if len(files) == 1 else f"All {len(files)} files failed"
+                self.store.update(job_id, status="failed", error=error)
+                logger.error(f"Ingestion job {job_id} failed: {error}")
+            else:
+                self.store.update(job_id, status="completed", stage="done")
+                logger.info(
+                    f"Ingestion job {job_id} completed: {len(results) - len(failed)} files "
+                    f"ingested, {len(failed)} failed"
+                )
+
+        except asyncio.CancelledError:
+            # Shutdown mid-job: leave it 'running' so the next start requeues it
+            raise
+        except Exception as e:
+            logger.error(f"Ingestion job {job_id} failed: {e}", exc_info=True)
+            self.store.update(
+                job_id,
+                status="failed",
+                progress=progress.progress,
+                timings=progress.timings,
+                results=results,
+                error=str(e),
+            )
+            for file in files[len(results) :]:
+                await self._remove_file(file["path"])
+
+    @staticmethod
+    async def _remove_file(path: str) -> None:
+        if Path(path).exists():
+            await aiofiles.os.remove(path)
+            logger.info(f"Cleaned up temp file {path}")
+
+
+_queue: IngestionQueue | None = None
+
+
+def get_ingestion_queue() -> IngestionQueue:
+    """Get singleton ingestion queue."""
+    global _queue
+    if _queue is None:
+        store = JobStore(str(Path(settings.DATA_DIR) / "jobs.sqlite3"))
+        _queue = IngestionQueue(
+            store, workers=settings.INGESTION_WORKERS, max_pending=settings.INGESTION_QUEUE_MAX
+        )
+    return _queue
@@ -1,18 +1,40 @@
+import asyncio
+from dataclasses import replace
+
+import numpy as np
 from langchain_openai import ChatOpenAI
 from pydantic import SecretStr
+from qdrant_client.models import Filter
 
 from src.config import get_settings
 from src.core import prompts
 from src.core.grading.graders import (
     check_hallucination,
+    generate_query_variants,
     grade_answer_quality,
     grade_documents_batch,
     rewrite_query,
     route_question,
 )
-from src.core.retrieval.fusion_retriever import FusionRetriever
+from src.core.retrieval.diversity import mmr, near_duplicates
+from src.core.retrieval.document_index import scope_to_top_documents
+from src.core.retrieval.expansion import expand_to_passages
+from src.core.retrieval.filters import build_filter
+from src.core.retrieval.fusion_retriever import FusionRetriever, minmax_normalize
+from src.core.retrieval.inverted_index import get_bm25_index
+from src.core.retrieval.search import (
+    SearchHit,
+    get_chunk_lemmas,
+    get_chunk_vectors,
+    get_chunks,
+    hybrid_search,
+    multi_query_search,
+    similarity_search,
+)
+from src.core.retrieval.tokenizer import tokenize
 from src.core.state import AgentState
-from src.core.tools import get_vector_store_tool, get_web_search_tool
+from src.core.tools import get_web_search_tool
+from src.core.vector_store import use_server_hybrid
 from src.utils.logger import logger
 
 settings = get_settings()
@@ -107,24 +129,164 @@ def router_node(state: AgentState) -> dict[str, bool]:
         return {"web_search": False, "explicit_web_search": False}
 
 
-def retrieve_node(state: AgentState) -> dict[str, list[str] | int]:
+def fetch_k() -> int:
+    """Candidates to retrieve: over-fetched when dedup or MMR will thin them out."""
+    if settings.DEDUP_ENABLED or settings.MMR_ENABLED:
+        return max(settings.RETRIEVAL_FETCH_K, settings.RETRIEVAL_K)
+    return settings.RETRIEVAL_K
+
+
+async def select_documents(
+    texts: list[str], point_ids: list[str], scores: list[float]
+) -> list[int]:
+    """
+    Pick the final RETRIEVAL_K documents from ranked candidates.
+
+    Near-duplicate texts are dropped first (MinHash over word shingles), then MMR
+    trades relevance against similarity to documents already picked, so overlapping
+    neighbouring chunks don't each take a slot and get graded separately.
+
+    Args:
+        texts: Candidate texts, best first
+        point_ids: Qdrant point ID per candidate
+        scores: Ranking score per candidate
+
+    Returns:
+        Indices of the selected candidates, best first
+    """
+    keep = list(range(len(texts)))
+    if settings.DEDUP_ENABLED:
+        keep = near_duplicates(texts, settings.DEDUP_THRESHOLD)
+        if len(keep) < len(texts):
+            logger.info(f"Dropped {len(texts) - len(keep)} near-duplicate documents")
+
+    if settings.MMR_ENABLED and len(keep) > settings.RETRIEVAL_K:
+        try:
+            vectors = await get_chunk_vectors([point_ids[i] for i in keep])
+            keep = [i for i in keep if point_ids[i] in vectors]
+            relevance = minmax_normalize(
+                np.asarray([scores[i] for i in keep], dtype=np.float32), fill=1.0
+            )
+            matrix = np.asarray([vectors[point_ids[i]] for i in keep], dtype=np.float32)
+            order = mmr(relevance, matrix, settings.RETRIEVAL_K, settings.MMR_LAMBDA)
+            keep = [keep[i] for i in order]
+        except Exception as e:
+            logger.warning(f"MMR selection failed: {e}, keeping ranked order")
+
+    return keep[: settings.RETRIEVAL_K]
+
+
+async def to_passages(hits: list[SearchHit]) -> list[str]:
+    """
+    Texts to grade for the selected hits, widened to their neighbouring chunks.
+
+    With CONTEXT_EXPANSION_WINDOW > 0 each hit's chunk_index ± window neighbours are
+    fetched in one query and overlapping windows merge into one passage.
+
+    Args:
+        hits: Selected hits, best first
+
+    Returns:
+        Document texts, best first
+    """
+    if settings.CONTEXT_EXPANSION_WINDOW <= 0:
+        return [hit.text for hit in hits]
+
+    try:
+        passages = await expand_to_passages(hits, settings.CONTEXT_EXPANSION_WINDOW)
+        logger.info(f"Expanded {len(hits)} hits into {len(passages)} passages")
+        return passages
+    except Exception as e:
+        logger.warning(f"Context expansion failed: {e}, using chunk texts")
+        return [hit.text for hit in hits]
+
+
+async def search_variants(
+    queries: list[str], k: int, query_filter: Filter | None, hybrid: bool
+) -> list[SearchHit]:
+    """
+    Search with every query variant and fuse the result lists by reciprocal rank.
+
+    All variants go out in one embedding request and one Qdrant batch query, so
+    latency stays that of a single search however many variants there are.
+
+    Args:
+        queries: Query variants, the direct rewrite first
+        k: Number of results per variant and after fusion
+        query_filter: Payload filter applied to every search
+        hybrid: Use the server-side hybrid query instead of dense search
+
+    Returns:
+        Hits scored by their fused rank score, best first
+    """
+    if len(queries) == 1:
+        search = hybrid_search if hybrid else similarity_search
+        return await search(queries[0], k=k, query_filter=query_filter)
+
+    rankings = await multi_query_search(queries, k=k, query_filter=query_filter, hybrid=hybrid)
+    hits: dict[str, SearchHit] = {}
+    for ranking in rankings:
+        for hit in ranking:
+            hits.setdefault(hit.point_id, hit)
+
+    fused = FusionRetriever(alpha=settings.FUSION_ALPHA).fuse_rankings(
+        [[hit.point_id for hit in ranking] for ranking in rankings], k=k
+    )
+    return [replace(hits[point_id], score=score) for point_id, score in fused]
+
+
+async def retrieve_node(state: AgentState) -> dict[str, list[str] | int]:
     logger.info("--- RETRIEVING FROM VECTOR STORE ---")
 
     question = state.get("question", "")
 
-    preprocessed_query = rewrite_query(question)
+    if settings.MULTI_QUERY_COUNT > 1:
+        queries = await asyncio.to_thread(
+            generate_query_variants, question, settings.MULTI_QUERY_COUNT
+        )
+    else:
+        queries = [await asyncio.to_thread(rewrite_query, question)]
+    # Keyword search and document scoping use the direct rewrite
+    preprocessed_query = queries[0]
     logger.info(f"Preprocessed query: '{question}' -> '{preprocessed_query}'")
 
-    vector_store = get_vector_store_tool()
-    results = vector_store.similarity_search_with_score(preprocessed_query, k=10)
+    query_filter = build_filter(state.get("filters"))
+    if query_filter is not None:
+        logger.info(f"Filtering retrieval by {state.get('filters')}")
 
-    doc_contents = []
-    vector_scores = []
+    if settings.RETRIEVAL_MODE == "two_level":
+        try:
+            query_filter = await scope_to_top_documents(
+                preprocessed_query, query_filter, state.get("filters")
+            )
+        except Exception as e:
+            logger.warning(f"Document-level search failed: {e}, searching all chunks")
+
+    # An explicit fusion_method asks for the client-side strategies
+    if not state.get("fusion_method") and use_server_hybrid():
+        try:
+            hits = await search_variants(queries, fetch_k(), query_filter, hybrid=True)
+            hits = [hit for hit in hits if hit.text.strip()]
+            logger.info(
+                f"Hybrid search returned {len(hits)} documents"
+                + (f" (top score: {hits[0].score:.4f})" if hits else "")
+            )
+            keep = await select_documents(
+                [hit.text for hit in hits],
+                [hit.point_id for hit in hits],
+                [hit.score for hit in hits],
+            )
+            doc_contents = await to_passages([hits[i] for i in keep])
+            return {"documents": doc_contents, "docs_retrieved_total": len(doc_contents)}
+        except Exception as e:
+            logger.warning(f"Hybrid search failed: {e}, falling back to client-side fusion")
 
-    for doc, score in results:
-        content = doc.page_content if hasattr(doc, "page_content") else str(doc)
-        doc_contents.append(content)
-        vector_scores.append(float(score))
+    results = await search_variants(queries, fetch_k(), query_filter, hybrid=False)
+
+    hits_by_id = {hit.point_id: hit for hit in results}
+    doc_contents = [hit.text for hit in results]
+    vector_scores = [float(hit.score) for hit in results]
+    point_ids = [hit.point_id for hit in results]
 
     docs_retrieved_total = len(doc_contents)
 
@@ -138,29 +300,84 @@ def retrieve_node(state: AgentState) -> dict[str, list[str] | int]:
 
     # Step 3: Fusion retrieval (combine vector + BM25 scores)
     # Filter out empty documents first
-    non_empty_docs = [doc for doc in doc_contents if doc and doc.strip()]
+    non_empty = [i for i, doc in enumerate(doc_contents) if doc and doc.strip()]
 
-    if len(non_empty_docs) < len(doc_contents):
-        logger.warning(f"Filtered out {len(doc_contents) - len(non_empty_docs)} empty documents")
-        doc_contents = non_empty_docs
+    if len(non_empty) < len(doc_contents):
+        logger.warning(f"Filtered out {len(doc_contents) - len(non_empty)} empty documents")
+        doc_contents = [doc_contents[i] for i in non_empty]
+        vector_scores = [vector_scores[i] for i in non_empty]
+        point_ids = [point_ids[i] for i in non_empty]
 
     if doc_contents and len(doc_contents) > 0:
-        fusion = FusionRetriever(alpha=0.6)
+        bm25_scores = None
+        precomputed_tokens = None
+        bm25_index = get_bm25_index()
+        if bm25_index.doc_count:
+            # Corpus-wide keyword search: can surface chunks the vector search missed
+            try:
+                query_tokens = tokenize(preprocessed_query)
+                keyword_hits = await asyncio.to_thread(
+                    bm25_index.search, query_tokens, k=settings.BM25_TOP_K
+                )
+                seen = set(point_ids)
+                keyword_only = [pid for pid, _ in keyword_hits if pid not in seen]
+                keyword_chunks = await get_chunks(keyword_only, query_filter)
+                # Not in the vector top-k: give them the lowest vector score seen
+                floor = min(vector_scores)
+                added = 0
+                for pid in keyword_only:
+                    if pid in keyword_chunks and keyword_chunks[pid].text.strip():
+                        hits_by_id[pid] = keyword_chunks[pid]
+                        doc_contents.append(keyword_chunks[pid].text)
+                        vector_scores.append(floor)
+                        point_ids.append(pid)
+                        added += 1
+                bm25_scores = await asyncio.to_thread(bm25_index.score, query_tokens, point_ids)
+                docs_retrieved_total += added
+                logger.info(f"BM25 index added {added} keyword-only hits")
+            except Exception as e:
+                logger.warning(f"BM25 index search failed: {e}, scoring retrieved docs only")
+                bm25_scores = None
+
+        if bm25_scores is None:
+            # Reuse lemmas computed at ingestion instead of re-parsing chunks with spaCy
+            try:
+                stored_lemmas = await get_chunk_lemmas([pid for pid in point_ids if pid])
+            except Exception as e:
+                logger.warning(f"Could not fetch stored lemmas: {e}, tokenizing at query time")
+                stored_lemmas = {}
+            precomputed_tokens = [stored_lemmas.get(pid) for pid in point_ids]
+
+        fusion = FusionRetriever(alpha=settings.FUSION_ALPHA)
         try:
-            fused_results = fusion.fuse_results(
-                doc_contents, vector_scores[: len(doc_contents)], preprocessed_query
+            # May tokenize documents with spaCy; keep it off the event loop
+            fused_results = await asyncio.to_thread(
+                fusion.fuse_results,
+                doc_contents,
+                vector_scores,
+                preprocessed_query,
+                precomputed_tokens,
+                bm25_scores,
+                method=state.get("fusion_method"),  # type: ignore[arg-type]
             )
             doc_contents = [doc_contents[idx] for idx, score in fused_results]
+            point_ids = [point_ids[idx] for idx, score in fused_results]
+            ranking_scores = [score for idx, score in fused_results]
             logger.info(f"Reranked documents using fusion (top score: {fused_results[0][1]:.4f})")
         except Exception as e:
             logger.warning(f"Fusion failed: {e}, using vector scores only")
+            ranking_scores = vector_scores
+
+        keep = await select_documents(doc_contents, point_ids, ranking_scores)
+        doc_contents = await to_passages([hits_by_id[point_ids[i]] for i in keep])
+        docs_retrieved_total = len(doc_contents)
     else:
         logger.warning("No non-empty documents for fusion, skipping")
 
     return {"documents": doc_contents, "docs_retrieved_total": docs_retrieved_total}
 
 
-def web_search_node(state: AgentState) -> dict[str, list[str]]:
+def web_search_node(state: AgentState) -> dict[str, list[str] | bool]:
     logger.info("--- WEB SEARCH ---")
 
     question = state.get("question", "")
@@ -180,7 +397,7 @@ def web_search_node(state: AgentState) -> dict[str, list[str]]:
         f"Combined {len(existing_docs)} vector docs + {len(web_docs)} web docs = {len(combined)} total"  # noqa: E501
     )
 
-    return {"documents": combined}
+    return {"documents": combined, "used_web_search": True}
 
 
 def grade_documents_node(state: AgentState) -> dict[str, list[str] | bool | int]:
@@ -117,3 +117,18 @@ Return ONLY the rewritten phrase, no explanations."""  # noqa: E501
 QUERY_REWRITER_USER_PROMPT = """Initial question: {question}
 
 Rewritten search phrase:"""
+
+MULTI_QUERY_SYSTEM_PROMPT = """You are a query optimizer for semantic document search.
+
+Your task: Write several different search phrases for one user question, so that together they find every document that answers it.
+
+Guidelines:
+- The first phrase is the keyword-rich rewrite of the question itself
+- The others approach it from different angles: synonyms, related terms, narrower or broader wording, sub-questions
+- Preserve names, technical terms, and specific keywords in every phrase
+- Keep each phrase concise (max 15 words) and focused on what content would appear IN the document
+- Do not repeat a phrase or make trivial rewordings"""  # noqa: E501
+
+MULTI_QUERY_USER_PROMPT = """Initial question: {question}
+
+Write {count} search phrases."""
@@ -1,6 +1,7 @@
+import numpy as np
 from rank_bm25 import BM25Okapi  # type: ignore[import-untyped]
 
-from src.core.retrieval.tokenizer import tokenize
+from src.core.retrieval.tokenizer import tokenize, tokenize_many
 from src.utils.logger import logger
 
 
@@ -11,19 +12,29 @@ class BM25Indexer:
         self.index: BM25Okapi | None = None
         self.documents: list[str] = []
 
-    def build_index(self, documents: list[str]) -> None:
+    def build_index(
+        self, documents: list[str], precomputed_tokens: list[list[str] | None] | None = None
+    ) -> None:
         """
         Build BM25 index from document texts.
 
         Args:
             documents: List of document text strings
+            precomputed_tokens: Optional precomputed tokens per document (e.g. lemmas stored
+                at ingestion). Documents with None are tokenized here.
         """
         if not documents:
             logger.warning("No documents provided to build BM25 index")
             return
 
         self.documents = documents
-        tokenized_docs = [tokenize(doc) for doc in documents]
+        precomputed = precomputed_tokens or [None] * len(documents)
+        missing = [i for i, tokens in enumerate(precomputed) if tokens is None]
+        fresh = iter(tokenize_many([documents[i] for i in missing]))
+        tokenized_docs = [tokens if tokens is not None else next(fresh) for tokens in precomputed]
+        reused = sum(1 for tokens in precomputed if tokens is not None)
+        if reused:
+            logger.info(f"Reused precomputed tokens for {reused}/{len(documents)} docs")
 
         # Debug: check if any docs have tokens
         empty_count = sum(1 for doc in tokenized_docs if not doc)
@@ -42,7 +53,7 @@ class BM25Indexer:
         self.index = BM25Okapi(tokenized_docs)
         logger.info(f"Built BM25 index for {len(documents)} documents")
 
-    def get_scores(self, query: str) -> list[float]:
+    def get_scores(self, query: str) -> np.ndarray:
         """
         Get BM25 scores for a query against indexed documents.
 
@@ -54,13 +65,12 @@ class BM25Indexer:
         """
         if not self.index:
             logger.warning("BM25 index not built, returning zero scores")
-            return [0.0] * len(self.documents)
+            return np.zeros(len(self.documents), dtype=np.float32)
 
         query_tokens = tokenize(query)
 
         if not query_tokens:
             logger.warning("Query tokenization resulted in empty tokens")
-            return [0.0] * len(self.documents)
+            return np.zeros(len(self.documents), dtype=np.float32)
 
-        scores = self.index.get_scores(query_tokens)
-        return scores.tolist()
+        return self.index.get_scores(query_tokens).astype(np.float32)
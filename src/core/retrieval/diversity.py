@@ -0,0 +1,103 @@
+import zlib
+
+import numpy as np
+
+SHINGLE_WORDS = 5
+NUM_PERMUTATIONS = 128
+# Smallest prime above 2**32: (a * x + b) stays inside uint64 for 32-bit x, a and b
+_PRIME = np.uint64(4_294_967_311)
+
+_rng = np.random.default_rng(1)
+_A = _rng.integers(1, 2**32, NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, 2**32, NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def shingles(text: str) -> np.ndarray:
+    """CRC32 hashes of the overlapping SHINGLE_WORDS-word sequences in text."""
+    words = text.lower().split()
+    grams = [
+        " ".join(words[i : i + SHINGLE_WORDS])
+        for i in range(max(len(words) - SHINGLE_WORDS + 1, 1))
+    ]
+    return np.unique(np.array([zlib.crc32(gram.encode("utf-8")) for gram in grams], np.uint64))
+
+
+def minhash_signatures(texts: list[str]) -> np.ndarray:
+    """
+    MinHash signature per text.
+
+    Args:
+        texts: Chunk texts
+
+    Returns:
+        uint64 matrix, one row of NUM_PERMUTATIONS minimums per text
+    """
+    signatures = np.empty((len(texts), NUM_PERMUTATIONS), dtype=np.uint64)
+    for i, text in enumerate(texts):
+        hashes = shingles(text)
+        signatures[i] = ((hashes[:, None] * _A + _B) % _PRIME).min(axis=0)
+    return signatures
+
+
+def near_duplicates(texts: list[str], threshold: float) -> list[int]:
+    """
+    Indices of texts to keep after dropping near-duplicates of earlier texts.
+
+    Texts are assumed ranked best first, so of each near-identical group the
+    highest-ranked one survives.
+
+    Args:
+        texts: Chunk texts, best first
+        threshold: Estimated shingle Jaccard similarity at which two texts are duplicates
+
+    Returns:
+        Kept indices, in order
+    """
+    if len(texts) < 2:
+        return list(range(len(texts)))
+
+    signatures = minhash_signatures(texts)
+    similarity = (signatures[:, None, :] == signatures[None, :, :]).mean(axis=2)
+
+    kept: list[int] = []
+    for i in range(len(texts)):
+        if not kept or similarity[i, kept].max() < threshold:
+            kept.append(i)
+    return kept
+
+
+def mmr(relevance: np.ndarray, vectors: np.ndarray, k: int, lambda_mult: float) -> list[int]:
+    """
+    Maximal marginal relevance selection.
+
+    Args:
+        relevance: Relevance of each candidate to the query, scaled to 0-1
+        vectors: Candidate embeddings, one row each
+        k: Number to select
+        lambda_mult: 1 ranks by relevance only, 0 by diversity only
+
+    Returns:
+        Selected indices in selection order
+    """
+    n = len(relevance)
+    if n == 0:
+        return []
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.where(norms > 0, norms, 1.0)
+    similarity = unit @ unit.T
+
+    selected = [int(np.argmax(relevance))]
+    max_similarity = similarity[selected[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+
+    while len(selected) < min(k, n):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        chosen = int(np.argmax(scores))
+        selected.append(chosen)
+        available[chosen] = False
+        np.maximum(max_similarity, similarity[chosen], out=max_similarity)
+
+    return selected
@@ -0,0 +1,227 @@
+import numpy as np
+from qdrant_client.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    MatchValue,
+    PointStruct,
+    Record,
+    VectorParams,
+)
+
+from src.config import get_settings
+from src.core.caching.query_cache import aembed_query
+from src.core.retrieval.filters import DOCUMENT_FILTERS, build_filter, restrict_to_documents
+from src.core.vector_store import (
+    DENSE_VECTOR_NAME,
+    PAYLOAD_INDEXES,
+    get_async_qdrant_client,
+    get_collection_layout,
+    get_qdrant_client,
+    is_embedded,
+)
+from src.utils.logger import logger
+
+settings = get_settings()
+
+# Chunk payload fields copied to the document point
+DOCUMENT_PAYLOAD = ["document_id", "filename", "file_extension"]
+BATCH_SIZE = 1000
+
+
+def document_collection_name() -> str:
+    return f"{settings.QDRANT_COLLECTION_NAME}_documents"
+
+
+def _unit(total: np.ndarray) -> list[float]:
+    return (total / (np.linalg.norm(total) or 1.0)).tolist()
+
+
+def _chunk_vectors(points: list[Record]) -> np.ndarray:
+    dense = get_collection_layout().dense
+    return np.asarray(
+        [
+            point.vector[dense] if isinstance(point.vector, dict) else point.vector
+            for point in points
+        ],
+        dtype=np.float32,
+    )
+
+
+def ensure_document_index() -> None:
+    """
+    Create the document-level collection, and fill it from the chunk collection if it is
+    empty while chunks exist (first start with two-level retrieval, or after a migration).
+
+    Each document is stored as the normalized centroid of its chunk embeddings.
+    """
+    client = get_qdrant_client()
+    name = document_collection_name()
+    if not client.collection_exists(name):
+        logger.info(f"Creating document collection '{name}'")
+        client.create_collection(
+            collection_name=name,
+            vectors_config={
+                DENSE_VECTOR_NAME: VectorParams(
+                    size=settings.EMBEDDING_DIMENSION, distance=Distance.COSINE
+                )
+            },
+        )
+        if not is_embedded():
+            for field_name in DOCUMENT_PAYLOAD:
+                client.create_payload_index(
+                    collection_name=name,
+                    field_name=field_name,
+                    field_schema=PAYLOAD_INDEXES[field_name],
+                )
+
+    if client.count(collection_name=name).count:
+        return
+    if not client.count(collection_name=settings.QDRANT_COLLECTION_NAME).count:
+        return
+
+    logger.info("No document vectors yet, building them from the chunk collection")
+    dense = get_collection_layout().dense
+    sums: dict[str, np.ndarray] = {}
+    payloads: dict[str, dict] = {}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            limit=BATCH_SIZE,
+            offset=offset,
+            with_payload=DOCUMENT_PAYLOAD,
+            with_vectors=[dense] if dense else True,
+        )
+        points = [point for point in points if (point.payload or {}).get("document_id")]
+        for point, vector in zip(points, _chunk_vectors(points)):
+            document_id = point.payload["document_id"]  # type: ignore[index]
+            if document_id in sums:
+                sums[document_id] += vector
+            else:
+                sums[document_id] = vector.copy()
+                payloads[document_id] = point.payload  # type: ignore[assignment]
+        if offset is None:
+            break
+
+    documents = [
+        PointStruct(
+            id=document_id, vector={DENSE_VECTOR_NAME: _unit(total)}, payload=payloads[document_id]
+        )
+        for document_id, total in sums.items()
+    ]
+    for start in range(0, len(documents), BATCH_SIZE):
+        client.upsert(collection_name=name, points=documents[start : start + BATCH_SIZE])
+    logger.info(f"Stored {len(documents)} document vectors in '{name}'")
+
+
+def drop_document_index() -> None:
+    """
+    Delete the document-level collection when two-level retrieval is off.
+
+    Document vectors are not maintained in flat mode, so a kept collection would go
+    stale; without it ensure_document_index rebuilds it when two_level is enabled.
+    """
+    client = get_qdrant_client()
+    name = document_collection_name()
+    if client.collection_exists(name):
+        logger.info(f"Two-level retrieval is off, deleting document collection '{name}'")
+        client.delete_collection(name)
+
+
+async def update_document_vector(document_id: str) -> None:
+    """
+    Recompute a document's centroid from its stored chunks, or delete it if none are left.
+
+    Args:
+        document_id: Document whose chunks changed
+    """
+    client = get_async_qdrant_client()
+    dense = get_collection_layout().dense
+    document_filter = Filter(
+        must=[FieldCondition(key="document_id", match=MatchValue(value=document_id))]
+    )
+    total: np.ndarray | None = None
+    payload = None
+    offset = None
+    while True:
+        points, offset = await client.scroll(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            scroll_filter=document_filter,
+            limit=BATCH_SIZE,
+            offset=offset,
+            with_payload=DOCUMENT_PAYLOAD,
+            with_vectors=[dense] if dense else True,
+        )
+        if points:
+            vectors = _chunk_vectors(points).sum(axis=0)
+            total = vectors if total is None else total + vectors
+            payload = payload or points[0].payload
+        if offset is None:
+            break
+
+    if total is None:
+        await client.delete(
+            collection_name=document_collection_name(), points_selector=[document_id]
+        )
+        return
+
+    await client.upsert(
+        collection_name=document_collection_name(),
+        points=[
+            PointStruct(id=document_id, vector={DENSE_VECTOR_NAME: _unit(total)}, payload=payload)
+        ],
+    )
+
+
+async def search_documents(
+    query: str, limit: int, filters: dict[str, list[str]] | None = None
+) -> list[str]:
+    """
+    Find the documents whose centroid is closest to the query.
+
+    Args:
+        query: Search query
+        limit: Number of documents
+        filters: Query filters; the ones documents carry (DOCUMENT_FILTERS) are applied
+
+    Returns:
+        Document IDs, best first
+    """
+    document_filters = {
+        name: values for name, values in (filters or {}).items() if name in DOCUMENT_FILTERS
+    }
+    response = await get_async_qdrant_client().query_points(
+        collection_name=document_collection_name(),
+        query=await aembed_query(query),
+        using=DENSE_VECTOR_NAME,
+        query_filter=build_filter(document_filters),
+        limit=limit,
+        with_payload=False,
+        with_vectors=False,
+    )
+    return [str(point.id) for point in response.points]
+
+
+async def scope_to_top_documents(
+    query: str, query_filter: Filter | None, filters: dict[str, list[str]] | None = None
+) -> Filter | None:
+    """
+    First level of two-level retrieval: restrict the chunk search to the DOCUMENT_TOP_N
+    documents closest to the query.
+
+    Args:
+        query: Search query
+        query_filter: Chunk filter built from the query filters
+        filters: Query filters, applied to the document search where possible
+
+    Returns:
+        Chunk filter limited to the top documents; query_filter unchanged when no
+        documents are indexed
+    """
+    document_ids = await search_documents(query, settings.DOCUMENT_TOP_N, filters)
+    if not document_ids:
+        logger.warning("No document vectors found, searching all chunks")
+        return query_filter
+    logger.info(f"Two-level retrieval: searching chunks of {len(document_ids)} documents")
+    return restrict_to_documents(document_ids, query_filter)
@@ -0,0 +1,136 @@
+from qdrant_client.models import FieldCondition, Filter, MatchValue, Range
+
+from src.config import get_settings
+from src.core.retrieval.search import HIT_PAYLOAD, SearchHit
+from src.core.vector_store import get_async_qdrant_client
+
+settings = get_settings()
+
+# Prefix lengths of a chunk checked against the end of the previous one; the splitter's
+# chunk_overlap is 240, shorter matches are coincidence
+MIN_OVERLAP_CHARS = 20
+MAX_OVERLAP_CHARS = 400
+
+
+def neighbour_windows(hits: list[SearchHit], window: int) -> dict[str, list[tuple[int, int]]]:
+    """
+    Merge the chunk_index ± window spans of all hits into disjoint ranges per document.
+
+    Args:
+        hits: Hits with document_id and chunk_index
+        window: Neighbours to add on each side of a hit
+
+    Returns:
+        Mapping of document_id to sorted, non-overlapping (first, last) index ranges
+    """
+    spans: dict[str, list[tuple[int, int]]] = {}
+    for hit in hits:
+        if hit.document_id is not None and hit.chunk_index is not None:
+            spans.setdefault(hit.document_id, []).append(
+                (max(hit.chunk_index - window, 0), hit.chunk_index + window)
+            )
+
+    merged: dict[str, list[tuple[int, int]]] = {}
+    for document_id, ranges in spans.items():
+        ranges.sort()
+        out = [ranges[0]]
+        for first, last in ranges[1:]:
+            # Adjacent ranges join too: together they are one contiguous passage
+            if first <= out[-1][1] + 1:
+                out[-1] = (out[-1][0], max(out[-1][1], last))
+            else:
+                out.append((first, last))
+        merged[document_id] = out
+    return merged
+
+
+async def fetch_chunks(windows: dict[str, list[tuple[int, int]]]) -> dict[tuple[str, int], str]:
+    """
+    Fetch the text of every chunk in the windows with a single scroll.
+
+    Args:
+        windows: Index ranges per document, as returned by neighbour_windows
+
+    Returns:
+        Mapping of (document_id, chunk_index) to chunk text
+    """
+    ranges = [
+        Filter(
+            must=[
+                FieldCondition(key="document_id", match=MatchValue(value=document_id)),
+                FieldCondition(key="chunk_index", range=Range(gte=first, lte=last)),
+            ]
+        )
+        for document_id, spans in windows.items()
+        for first, last in spans
+    ]
+    if not ranges:
+        return {}
+
+    points, _ = await get_async_qdrant_client().scroll(
+        collection_name=settings.QDRANT_COLLECTION_NAME,
+        scroll_filter=Filter(should=ranges),  # type: ignore[arg-type]
+        limit=sum(last - first + 1 for spans in windows.values() for first, last in spans),
+        with_payload=HIT_PAYLOAD,
+        with_vectors=False,
+    )
+    return {
+        (point.payload["document_id"], point.payload["chunk_index"]): point.payload["page_content"]
+        for point in points
+        if point.payload and point.payload.get("page_content")
+    }
+
+
+def join_chunks(left: str, right: str) -> str:
+    """Concatenate consecutive chunks, dropping the text the splitter repeated in both."""
+    for size in range(min(len(left), len(right), MAX_OVERLAP_CHARS), MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    return f"{left}\n{right}"
+
+
+async def expand_to_passages(hits: list[SearchHit], window: int) -> list[str]:
+    """
+    Replace hits with passages of their neighbouring chunks.
+
+    Hits whose windows overlap or touch become one contiguous passage, so each
+    passage is graded once. Passages are ordered by their best-ranked hit; hits
+    without a chunk position (legacy points) are kept as they are.
+
+    Args:
+        hits: Selected hits, best first
+        window: Neighbouring chunks to add on each side of a hit
+
+    Returns:
+        Passage texts, best first
+    """
+    windows = neighbour_windows(hits, window)
+    chunks = await fetch_chunks(windows)
+
+    passages: list[str] = []
+    emitted: set[tuple[str, int]] = set()
+    for hit in hits:
+        if hit.document_id is None or hit.chunk_index is None:
+            passages.append(hit.text)
+            continue
+
+        first, last = next(
+            (first, last)
+            for first, last in windows[hit.document_id]
+            if first <= hit.chunk_index <= last
+        )
+        if (hit.document_id, first) in emitted:
+            continue  # Already part of a better-ranked hit's passage
+        emitted.add((hit.document_id, first))
+
+        texts = [
+            chunks[key]
+            for index in range(first, last + 1)
+            if (key := (hit.document_id, index)) in chunks
+        ]
+        passage = texts[0] if texts else hit.text
+        for text in texts[1:]:
+            passage = join_chunks(passage, text)
+        passages.append(passage)
+
+    return passages
@@ -0,0 +1,56 @@
+from qdrant_client.models import FieldCondition, Filter, HasIdCondition, MatchAny
+
+# Request filter name -> chunk payload field
+FILTER_FIELDS = {
+    "document_ids": "document_id",
+    "filenames": "filename",
+    "file_types": "file_extension",
+    "entities": "entities",
+    "keywords": "keywords",
+}
+
+# Filters on fields that document-level points carry too
+DOCUMENT_FILTERS = ("document_ids", "filenames", "file_types")
+
+
+def build_filter(filters: dict[str, list[str]] | None) -> Filter | None:
+    """
+    Translate query filters into a Qdrant payload filter.
+
+    Each given filter must match (AND); within one filter any value matches (OR).
+
+    Args:
+        filters: Lists of allowed values keyed by FILTER_FIELDS names
+
+    Returns:
+        Qdrant filter, or None when nothing is filtered
+    """
+    conditions = []
+    for name, field in FILTER_FIELDS.items():
+        values = (filters or {}).get(name)
+        if not values:
+            continue
+        if name == "file_types":
+            # Stored as lowercased suffixes: "PDF" and "pdf" both mean ".pdf"
+            values = [f".{value.lower().lstrip('.')}" for value in values]
+        elif name in ("entities", "keywords"):
+            # Stored lowercased; the values as given still match chunks ingested before that
+            values = list(dict.fromkeys([value.lower() for value in values] + values))
+        conditions.append(FieldCondition(key=field, match=MatchAny(any=values)))
+    return Filter(must=conditions) if conditions else None
+
+
+def restrict_to_ids(point_ids: list[str], query_filter: Filter | None) -> Filter:
+    """Filter matching the given points that also pass query_filter."""
+    must: list = [HasIdCondition(has_id=point_ids)]
+    if query_filter is not None:
+        must.append(query_filter)
+    return Filter(must=must)
+
+
+def restrict_to_documents(document_ids: list[str], query_filter: Filter | None) -> Filter:
+    """Filter matching chunks of the given documents that also pass query_filter."""
+    must: list = [FieldCondition(key="document_id", match=MatchAny(any=document_ids))]
+    if query_filter is not None:
+        must.append(query_filter)
+    return Filter(must=must)
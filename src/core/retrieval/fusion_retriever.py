@@ -1,25 +1,91 @@
+from typing import Literal
+
 import numpy as np
 
+from src.config import get_settings
 from src.core.retrieval.bm25_indexer import BM25Indexer
 from src.utils.logger import logger
 
+settings = get_settings()
+
+FusionMethod = Literal["weighted", "rrf", "zscore"]
+
+
+def minmax_normalize(scores: np.ndarray, fill: float) -> np.ndarray:
+    """Scale to 0-1; all-equal scores become fill."""
+    low = scores.min()
+    spread = scores.max() - low
+    if spread > 0:
+        return (scores - low) / spread
+    return np.full_like(scores, fill)
+
+
+def zscore_normalize(scores: np.ndarray) -> np.ndarray:
+    std = scores.std()
+    if std > 0:
+        return (scores - scores.mean()) / std
+    return np.zeros_like(scores)
+
+
+def reciprocal_ranks(scores: np.ndarray, k: int) -> np.ndarray:
+    """1 / (k + rank), rank 1 for the highest score."""
+    ranks = np.empty(len(scores), dtype=np.float32)
+    ranks[np.argsort(-scores, kind="stable")] = np.arange(1, len(scores) + 1, dtype=np.float32)
+    return 1.0 / (k + ranks)
+
+
+def top_k(scores: np.ndarray, k: int | None) -> list[tuple[int, float]]:
+    """
+    Indices and scores of the k highest scores, best first.
+
+    Args:
+        scores: Fused scores
+        k: Number of results, None for all
+
+    Returns:
+        List of (index, score) tuples
+    """
+    if k is not None and k < len(scores):
+        candidates = np.argpartition(-scores, k)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return list(zip(order.tolist(), scores[order].tolist()))
+
 
 class FusionRetriever:
     """Handles fusion retrieval combining vector and BM25 search."""
 
-    def __init__(self, alpha: float = 0.6):
+    def __init__(
+        self,
+        alpha: float = 0.6,
+        method: FusionMethod | None = None,
+        rrf_k: int | None = None,
+    ):
         """
-        Initialize with fusion weight.
+        Initialize with fusion weight and strategy.
 
         Args:
             alpha: Weight for vector scores (1-alpha for BM25).
                    0.6 = 60% vector, 40% BM25 (balanced for names + semantics)
+            method: weighted (min-max scaled sum), rrf (reciprocal rank fusion) or
+                zscore (standardized sum); defaults to FUSION_METHOD
+            rrf_k: RRF rank constant; defaults to FUSION_RRF_K
         """
         self.alpha = alpha
+        self.method: FusionMethod = method or settings.FUSION_METHOD
+        self.rrf_k = rrf_k or settings.FUSION_RRF_K
         self.bm25_indexer = BM25Indexer()
 
     def fuse_results(
-        self, documents: list[str], vector_scores: list[float], query: str
+        self,
+        documents: list[str],
+        vector_scores: list[float],
+        query: str,
+        precomputed_tokens: list[list[str] | None] | None = None,
+        bm25_scores: list[float] | None = None,
+        method: FusionMethod | None = None,
+        k: int | None = None,
     ) -> list[tuple[int, float]]:
         """
         Fuse vector and BM25 scores for retrieved documents.
@@ -28,6 +94,11 @@ class FusionRetriever:
             documents: List of document text strings
             vector_scores: List of vector similarity scores (0-1, higher is better)
             query: Search query string
+            precomputed_tokens: Optional BM25 tokens per document from ingestion
+            bm25_scores: Optional BM25 scores from the corpus-wide index; when given,
+                no per-query index is built
+            method: Fusion strategy for this call, overriding the instance default
+            k: Return only the k best documents
 
         Returns:
             List of tuples (doc_index, fused_score) sorted by score descending
@@ -36,71 +107,81 @@ class FusionRetriever:
             logger.warning("No documents to fuse")
             return []
 
-        # Normalize vector scores to 0-1 range
-        vec_array = np.array(vector_scores, dtype=np.float64)
-        vec_min = float(np.min(vec_array))
-        vec_max = float(np.max(vec_array))
-
-        if vec_max > vec_min:
+        if bm25_scores is None:
             try:
-                vector_normalized = ((vec_array - vec_min) / (vec_max - vec_min)).tolist()
+                self.bm25_indexer.build_index(documents, precomputed_tokens)
+                bm25_scores = self.bm25_indexer.get_scores(query)
             except Exception as e:
-                logger.error(f"Vector normalization failed: {e}")
-                vector_normalized = [1.0] * len(vector_scores)
-        else:
-            vector_normalized = [1.0] * len(vector_scores)  # All equal, use 1.0
-            logger.info(f"All vector scores equal ({vec_max:.4f}), using 1.0")
-
-        logger.info(f"Normalized vector scores: {vector_normalized[:3]}")
-
-        try:
-            self.bm25_indexer.build_index(documents)
-            logger.info("BM25 index built successfully")
-        except Exception as e:
-            logger.error(f"BM25 index build failed: {e}", exc_info=True)
-            raise
-
-        try:
-            bm25_scores = self.bm25_indexer.get_scores(query)
-            logger.info(f"BM25 scores retrieved: {len(bm25_scores)} scores")
-        except Exception as e:
-            logger.error(f"BM25 scoring failed: {e}", exc_info=True)
-            raise
-
-        # Normalize BM25 scores to 0-1 range with safe handling
-        try:
-            bm25_array = np.array(bm25_scores, dtype=np.float64)
-            bm25_min = float(np.min(bm25_array))
-            bm25_max = float(np.max(bm25_array))
-        except Exception as e:
-            logger.error(f"BM25 array conversion failed: {e}", exc_info=True)
-            raise
-
-        if bm25_max > bm25_min:
-            bm25_normalized = ((bm25_array - bm25_min) / (bm25_max - bm25_min)).tolist()
-        else:
-            # All equal - use 0.5 as neutral score
-            bm25_normalized = [0.5] * len(bm25_scores)
-            logger.info(f"All BM25 scores equal ({bm25_max:.4f}), using 0.5")
+                logger.error(f"BM25 scoring failed: {e}", exc_info=True)
+                raise
+
+        fused = self.fuse_scores(
+            np.asarray(vector_scores, dtype=np.float32),
+            np.asarray(bm25_scores, dtype=np.float32),
+            method or self.method,
+        )
+        results = top_k(fused, k)
 
         logger.info(
-            f"BM25 scores: min={bm25_min:.4f}, max={bm25_max:.4f}, normalized={bm25_normalized[:3]}"
+            f"Fused {len(documents)} results with {method or self.method}, alpha={self.alpha} "
+            f"(vector={self.alpha:.0%}, bm25={1 - self.alpha:.0%}), "
+            f"top score {results[0][1]:.4f}"
         )
+        return results
 
-        fused_scores = []
-        for i, (vec_score, bm25_score) in enumerate(zip(vector_normalized, bm25_normalized)):
-            fused = self.alpha * vec_score + (1 - self.alpha) * bm25_score
-            fused_scores.append((i, fused))
-            if i < 3:  # Log first 3 for debugging
-                logger.info(
-                    f"Doc {i}: vector={vec_score:.4f}, bm25={bm25_score:.4f}, fused={fused:.4f}"
-                )
+    def fuse_scores(
+        self, vector_scores: np.ndarray, bm25_scores: np.ndarray, method: FusionMethod
+    ) -> np.ndarray:
+        """
+        Combine per-candidate scores from both retrievers into one float32 array.
+
+        Args:
+            vector_scores: Vector similarity per candidate
+            bm25_scores: BM25 score per candidate
+            method: Fusion strategy
 
-        fused_scores.sort(key=lambda x: x[1], reverse=True)
+        Returns:
+            Fused score per candidate
+        """
+        if method == "rrf":
+            vector_part = reciprocal_ranks(vector_scores, self.rrf_k)
+            bm25_part = reciprocal_ranks(bm25_scores, self.rrf_k)
+        elif method == "zscore":
+            vector_part = zscore_normalize(vector_scores)
+            bm25_part = zscore_normalize(bm25_scores)
+        else:
+            # All-equal BM25 scores carry no signal: 0.5 keeps them neutral
+            vector_part = minmax_normalize(vector_scores, fill=1.0)
+            bm25_part = minmax_normalize(bm25_scores, fill=0.5)
+
+        return (self.alpha * vector_part + (1 - self.alpha) * bm25_part).astype(np.float32)
+
+    def fuse_rankings(
+        self, rankings: list[list[str]], k: int | None = None
+    ) -> list[tuple[str, float]]:
+        """
+        Reciprocal rank fusion of several ranked ID lists, e.g. one per query variant.
 
+        Args:
+            rankings: Point IDs per ranking, best first
+            k: Return only the k best IDs
+
+        Returns:
+            List of (point_id, fused_score) sorted by score descending
+        """
+        ids = list(dict.fromkeys(point_id for ranking in rankings for point_id in ranking))
+        if not ids:
+            return []
+
+        position = {point_id: i for i, point_id in enumerate(ids)}
+        fused = np.zeros(len(ids), dtype=np.float32)
+        for ranking in rankings:
+            for rank, point_id in enumerate(ranking, start=1):
+                fused[position[point_id]] += 1.0 / (self.rrf_k + rank)
+
+        results = [(ids[i], score) for i, score in top_k(fused, k)]
         logger.info(
-            f"Fused {len(documents)} results with alpha={self.alpha} "
-            f"(vector={self.alpha:.0%}, bm25={1 - self.alpha:.0%})"
+            f"Fused {len(rankings)} rankings ({len(ids)} unique results) with rrf, "
+            f"top score {results[0][1]:.4f}"
         )
-
-        return fused_scores
+        return results
@@ -0,0 +1,415 @@
+import json
+import math
+import os
+import shutil
+from collections import Counter
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+
+import numpy as np
+
+from src.config import get_settings
+from src.core.vector_store import get_qdrant_client
+from src.utils.logger import logger
+
+settings = get_settings()
+
+# Postings of one term: (doc numbers, term frequencies)
+Postings = tuple[np.ndarray, np.ndarray]
+
+
+def _load_array(path: Path) -> np.ndarray:
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        # Zero-length arrays cannot be memory-mapped
+        return np.load(path)
+
+
+def _build_postings(token_lists: list[list[str]]) -> dict[str, Postings]:
+    by_term: dict[str, tuple[list[int], list[int]]] = {}
+    for doc_no, tokens in enumerate(token_lists):
+        for term, tf in Counter(tokens).items():
+            docs, tfs = by_term.setdefault(term, ([], []))
+            docs.append(doc_no)
+            tfs.append(tf)
+    return {
+        term: (np.asarray(docs, dtype=np.int32), np.asarray(tfs, dtype=np.uint16))
+        for term, (docs, tfs) in by_term.items()
+    }
+
+
+class _Segment:
+    """Immutable, memory-mapped slice of the index: a term dictionary over flat postings arrays."""
+
+    def __init__(self, directory: Path):
+        self.name = directory.name
+        self.directory = directory
+        terms = json.loads((directory / "terms.json").read_text())
+        self.terms = {term: i for i, term in enumerate(terms)}
+        self.point_ids: list[str] = json.loads((directory / "ids.json").read_text())
+        self.offsets = _load_array(directory / "offsets.npy")
+        self.docs = _load_array(directory / "docs.npy")
+        self.tfs = _load_array(directory / "tfs.npy")
+        self.lengths = _load_array(directory / "lengths.npy")
+        self.live = np.ones(len(self.point_ids), dtype=bool)
+
+    @staticmethod
+    def write(
+        directory: Path, point_ids: list[str], lengths: np.ndarray, postings: dict[str, Postings]
+    ) -> None:
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        for i, term in enumerate(terms):
+            offsets[i + 1] = offsets[i] + len(postings[term][0])
+
+        directory.mkdir(parents=True)
+        (directory / "terms.json").write_text(json.dumps(terms))
+        (directory / "ids.json").write_text(json.dumps(point_ids))
+        np.save(directory / "offsets.npy", offsets)
+        np.save(directory / "lengths.npy", np.asarray(lengths, dtype=np.int32))
+        if terms:
+            np.save(directory / "docs.npy", np.concatenate([postings[t][0] for t in terms]))
+            np.save(directory / "tfs.npy", np.concatenate([postings[t][1] for t in terms]))
+        else:
+            np.save(directory / "docs.npy", np.zeros(0, dtype=np.int32))
+            np.save(directory / "tfs.npy", np.zeros(0, dtype=np.uint16))
+
+    def postings(self, term: str) -> Postings | None:
+        row = self.terms.get(term)
+        if row is None:
+            return None
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return self.docs[start:end], self.tfs[start:end]
+
+    @property
+    def live_count(self) -> int:
+        return int(np.count_nonzero(self.live))
+
+
+class InvertedIndex:
+    """
+    Persistent BM25 index over every chunk in the collection.
+
+    Each add() writes a new immutable segment of numpy arrays that is read back
+    memory-mapped; deletes are tombstones until the segment is merged. The
+    manifest listing live segments and tombstones is replaced atomically, so a
+    crash never leaves a half-written index visible.
+    """
+
+    def __init__(self, path: str, max_segments: int = 8, k1: float = 1.5, b: float = 0.75):
+        self.path = Path(path)
+        self.max_segments = max_segments
+        self.k1 = k1
+        self.b = b
+        self._lock = Lock()
+        self._segments: list[_Segment] = []
+        self._locations: dict[str, tuple[_Segment, int]] = {}
+        self._next_segment = 0
+        self._total_length = 0
+        self._load()
+
+    @property
+    def exists(self) -> bool:
+        return (self.path / "manifest.json").exists()
+
+    @property
+    def doc_count(self) -> int:
+        return sum(segment.live_count for segment in self._segments)
+
+    def add(self, point_ids: list[str], token_lists: list[list[str]]) -> None:
+        """
+        Index chunks; chunks already in the index are replaced.
+
+        Args:
+            point_ids: Qdrant point IDs
+            token_lists: BM25 lemmas of each chunk
+        """
+        if not point_ids:
+            return
+        with self._lock:
+            self._tombstone(point_ids)
+            self._add_segment(point_ids, token_lists)
+            if len(self._segments) > self.max_segments:
+                self._merge_smallest()
+            self._save_manifest()
+
+    def delete(self, point_ids: Iterable[str]) -> int:
+        with self._lock:
+            deleted = self._tombstone(point_ids)
+            if deleted:
+                self._save_manifest()
+        return deleted
+
+    def rebuild(self, batches: Iterable[tuple[list[str], list[list[str]]]]) -> None:
+        """
+        Replace the whole index with the given chunks.
+
+        Args:
+            batches: (point IDs, lemmas) batches covering the collection
+        """
+        with self._lock:
+            old = self._segments
+            self._segments = []
+            self._locations = {}
+            self._total_length = 0
+            for point_ids, token_lists in batches:
+                if point_ids:
+                    self._add_segment(point_ids, token_lists)
+            while len(self._segments) > 1:
+                self._merge(self._segments)
+            self._save_manifest()
+            for segment in old:
+                shutil.rmtree(segment.directory, ignore_errors=True)
+        logger.info(f"Rebuilt BM25 index with {self.doc_count} chunks")
+
+    def clear(self) -> None:
+        """Delete the index from disk; exists is False until the next add or rebuild."""
+        with self._lock:
+            (self.path / "manifest.json").unlink(missing_ok=True)
+            for segment in self._segments:
+                shutil.rmtree(segment.directory, ignore_errors=True)
+            self._segments = []
+            self._locations = {}
+            self._total_length = 0
+        logger.info("Deleted BM25 index")
+
+    def search(self, query_tokens: list[str], k: int) -> list[tuple[str, float]]:
+        """
+        Top-k chunks by BM25 over the whole collection.
+
+        Args:
+            query_tokens: Query lemmas
+            k: Number of hits
+
+        Returns:
+            (point ID, score) pairs, best first
+        """
+        segments, scores = self._score_segments(query_tokens)
+        candidates: list[tuple[float, _Segment, int]] = []
+        for segment, segment_scores in zip(segments, scores):
+            if segment_scores is None:
+                continue
+            hits = np.flatnonzero(segment_scores)
+            if len(hits) > k:
+                hits = hits[np.argpartition(segment_scores[hits], -k)[-k:]]
+            candidates.extend((float(segment_scores[doc]), segment, int(doc)) for doc in hits)
+
+        candidates.sort(key=lambda hit: hit[0], reverse=True)
+        return [(segment.point_ids[doc], score) for score, segment, doc in candidates[:k]]
+
+    def score(self, query_tokens: list[str], point_ids: list[str]) -> list[float]:
+        """BM25 scores of specific chunks (0.0 for chunks not in the index)."""
+        segments, scores = self._score_segments(query_tokens)
+        by_segment = {
+            segment.name: segment_scores for segment, segment_scores in zip(segments, scores)
+        }
+        result = []
+        for point_id in point_ids:
+            location = self._locations.get(point_id)
+            segment_scores = by_segment.get(location[0].name) if location else None
+            result.append(float(segment_scores[location[1]]) if segment_scores is not None else 0.0)
+        return result
+
+    def _score_segments(
+        self, query_tokens: list[str]
+    ) -> tuple[list[_Segment], list[np.ndarray | None]]:
+        segments = self._segments
+        doc_count = sum(segment.live_count for segment in segments)
+        if not query_tokens or doc_count == 0:
+            return segments, [None] * len(segments)
+
+        avg_length = max(self._total_length / doc_count, 1.0)
+        terms = Counter(query_tokens)
+        postings = {term: [segment.postings(term) for segment in segments] for term in terms}
+
+        idf = {}
+        for term, term_postings in postings.items():
+            df = sum(
+                int(np.count_nonzero(segment.live[found[0]]))
+                for segment, found in zip(segments, term_postings)
+                if found is not None
+            )
+            if df:
+                idf[term] = math.log((doc_count - df + 0.5) / (df + 0.5) + 1.0)
+
+        scores: list[np.ndarray | None] = []
+        for i, segment in enumerate(segments):
+            segment_scores = None
+            for term, query_tf in terms.items():
+                found = postings[term][i]
+                if term not in idf or found is None:
+                    continue
+                docs, tfs = found
+                if segment_scores is None:
+                    segment_scores = np.zeros(len(segment.point_ids), dtype=np.float32)
+                tf = tfs.astype(np.float32)
+                norm = self.k1 * (1 - self.b + self.b * segment.lengths[docs] / avg_length)
+                # A term's postings hold each doc once, so plain fancy-index addition is safe
+                segment_scores[docs] += query_tf * idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            if segment_scores is not None:
+                segment_scores[~segment.live] = 0.0
+            scores.append(segment_scores)
+        return segments, scores
+
+    def _add_segment(self, point_ids: list[str], token_lists: list[list[str]]) -> None:
+        directory = self.path / f"seg-{self._next_segment:06d}"
+        self._next_segment += 1
+        lengths = np.asarray([len(tokens) for tokens in token_lists], dtype=np.int32)
+        _Segment.write(directory, point_ids, lengths, _build_postings(token_lists))
+        self._register(_Segment(directory))
+
+    def _register(self, segment: _Segment) -> None:
+        self._segments = [*self._segments, segment]
+        for doc_no, point_id in enumerate(segment.point_ids):
+            if segment.live[doc_no]:
+                self._locations[point_id] = (segment, doc_no)
+        self._total_length += int(segment.lengths[segment.live].sum())
+
+    def _tombstone(self, point_ids: Iterable[str]) -> int:
+        deleted = 0
+        for point_id in point_ids:
+            location = self._locations.pop(point_id, None)
+            if location is not None:
+                segment, doc_no = location
+                segment.live[doc_no] = False
+                self._total_length -= int(segment.lengths[doc_no])
+                deleted += 1
+        return deleted
+
+    def _merge_smallest(self) -> None:
+        # Size-tiered: fold the smaller half together so big segments are rarely rewritten
+        by_size = sorted(self._segments, key=lambda segment: segment.live_count)
+        self._merge(by_size[: max(2, len(by_size) // 2)])
+
+    def _merge(self, merging: list[_Segment]) -> None:
+        point_ids: list[str] = []
+        lengths: list[np.ndarray] = []
+        remaps: list[np.ndarray] = []
+        for segment in merging:
+            remap = np.full(len(segment.point_ids), -1, dtype=np.int32)
+            live = np.flatnonzero(segment.live)
+            remap[live] = np.arange(len(point_ids), len(point_ids) + len(live), dtype=np.int32)
+            point_ids.extend(segment.point_ids[doc] for doc in live)
+            lengths.append(np.asarray(segment.lengths[live]))
+            remaps.append(remap)
+
+        postings: dict[str, Postings] = {}
+        for term in sorted(set().union(*(segment.terms for segment in merging))):
+            parts_docs = []
+            parts_tfs = []
+            for segment, remap in zip(merging, remaps):
+                found = segment.postings(term)
+                if found is None:
+                    continue
+                new_docs = remap[found[0]]
+                keep = new_docs >= 0
+                parts_docs.append(new_docs[keep])
+                parts_tfs.append(np.asarray(found[1])[keep])
+            if parts_docs and sum(len(part) for part in parts_docs):
+                postings[term] = (np.concatenate(parts_docs), np.concatenate(parts_tfs))
+
+        directory = self.path / f"seg-{self._next_segment:06d}"
+        self._next_segment += 1
+        _Segment.write(
+            directory,
+            point_ids,
+            np.concatenate(lengths) if lengths else np.zeros(0, dtype=np.int32),
+            postings,
+        )
+
+        merged_names = {segment.name for segment in merging}
+        for segment in merging:
+            self._total_length -= int(segment.lengths[segment.live].sum())
+        self._segments = [s for s in self._segments if s.name not in merged_names]
+        self._register(_Segment(directory))
+        self._save_manifest()
+        for segment in merging:
+            shutil.rmtree(segment.directory, ignore_errors=True)
+        logger.info(f"Merged {len(merging)} BM25 segments into {directory.name}")
+
+    def _save_manifest(self) -> None:
+        manifest = {
+            "next_segment": self._next_segment,
+            "segments": [segment.name for segment in self._segments],
+            "deleted": {
+                segment.name: np.flatnonzero(~segment.live).tolist()
+                for segment in self._segments
+                if not segment.live.all()
+            },
+        }
+        tmp_path = self.path / "manifest.json.tmp"
+        tmp_path.write_text(json.dumps(manifest))
+        os.replace(tmp_path, self.path / "manifest.json")
+
+    def _load(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.path / "manifest.json"
+        if not manifest_path.exists():
+            return
+
+        manifest = json.loads(manifest_path.read_text())
+        self._next_segment = manifest["next_segment"]
+        for name in manifest["segments"]:
+            segment = _Segment(self.path / name)
+            segment.live[manifest["deleted"].get(name, [])] = False
+            self._register(segment)
+
+        # Segments written after the last manifest update (crash mid-add) are garbage
+        listed = set(manifest["segments"])
+        for directory in self.path.glob("seg-*"):
+            if directory.name not in listed:
+                shutil.rmtree(directory, ignore_errors=True)
+        logger.info(f"Loaded BM25 index: {self.doc_count} chunks in {len(self._segments)} segments")
+
+
+@lru_cache(maxsize=1)
+def get_bm25_index() -> InvertedIndex:
+    return InvertedIndex(
+        str(Path(settings.DATA_DIR) / "bm25"), max_segments=settings.BM25_MAX_SEGMENTS
+    )
+
+
+def ensure_bm25_index() -> None:
+    """Build the BM25 index from the lemmas stored in Qdrant if there is none on disk yet."""
+    index = get_bm25_index()
+    if index.exists:
+        return
+
+    client = get_qdrant_client()
+
+    def pages() -> Iterable[tuple[list[str], list[list[str]]]]:
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=settings.QDRANT_COLLECTION_NAME,
+                limit=5000,
+                offset=offset,
+                with_payload=["lemmas"],
+                with_vectors=False,
+            )
+            with_lemmas = [point for point in points if (point.payload or {}).get("lemmas")]
+            yield (
+                [str(point.id) for point in with_lemmas],
+                [point.payload["lemmas"] for point in with_lemmas],  # type: ignore[index]
+            )
+            if offset is None:
+                return
+
+    logger.info("No BM25 index on disk, building it from the collection")
+    index.rebuild(pages())
+
+
+def drop_bm25_index() -> None:
+    """
+    Delete the BM25 index while server-side hybrid search is active.
+
+    The collection's sparse vectors serve keyword search then and ingestion stops
+    updating the index, so a kept one would go stale; ensure_bm25_index rebuilds it
+    when HYBRID_SEARCH switches to client.
+    """
+    index = get_bm25_index()
+    if index.exists:
+        index.clear()
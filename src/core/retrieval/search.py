@@ -1,9 +1,35 @@
+from dataclasses import dataclass
 from functools import lru_cache
 
 from langchain_qdrant import QdrantVectorStore
+from qdrant_client.models import (
+    Filter,
+    Fusion,
+    FusionQuery,
+    Prefetch,
+    QueryRequest,
+    Record,
+    ScoredPoint,
+    SparseVector,
+)
 
 from src.config import get_settings
-from src.core.vector_store import get_embeddings, get_qdrant_client
+from src.core.caching.query_cache import (
+    aembed_queries,
+    aembed_query,
+    cached_search,
+    embedding_hash,
+)
+from src.core.retrieval.filters import restrict_to_ids
+from src.core.retrieval.sparse import sparse_query_vector
+from src.core.retrieval.tokenizer import tokenize
+from src.core.vector_store import (
+    get_async_qdrant_client,
+    get_collection_layout,
+    get_embeddings,
+    get_qdrant_client,
+    get_search_params,
+)
 from src.utils.logger import logger
 
 settings = get_settings()
@@ -17,6 +43,7 @@ def get_vector_store() -> QdrantVectorStore:
         client=get_qdrant_client(),
         collection_name=settings.QDRANT_COLLECTION_NAME,
         embedding=get_embeddings(),
+        vector_name=get_collection_layout().dense,
     )
 
     return vector_store
@@ -34,3 +61,274 @@ def get_retriever():
 
     logger.info("Created retriever with k=10")
     return retriever
+
+
+async def get_chunk_lemmas(point_ids: list[str]) -> dict[str, list[str]]:
+    """
+    Fetch the BM25 lemmas stored on chunk payloads at ingestion time.
+
+    Args:
+        point_ids: Qdrant point IDs of retrieved chunks
+
+    Returns:
+        Mapping of point ID to lemmas (points ingested without lemmas are omitted)
+    """
+    if not point_ids:
+        return {}
+
+    points = await get_async_qdrant_client().retrieve(
+        collection_name=settings.QDRANT_COLLECTION_NAME,
+        ids=point_ids,
+        with_payload=["lemmas"],
+        with_vectors=False,
+    )
+
+    return {
+        str(point.id): point.payload["lemmas"]
+        for point in points
+        if point.payload and point.payload.get("lemmas") is not None
+    }
+
+
+@dataclass
+class SearchHit:
+    point_id: str
+    text: str
+    score: float
+    # Chunk position, for neighbour expansion; None on points stored without it
+    document_id: str | None = None
+    chunk_index: int | None = None
+
+
+HIT_PAYLOAD = ["page_content", "document_id", "chunk_index"]
+
+
+async def get_chunks(
+    point_ids: list[str], query_filter: Filter | None = None
+) -> dict[str, SearchHit]:
+    """
+    Fetch chunks found by keyword search only.
+
+    Args:
+        point_ids: Qdrant point IDs
+        query_filter: Drop points that don't match this payload filter
+
+    Returns:
+        Mapping of point ID to hit (score 0) for points with page_content
+    """
+    if not point_ids:
+        return {}
+
+    client = get_async_qdrant_client()
+    if query_filter is None:
+        points = await client.retrieve(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            ids=point_ids,
+            with_payload=HIT_PAYLOAD,
+            with_vectors=False,
+        )
+    else:
+        # The BM25 index has no payload; let Qdrant apply the filter to its hits
+        points, _ = await client.scroll(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            scroll_filter=restrict_to_ids(point_ids, query_filter),
+            limit=len(point_ids),
+            with_payload=HIT_PAYLOAD,
+            with_vectors=False,
+        )
+
+    return {hit.point_id: hit for hit in _hits(points) if hit.text}
+
+
+def _hits(points: list[ScoredPoint] | list[Record]) -> list[SearchHit]:
+    hits = []
+    for point in points:
+        payload = point.payload or {}
+        hits.append(
+            SearchHit(
+                point_id=str(point.id),
+                text=payload.get("page_content", ""),
+                score=getattr(point, "score", 0.0),
+                document_id=payload.get("document_id"),
+                chunk_index=payload.get("chunk_index"),
+            )
+        )
+    return hits
+
+
+def _hybrid_request(
+    dense: list[float], sparse: SparseVector, k: int, query_filter: Filter | None
+) -> QueryRequest:
+    layout = get_collection_layout()
+    limit = max(settings.HYBRID_PREFETCH_LIMIT, k)
+    prefetch = [
+        Prefetch(
+            query=dense,
+            using=layout.dense,
+            filter=query_filter,
+            limit=limit,
+            params=get_search_params(),
+        )
+    ]
+    if sparse.indices:
+        prefetch.append(
+            Prefetch(query=sparse, using=layout.sparse, filter=query_filter, limit=limit)
+        )
+
+    return QueryRequest(
+        prefetch=prefetch,
+        query=FusionQuery(fusion=Fusion.DBSF if settings.HYBRID_FUSION == "dbsf" else Fusion.RRF),
+        filter=query_filter,
+        limit=k,
+        with_payload=HIT_PAYLOAD,
+        with_vector=False,
+    )
+
+
+def _dense_request(embedding: list[float], k: int, query_filter: Filter | None) -> QueryRequest:
+    return QueryRequest(
+        query=embedding,
+        using=get_collection_layout().dense or None,
+        filter=query_filter,
+        params=get_search_params(),
+        limit=k,
+        with_payload=HIT_PAYLOAD,
+        with_vector=False,
+    )
+
+
+async def _query(requests: list[QueryRequest]) -> list[list[SearchHit]]:
+    """Run the requests in one round trip, one hit list per request."""
+    responses = await get_async_qdrant_client().query_batch_points(
+        collection_name=settings.QDRANT_COLLECTION_NAME, requests=requests
+    )
+    return [_hits(response.points) for response in responses]
+
+
+async def hybrid_search(
+    query: str, k: int = 10, query_filter: Filter | None = None
+) -> list[SearchHit]:
+    """
+    Dense and sparse search fused by Qdrant in a single query.
+
+    Both vectors are prefetched on the server and combined with HYBRID_FUSION (RRF or
+    distribution-based score fusion), so no BM25 scoring runs in Python.
+
+    Args:
+        query: Search query
+        k: Number of fused results
+        query_filter: Payload filter applied inside both prefetches
+
+    Returns:
+        Hits sorted by fused score, best first
+    """
+    dense = await aembed_query(query)
+    sparse = sparse_query_vector(tokenize(query))
+
+    async def search() -> list[SearchHit]:
+        return (await _query([_hybrid_request(dense, sparse, k, query_filter)]))[0]
+
+    return await cached_search(
+        (
+            "hybrid",
+            embedding_hash(dense),
+            sparse.indices,
+            k,
+            max(settings.HYBRID_PREFETCH_LIMIT, k),
+            settings.HYBRID_FUSION,
+            query_filter,
+        ),
+        search,
+    )
+
+
+async def similarity_search(
+    query: str, k: int = 10, query_filter: Filter | None = None
+) -> list[SearchHit]:
+    """
+    Dense similarity search with the query embedding and results served from caches.
+
+    Args:
+        query: Search query
+        k: Number of results
+        query_filter: Payload filter applied during the search
+
+    Returns:
+        Hits sorted by similarity, best first
+    """
+    embedding = await aembed_query(query)
+
+    async def search() -> list[SearchHit]:
+        return (await _query([_dense_request(embedding, k, query_filter)]))[0]
+
+    return await cached_search(("dense", embedding_hash(embedding), k, query_filter), search)
+
+
+async def multi_query_search(
+    queries: list[str], k: int = 10, query_filter: Filter | None = None, hybrid: bool = False
+) -> list[list[SearchHit]]:
+    """
+    Search with several query variants: one embedding request and one Qdrant batch query.
+
+    Args:
+        queries: Query variants
+        k: Number of results per variant
+        query_filter: Payload filter applied to every search
+        hybrid: Use the server-side hybrid query instead of dense search
+
+    Returns:
+        One hit list per variant, each best first
+    """
+    embeddings = await aembed_queries(queries)
+    if hybrid:
+        sparse = [sparse_query_vector(tokenize(query)) for query in queries]
+        requests = [
+            _hybrid_request(dense, vector, k, query_filter)
+            for dense, vector in zip(embeddings, sparse)
+        ]
+        key: tuple = (
+            "multi_hybrid",
+            tuple(embedding_hash(e) for e in embeddings),
+            tuple(tuple(vector.indices) for vector in sparse),
+            k,
+            max(settings.HYBRID_PREFETCH_LIMIT, k),
+            settings.HYBRID_FUSION,
+            query_filter,
+        )
+    else:
+        requests = [_dense_request(embedding, k, query_filter) for embedding in embeddings]
+        key = ("multi_dense", tuple(embedding_hash(e) for e in embeddings), k, query_filter)
+
+    async def search() -> list[list[SearchHit]]:
+        return await _query(requests)
+
+    return await cached_search(key, search)
+
+
+async def get_chunk_vectors(point_ids: list[str]) -> dict[str, list[float]]:
+    """
+    Fetch the dense embeddings of retrieved chunks.
+
+    Args:
+        point_ids: Qdrant point IDs
+
+    Returns:
+        Mapping of point ID to embedding
+    """
+    if not point_ids:
+        return {}
+
+    dense = get_collection_layout().dense
+    points = await get_async_qdrant_client().retrieve(
+        collection_name=settings.QDRANT_COLLECTION_NAME,
+        ids=point_ids,
+        with_payload=False,
+        with_vectors=[dense] if dense else True,
+    )
+
+    vectors = {}
+    for point in points:
+        vector = point.vector[dense] if isinstance(point.vector, dict) else point.vector
+        if vector is not None:
+            vectors[str(point.id)] = vector
+    return vectors
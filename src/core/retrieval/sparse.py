@@ -0,0 +1,40 @@
+import hashlib
+from collections import Counter
+
+from qdrant_client.models import SparseVector
+
+# BM25 term-frequency saturation; Qdrant applies IDF server-side (Modifier.IDF)
+K1 = 1.5
+B = 0.75
+# Expected chunk length in terms; chunk lengths vary too little to track a corpus average
+AVG_DOC_TERMS = 180
+
+
+def term_index(term: str) -> int:
+    """Stable sparse dimension for a term, shared by every process and deployment."""
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def _grouped(counts: Counter[int], weight) -> SparseVector:
+    indices = sorted(counts)
+    return SparseVector(indices=indices, values=[weight(counts[i]) for i in indices])
+
+
+def sparse_document_vector(terms: list[str]) -> SparseVector:
+    """
+    Sparse BM25 vector for a chunk from its index terms.
+
+    Args:
+        terms: Lemmas produced by index_terms at ingestion
+
+    Returns:
+        Saturated term frequency per hashed term
+    """
+    counts = Counter(term_index(term) for term in terms)
+    norm = K1 * (1 - B + B * len(terms) / AVG_DOC_TERMS)
+    return _grouped(counts, lambda tf: tf * (K1 + 1) / (tf + norm))
+
+
+def sparse_query_vector(terms: list[str]) -> SparseVector:
+    """Sparse query vector: weight 1 per distinct term, so scores sum IDF * tf-part."""
+    return _grouped(Counter(term_index(term) for term in set(terms)), lambda _: 1.0)
@@ -1,18 +1,35 @@
+import hashlib
+import re
+from collections import OrderedDict
+from threading import Lock
+
 import spacy
+from spacy.lang.en.stop_words import STOP_WORDS
 from spacy.language import Language
+from spacy.tokens import Doc
 
+from src.config import get_settings
 from src.utils.logger import logger
 
+settings = get_settings()
+
+# Lemmas and stop/punct flags only need the tagger and attribute ruler
+FAST_EXCLUDED_COMPONENTS = ["parser", "ner"]
+
 _nlp: Language | None = None
 
+_cache: OrderedDict[bytes, tuple[str, ...]] = OrderedDict()
+_cache_lock = Lock()
+
 
 def get_spacy_model() -> Language:
     """Get or load spaCy model (cached)."""
     global _nlp
     if _nlp is None:
+        exclude = FAST_EXCLUDED_COMPONENTS if settings.TOKENIZER_MODE == "fast" else []
         try:
-            _nlp = spacy.load("en_core_web_sm")
-            logger.info("Loaded spaCy model for tokenization")
+            _nlp = spacy.load("en_core_web_sm", exclude=exclude)
+            logger.info(f"Loaded spaCy model for tokenization (mode={settings.TOKENIZER_MODE})")
         except OSError:
             logger.error(
                 "spaCy model 'en_core_web_sm' not found"  # noqa: E501
@@ -21,24 +38,22 @@ def get_spacy_model() -> Language:
     return _nlp
 
 
-def tokenize(text: str) -> list[str]:
+def lemmas_from_doc(doc: Doc) -> list[str]:
     """
-    Tokenize text using spaCy for BM25 indexing.
+    Extract BM25 terms from an already-parsed spaCy doc.
+
+    Shared by query-time tokenization and ingestion-time enrichment so both
+    sides of the BM25 index produce the same terms. Both parse text in its
+    original case (tags and lemmas depend on it) and lowercase the lemmas here.
 
     Args:
-        text: Input text to tokenize
+        doc: spaCy document parsed from the original-case text
 
     Returns:
-        List of tokens (lemmatized, filtered for relevance)
+        List of lowercased lemmas, filtered for relevance
     """
-    if not text or not text.strip():
-        return []
-
-    nlp = get_spacy_model()
-    doc = nlp(text.lower())
-
     tokens = [
-        token.lemma_
+        (token.lemma_ or token.text).lower()
         for token in doc
         if not token.is_stop  # Remove stop words
         and not token.is_punct  # Remove punctuation
@@ -49,10 +64,127 @@ def tokenize(text: str) -> list[str]:
 
     # Fallback: if no tokens after filtering, use all alphabetic tokens
     if not tokens:
-        tokens = [
-            token.text.lower()
-            for token in doc
-            if token.is_alpha and len(token.text) > 1
-        ]
+        tokens = [token.text.lower() for token in doc if token.is_alpha and len(token.text) > 1]
 
     return tokens
+
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def _simple_lemma(word: str) -> str:
+    # Suffix rules for the common regular inflections; irregular forms pass through
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("sses", "xes", "ches", "shes", "zes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    for suffix in ("ing", "ed"):
+        stem = word[: -len(suffix)]
+        if len(stem) > 2 and word.endswith(suffix):
+            # running -> run, stopped -> stop
+            if len(stem) > 3 and stem[-1] == stem[-2] and stem[-1] not in "lsz":
+                return stem[:-1]
+            return stem
+    return word
+
+
+def simple_lemmas(text: str) -> list[str]:
+    """
+    Pure-Python approximation of lemmas_from_doc: regex words, spaCy's stop list and suffix rules.
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of lowercased lemmas
+    """
+    # Drop clitics the way spaCy splits them: "don't" -> "do", "user's" -> "user"
+    words = [
+        word[:-3] if word.endswith("n't") else word.split("'")[0]
+        for word in _WORD_RE.findall(text.lower())
+    ]
+    tokens = [_simple_lemma(word) for word in words if len(word) > 1 and word not in STOP_WORDS]
+    if not tokens:
+        tokens = [word for word in words if word.isalpha() and len(word) > 1]
+    return tokens
+
+
+def index_terms(text: str, doc: Doc) -> list[str]:
+    """
+    BM25 terms for a chunk at ingestion, matching what tokenize produces at query time.
+
+    Args:
+        text: Chunk text
+        doc: Parse of the chunk in its original case (used unless TOKENIZER_MODE is simple)
+
+    Returns:
+        List of lowercased lemmas
+    """
+    return simple_lemmas(text) if settings.TOKENIZER_MODE == "simple" else lemmas_from_doc(doc)
+
+
+def _cache_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def tokenize_many(texts: list[str]) -> list[list[str]]:
+    """
+    Tokenize several texts for BM25, serving repeats from an LRU cache.
+
+    Cache misses go through one nlp.pipe call (or simple_lemmas in simple mode).
+
+    Args:
+        texts: Input texts
+
+    Returns:
+        Tokens per text, in input order
+    """
+    results: list[list[str] | None] = [None] * len(texts)
+    misses: list[int] = []
+
+    with _cache_lock:
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                results[i] = []
+                continue
+            key = _cache_key(text)
+            cached = _cache.get(key)
+            if cached is None:
+                misses.append(i)
+            else:
+                _cache.move_to_end(key)
+                results[i] = list(cached)
+
+    if misses:
+        if settings.TOKENIZER_MODE == "simple":
+            tokenized = [simple_lemmas(texts[i]) for i in misses]
+        else:
+            # Parsed in original case like chunks at ingestion; lemmas_from_doc lowercases
+            docs = get_spacy_model().pipe(
+                (texts[i] for i in misses), batch_size=settings.SPACY_BATCH_SIZE
+            )
+            tokenized = [lemmas_from_doc(doc) for doc in docs]
+
+        with _cache_lock:
+            for i, tokens in zip(misses, tokenized):
+                results[i] = tokens
+                _cache[_cache_key(texts[i])] = tuple(tokens)
+            while len(_cache) > settings.TOKENIZER_CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    return results  # type: ignore[return-value]
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Tokenize text using spaCy for BM25 indexing.
+
+    Args:
+        text: Input text to tokenize
+
+    Returns:
+        List of tokens (lemmatized, filtered for relevance)
+    """
+    return tokenize_many([text])[0]
@@ -6,9 +6,12 @@ class AgentState(TypedDict, total=False):
     generation: str
     web_search: bool
     explicit_web_search: bool
+    used_web_search: bool  # Set once web results join the documents; never reset
     documents: list[str]
     retrieval_attempts: int
     generation_attempts: int
     hallucination_grounded: str
     answer_quality: str
     docs_retrieved_total: int
+    fusion_method: str | None
+    filters: dict[str, list[str]] | None
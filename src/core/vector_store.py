@@ -1,37 +1,169 @@
+import asyncio
+from dataclasses import dataclass
 from functools import lru_cache
+from threading import Lock
+from typing import Any, cast
 
+import httpx
 from langchain_openai import OpenAIEmbeddings
 from pydantic import SecretStr
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Distance,
+    HnswConfigDiff,
+    Modifier,
+    PayloadSchemaType,
+    QuantizationConfig,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    SparseVectorParams,
+    VectorParams,
+)
 
 from src.config import get_settings
 from src.utils.logger import logger
 
 settings = get_settings()
 
+DENSE_VECTOR_NAME = "dense"
+SPARSE_VECTOR_NAME = "sparse"
+
+
+PAYLOAD_INDEXES = {
+    "content_hash": PayloadSchemaType.KEYWORD,
+    "document_id": PayloadSchemaType.KEYWORD,
+    "filename": PayloadSchemaType.KEYWORD,
+    "file_extension": PayloadSchemaType.KEYWORD,
+    "entities": PayloadSchemaType.KEYWORD,
+    "keywords": PayloadSchemaType.KEYWORD,
+    "chunk_index": PayloadSchemaType.INTEGER,
+}
+
+
+@dataclass(frozen=True)
+class CollectionLayout:
+    """Vector names of the collection; dense is "" for collections with one unnamed vector."""
+
+    dense: str
+    sparse: str | None
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    """Storage trade-off for the dense vectors, selected with QDRANT_COLLECTION_PROFILE."""
+
+    quantization: str | None  # "scalar" (int8, 4x smaller) or "binary" (1 bit, 32x smaller)
+    on_disk: bool  # Originals on disk; only the quantized copy stays in RAM
+    oversampling: float  # Candidates fetched per result from the quantized index
+
+
+COLLECTION_PROFILES = {
+    "default": CollectionProfile(quantization=None, on_disk=False, oversampling=1.0),
+    "scalar": CollectionProfile(quantization="scalar", on_disk=True, oversampling=2.0),
+    "binary": CollectionProfile(quantization="binary", on_disk=True, oversampling=3.0),
+}
+
+
+def is_embedded() -> bool:
+    """Whether QDRANT_URL selects the in-process local mode (":memory:" or a directory)."""
+    return bool(settings.QDRANT_URL) and "://" not in settings.QDRANT_URL
+
+
+def _client_options() -> dict[str, Any]:
+    """Connection options shared by the sync and async clients."""
+    if is_embedded():
+        logger.info(f"Using embedded Qdrant at {settings.QDRANT_URL}")
+        if settings.QDRANT_URL == ":memory:":
+            return {"location": ":memory:"}
+        # Shared with the worker threads that serve async calls
+        return {"path": settings.QDRANT_URL, "force_disable_check_same_thread": True}
+
+    is_local = any(x in settings.QDRANT_URL for x in ["localhost", "127.0.0.1", "qdrant:6333"])
+
+    options: dict[str, Any] = {
+        "url": settings.QDRANT_URL,
+        "timeout": settings.QDRANT_TIMEOUT,
+        "prefer_grpc": settings.QDRANT_PREFER_GRPC,
+        "grpc_port": settings.QDRANT_GRPC_PORT,
+    }
+    if not is_local:
+        options.update(api_key=settings.QDRANT_API_KEY, https=True, port=443)
+
+    keepalive_ms = int(settings.QDRANT_KEEPALIVE_SECONDS * 1000)
+    if settings.QDRANT_PREFER_GRPC:
+        # Channels are reused round-robin; pings keep idle ones from being dropped by proxies
+        options["pool_size"] = settings.QDRANT_POOL_SIZE
+        options["grpc_options"] = {
+            "grpc.keepalive_time_ms": keepalive_ms,
+            "grpc.keepalive_permit_without_calls": 1,
+        }
+    else:
+        options["limits"] = httpx.Limits(
+            max_connections=settings.QDRANT_POOL_SIZE,
+            max_keepalive_connections=settings.QDRANT_POOL_SIZE,
+            keepalive_expiry=settings.QDRANT_KEEPALIVE_SECONDS,
+        )
+
+    transport = "gRPC" if settings.QDRANT_PREFER_GRPC else "HTTP"
+    location = "local Qdrant" if is_local else "Qdrant Cloud"
+    logger.info(f"Connecting to {location} at {settings.QDRANT_URL} over {transport}")
+    return options
+
+
+class ThreadedQdrantClient:
+    """
+    AsyncQdrantClient interface over a blocking client.
+
+    An embedded store can only be opened once per process, so async callers share the
+    sync client; each call runs in a worker thread, one at a time since local mode
+    isn't thread-safe.
+    """
+
+    def __init__(self, client: QdrantClient):
+        self._client = client
+        self._lock = Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._client, name)
+        if not callable(method):
+            return method
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            def locked() -> Any:
+                with self._lock:
+                    return method(*args, **kwargs)
+
+            return await asyncio.to_thread(locked)
+
+        return call
+
 
 @lru_cache
 def get_qdrant_client() -> QdrantClient:
-    is_local = any(
-        x in settings.QDRANT_URL for x in ["localhost", "127.0.0.1", "qdrant:6333"]
-    )
+    """Blocking client, for scripts, startup and work already running in a thread."""
+    return QdrantClient(**_client_options())
 
-    if is_local:
-        logger.info(f"Connecting to local Qdrant at {settings.QDRANT_URL}")
-        return QdrantClient(
-            url=settings.QDRANT_URL,
-        )
 
-    logger.info(f"Connecting to Qdrant Cloud at {settings.QDRANT_URL}")
-    return QdrantClient(
-        url=settings.QDRANT_URL,
-        api_key=settings.QDRANT_API_KEY,
-        prefer_grpc=False,
-        timeout=30,
-        https=True,
-        port=443,
-    )
+@lru_cache
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    """
+    Pooled client for request handlers and ingestion, so Qdrant I/O never blocks the
+    event loop. Bound to the event loop that first uses it; close it on shutdown.
+    """
+    if is_embedded():
+        return cast(AsyncQdrantClient, ThreadedQdrantClient(get_qdrant_client()))
+    return AsyncQdrantClient(**_client_options())
+
+
+async def close_async_qdrant_client() -> None:
+    if get_async_qdrant_client.cache_info().currsize:
+        await get_async_qdrant_client().close()
+        get_async_qdrant_client.cache_clear()
 
 
 def get_embeddings() -> OpenAIEmbeddings:
@@ -42,22 +174,132 @@ def get_embeddings() -> OpenAIEmbeddings:
     return OpenAIEmbeddings(
         api_key=SecretStr(api_key),
         model=settings.EMBEDDING_MODEL,
+        # text-embedding-3 models are Matryoshka-trained and return truncated vectors natively
+        dimensions=(
+            settings.EMBEDDING_DIMENSION
+            if settings.EMBEDDING_MODEL.startswith("text-embedding-3")
+            else None
+        ),
+    )
+
+
+def get_collection_profile(name: str | None = None) -> CollectionProfile:
+    return COLLECTION_PROFILES[name or settings.QDRANT_COLLECTION_PROFILE]
+
+
+def quantization_config(profile: CollectionProfile) -> QuantizationConfig | None:
+    if profile.quantization == "scalar":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if profile.quantization == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def hnsw_config() -> HnswConfigDiff:
+    return HnswConfigDiff(m=settings.QDRANT_HNSW_M, ef_construct=settings.QDRANT_HNSW_EF_CONSTRUCT)
+
+
+def create_collection(
+    name: str, dimension: int | None = None, profile: CollectionProfile | None = None
+) -> None:
+    """
+    Create a named dense + sparse collection with the given storage profile.
+
+    Args:
+        name: Collection name
+        dimension: Dense vector size; defaults to EMBEDDING_DIMENSION
+        profile: Storage profile; defaults to QDRANT_COLLECTION_PROFILE
+    """
+    profile = profile or get_collection_profile()
+    get_qdrant_client().create_collection(
+        collection_name=name,
+        vectors_config={
+            DENSE_VECTOR_NAME: VectorParams(
+                size=dimension or settings.EMBEDDING_DIMENSION,
+                distance=Distance.COSINE,
+                on_disk=profile.on_disk,
+            )
+        },
+        # Chunks carry BM25 term weights; Qdrant applies IDF over the whole collection
+        sparse_vectors_config={SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)},
+        hnsw_config=hnsw_config(),
+        quantization_config=quantization_config(profile),
     )
 
 
+def get_search_params(profile: CollectionProfile | None = None) -> SearchParams:
+    """
+    Dense search parameters for a profile: HNSW ef and, on quantized collections,
+    oversampling with rescoring against the original vectors.
+
+    Args:
+        profile: Storage profile; defaults to QDRANT_COLLECTION_PROFILE
+
+    Returns:
+        Search parameters
+    """
+    profile = profile or get_collection_profile()
+    quantization = None
+    if profile.quantization:
+        quantization = QuantizationSearchParams(
+            rescore=settings.QDRANT_SEARCH_RESCORE,
+            oversampling=settings.QDRANT_SEARCH_OVERSAMPLING or profile.oversampling,
+        )
+    return SearchParams(hnsw_ef=settings.QDRANT_HNSW_EF or None, quantization=quantization)
+
+
 def ensure_collection_exists() -> None:
     client = get_qdrant_client()
 
     if client.collection_exists(settings.QDRANT_COLLECTION_NAME):
         logger.info(f"Collection '{settings.QDRANT_COLLECTION_NAME}' already exists")
-        return
-
-    logger.info(f"Creating collection '{settings.QDRANT_COLLECTION_NAME}'")
-    client.create_collection(
-        collection_name=settings.QDRANT_COLLECTION_NAME,
-        vectors_config=VectorParams(
-            size=settings.EMBEDDING_DIMENSION,
-            distance=Distance.COSINE,
-        ),
-    )
-    logger.info(f"Collection '{settings.QDRANT_COLLECTION_NAME}' created successfully")
+    else:
+        logger.info(
+            f"Creating collection '{settings.QDRANT_COLLECTION_NAME}' "
+            f"(profile {settings.QDRANT_COLLECTION_PROFILE})"
+        )
+        create_collection(settings.QDRANT_COLLECTION_NAME)
+        logger.info(f"Collection '{settings.QDRANT_COLLECTION_NAME}' created successfully")
+
+    get_collection_layout.cache_clear()
+    layout = get_collection_layout()
+    if layout.sparse is None:
+        logger.warning(
+            f"Collection '{settings.QDRANT_COLLECTION_NAME}' has no sparse vectors; "
+            "hybrid search runs client-side until it is migrated (make migrate)"
+        )
+
+    if is_embedded():
+        return  # Local mode scans payloads and has no payload indexes
+
+    # Idempotent; dedup, per-document chunk lookups and query filters become index hits
+    for field_name, schema in PAYLOAD_INDEXES.items():
+        client.create_payload_index(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            field_name=field_name,
+            field_schema=schema,
+        )
+
+
+@lru_cache(maxsize=1)
+def get_collection_layout() -> CollectionLayout:
+    """
+    Read which vectors the collection stores.
+
+    Collections created before hybrid search have a single unnamed dense vector and
+    keep working with it.
+
+    Returns:
+        Dense and sparse vector names
+    """
+    params = get_qdrant_client().get_collection(settings.QDRANT_COLLECTION_NAME).config.params
+    dense = DENSE_VECTOR_NAME if isinstance(params.vectors, dict) else ""
+    sparse = SPARSE_VECTOR_NAME if SPARSE_VECTOR_NAME in (params.sparse_vectors or {}) else None
+    return CollectionLayout(dense=dense, sparse=sparse)
+
+
+def use_server_hybrid() -> bool:
+    """Whether retrieval can run as one dense + sparse Qdrant query."""
+    return settings.HYBRID_SEARCH == "server" and get_collection_layout().sparse is not None
@@ -1,11 +1,21 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
 from src.api.routes import router
 from src.api.schemas import HealthResponse
 from src.config import get_settings
-from src.core.vector_store import ensure_collection_exists
+from src.core.document_processing.text_processor import shutdown_extraction_pool
+from src.core.ingestion.jobs import get_ingestion_queue
+from src.core.retrieval.document_index import drop_document_index, ensure_document_index
+from src.core.retrieval.inverted_index import drop_bm25_index, ensure_bm25_index
+from src.core.vector_store import (
+    close_async_qdrant_client,
+    ensure_collection_exists,
+    use_server_hybrid,
+)
 from src.utils.logger import logger
 
 settings = get_settings()
@@ -15,9 +25,22 @@ settings = get_settings()
 async def lifespan(app: FastAPI):
     logger.info("Starting up application")
     ensure_collection_exists()
+    if use_server_hybrid():
+        await asyncio.to_thread(drop_bm25_index)
+    else:
+        await asyncio.to_thread(ensure_bm25_index)
+    if settings.RETRIEVAL_MODE == "two_level":
+        await asyncio.to_thread(ensure_document_index)
+    else:
+        await asyncio.to_thread(drop_document_index)
+    ingestion_queue = get_ingestion_queue()
+    await ingestion_queue.start()
     logger.info("Application startup complete")
     yield
     logger.info("Shutting down application")
+    await ingestion_queue.stop()
+    shutdown_extraction_pool()
+    await close_async_qdrant_client()
 
 
 app = FastAPI(
@@ -30,6 +53,26 @@ app = FastAPI(
 app.include_router(router, prefix="/api", tags=["documents"])
 
 
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    # Reject before the multipart body is read; handle_upload also enforces the limit
+    # while streaming in case Content-Length is missing or wrong.
+    if request.url.path.startswith("/api/upload"):
+        content_length = request.headers.get("content-length")
+        max_size_mb = (
+            settings.MAX_BULK_UPLOAD_SIZE_MB
+            if request.url.path == "/api/upload/bulk"
+            else settings.MAX_UPLOAD_SIZE_MB
+        )
+        if content_length and content_length.isdigit():
+            if int(content_length) > max_size_mb * 1024 * 1024:
+                return JSONResponse(
+                    status_code=413,
+                    content={"detail": f"File too large. Maximum: {max_size_mb} MB"},
+                )
+    return await call_next(request)
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     return {
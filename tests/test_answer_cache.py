@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+import src.api.handlers.query as query_handler
+import src.core.nodes as nodes
+from src.api.schemas import QueryRequest
+from src.core.caching.answer_cache import AnswerCache
+
+
+class FakeWebSearchTool:
+    def invoke(self, question: str) -> str:
+        return f"Web result about {question}"
+
+
+class PassthroughGuardrails:
+    def register_rag_action(self, action):
+        self.action = action
+
+    async def generate_safe(self, message: str) -> str:
+        return await self.action(message)
+
+
+class WebRoutedAgent:
+    """Runs the web search and grading nodes the way the graph does for a web-routed question."""
+
+    async def ainvoke(self, state: dict) -> dict:
+        state = {**state, "web_search": True}
+        state.update(nodes.web_search_node(state))  # type: ignore[arg-type]
+        state.update(nodes.grade_documents_node(state))  # type: ignore[arg-type]
+        return {**state, "generation": "Answer from the web"}
+
+
+@pytest.fixture
+def cache(monkeypatch) -> AnswerCache:
+    answer_cache = AnswerCache(max_entries=16, ttl_seconds=3600, similarity_threshold=0.95)
+    monkeypatch.setattr(query_handler, "get_answer_cache", lambda: answer_cache)
+    monkeypatch.setattr(query_handler, "get_guardrails", lambda: PassthroughGuardrails())
+    monkeypatch.setattr(query_handler, "get_agent", lambda: WebRoutedAgent())
+    monkeypatch.setattr(query_handler.settings, "ANSWER_CACHE_SEMANTIC", False)
+    monkeypatch.setattr(nodes, "get_web_search_tool", lambda: FakeWebSearchTool())
+    # Web results graded relevant: grading resets web_search to False
+    monkeypatch.setattr(
+        nodes, "grade_documents_batch", lambda question, documents: ["yes"] * len(documents)
+    )
+    return answer_cache
+
+
+def test_web_search_answers_are_not_cached(cache):
+    result = asyncio.run(query_handler.handle_query(QueryRequest(question="Latest news?")))
+
+    assert result["answer"] == "Answer from the web"
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_exact_hit_ignores_case_and_punctuation():
+    answer_cache = AnswerCache(max_entries=4, ttl_seconds=3600, similarity_threshold=0.95)
+    answer_cache.put("What is RAG?", "rrf", 1, "Retrieval-augmented generation", 3)
+
+    entry = answer_cache.get("  what is   rag ", "rrf", 1)
+
+    assert entry is not None and entry.answer == "Retrieval-augmented generation"
+    assert answer_cache.get("What is RAG?", "weighted", 1) is None
+    assert answer_cache.get_stats()["exact_hits"] == 1
+
+
+def test_semantic_hit_above_threshold():
+    answer_cache = AnswerCache(max_entries=4, ttl_seconds=3600, similarity_threshold=0.95)
+    answer_cache.put("What is RAG?", "rrf", 1, "Retrieval", 3, embedding=[1.0, 0.0, 0.0])
+    answer_cache.put("Who won?", "rrf", 1, "Nobody", 1, embedding=[0.0, 1.0, 0.0])
+
+    hit = answer_cache.get_similar([0.99, 0.05, 0.0], "rrf", 1)
+
+    assert hit is not None
+    entry, similarity = hit
+    assert entry.answer == "Retrieval" and similarity > 0.95
+    assert answer_cache.get_similar([0.7, 0.7, 0.0], "rrf", 1) is None
+    assert answer_cache.get_similar([0.99, 0.05, 0.0], "weighted", 1) is None
+    stats = answer_cache.get_stats()
+    assert stats["semantic_hits"] == 1 and stats["misses"] == 2
+
+
+def test_corpus_version_change_invalidates():
+    answer_cache = AnswerCache(max_entries=4, ttl_seconds=3600, similarity_threshold=0.95)
+    answer_cache.put("What is RAG?", "rrf", 1, "Old answer", 3, embedding=[1.0, 0.0])
+
+    assert answer_cache.get("What is RAG?", "rrf", 2) is None
+    assert answer_cache.get_similar([1.0, 0.0], "rrf", 2) is None
+    # An answer generated against the old corpus is not cached after the change
+    answer_cache.put("What is RAG?", "rrf", 1, "Stale answer", 3)
+    assert answer_cache.get("What is RAG?", "rrf", 2) is None
+
+    stats = answer_cache.get_stats()
+    assert stats["entries"] == 0 and stats["invalidations"] == 1
+
+
+def test_least_recently_used_is_evicted():
+    answer_cache = AnswerCache(max_entries=2, ttl_seconds=3600, similarity_threshold=0.95)
+    answer_cache.put("first", "", 1, "1", 1, embedding=[1.0, 0.0])
+    answer_cache.put("second", "", 1, "2", 1, embedding=[0.0, 1.0])
+    answer_cache.get("first", "", 1)
+
+    answer_cache.put("third", "", 1, "3", 1, embedding=[1.0, 1.0])
+
+    assert answer_cache.get("second", "", 1) is None
+    assert answer_cache.get("first", "", 1) is not None
+    assert answer_cache.get_stats()["evictions"] == 1
@@ -0,0 +1,39 @@
+import numpy as np
+
+from src.core.retrieval.diversity import mmr, near_duplicates
+
+BASE = (
+    "The quarterly report shows revenue grew by twelve percent while operating costs "
+    "stayed flat across all regions and the board approved a new dividend policy"
+)
+
+
+def test_near_duplicates_keep_the_best_ranked_copy():
+    texts = [
+        BASE,
+        "Completely unrelated text about hiking trails in the northern mountains near the lake",
+        BASE + " today",  # Near-identical to the first
+        BASE,  # Exact copy
+    ]
+
+    assert near_duplicates(texts, threshold=0.8) == [0, 1]
+    assert near_duplicates(texts, threshold=1.01) == [0, 1, 2, 3]
+
+
+def test_near_duplicates_of_short_lists():
+    assert near_duplicates([], threshold=0.8) == []
+    assert near_duplicates([BASE], threshold=0.8) == [0]
+
+
+def test_mmr_trades_relevance_for_diversity():
+    relevance = np.asarray([1.0, 0.95, 0.6])
+    vectors = np.asarray([[1.0, 0.0], [0.99, 0.1], [0.0, 1.0]])
+
+    assert mmr(relevance, vectors, k=3, lambda_mult=1.0) == [0, 1, 2]
+    # The second candidate nearly repeats the first, so the orthogonal one goes next
+    assert mmr(relevance, vectors, k=2, lambda_mult=0.5) == [0, 2]
+
+
+def test_mmr_bounds():
+    assert mmr(np.zeros(0), np.zeros((0, 2)), k=3, lambda_mult=0.5) == []
+    assert mmr(np.asarray([0.2, 0.9]), np.eye(2), k=5, lambda_mult=0.5) == [1, 0]
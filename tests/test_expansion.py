@@ -0,0 +1,37 @@
+from src.core.retrieval.expansion import MIN_OVERLAP_CHARS, join_chunks, neighbour_windows
+from src.core.retrieval.search import SearchHit
+
+
+def hit(document_id: str | None, chunk_index: int | None) -> SearchHit:
+    return SearchHit(f"{document_id}-{chunk_index}", "text", 1.0, document_id, chunk_index)
+
+
+def test_neighbour_windows_merge_overlapping_and_adjacent_spans():
+    hits = [hit("a", 10), hit("a", 1), hit("a", 4), hit("a", 20), hit("b", 0), hit(None, None)]
+
+    assert neighbour_windows(hits, window=1) == {
+        # 0-2 and 3-5 touch, so they join; 9-11 and 19-21 stay apart
+        "a": [(0, 5), (9, 11), (19, 21)],
+        "b": [(0, 1)],
+    }
+    assert neighbour_windows(hits, window=0) == {
+        "a": [(1, 1), (4, 4), (10, 10), (20, 20)],
+        "b": [(0, 0)],
+    }
+
+
+def test_join_chunks_drops_the_repeated_overlap():
+    overlap = "shared sentence that the splitter repeated."
+    left = "First part of the passage. " + overlap
+    right = overlap + " Second part of the passage."
+
+    assert join_chunks(left, right) == "First part of the passage. " + right
+
+
+def test_join_chunks_without_overlap():
+    # Shorter matches than MIN_OVERLAP_CHARS are coincidence, not splitter overlap
+    left = "Ends with the word " + "x" * (MIN_OVERLAP_CHARS - 1)
+    right = "x" * (MIN_OVERLAP_CHARS - 1) + " starts the next chunk"
+
+    assert join_chunks(left, right) == f"{left}\n{right}"
+    assert join_chunks("alpha", "beta") == "alpha\nbeta"
@@ -0,0 +1,45 @@
+from qdrant_client.models import FieldCondition, Filter, HasIdCondition, MatchAny
+
+from src.core.retrieval.filters import build_filter, restrict_to_documents, restrict_to_ids
+
+
+def conditions(query_filter: Filter) -> dict[str, list]:
+    return {condition.key: condition.match.any for condition in query_filter.must}  # type: ignore
+
+
+def test_no_filters():
+    assert build_filter(None) is None
+    assert build_filter({}) is None
+    assert build_filter({"filenames": [], "entities": []}) is None
+
+
+def test_filters_map_to_payload_fields():
+    query_filter = build_filter(
+        {
+            "document_ids": ["d1", "d2"],
+            "filenames": ["report.pdf"],
+            "file_types": ["PDF", ".docx", "txt"],
+            "entities": ["Acme Corp", "acme corp", "berlin"],
+            "keywords": ["Revenue"],
+        }
+    )
+
+    assert conditions(query_filter) == {
+        "document_id": ["d1", "d2"],
+        "filename": ["report.pdf"],
+        "file_extension": [".pdf", ".docx", ".txt"],
+        # Lowercased values first; the given casing still matches older chunks
+        "entities": ["acme corp", "berlin", "Acme Corp"],
+        "keywords": ["revenue", "Revenue"],
+    }
+
+
+def test_restrict_to_ids_and_documents():
+    query_filter = build_filter({"filenames": ["a.txt"]})
+
+    by_ids = restrict_to_ids(["p1", "p2"], query_filter)
+    assert by_ids.must == [HasIdCondition(has_id=["p1", "p2"]), query_filter]
+    assert restrict_to_ids(["p1"], None).must == [HasIdCondition(has_id=["p1"])]
+
+    by_documents = restrict_to_documents(["d1"], None)
+    assert by_documents.must == [FieldCondition(key="document_id", match=MatchAny(any=["d1"]))]
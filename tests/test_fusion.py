@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from src.core.retrieval.fusion_retriever import (
+    FusionRetriever,
+    reciprocal_ranks,
+    top_k,
+    zscore_normalize,
+)
+
+VECTOR_SCORES = [0.91, 0.85, 0.40, 0.77, 0.12, 0.66]
+BM25_SCORES = [2.0, 9.5, 0.0, 4.1, 7.3, 4.1]
+
+
+def test_reciprocal_ranks_follow_score_order():
+    ranks = reciprocal_ranks(np.asarray([0.2, 0.9, 0.5], dtype=np.float32), k=60)
+
+    assert ranks == pytest.approx([1 / 63, 1 / 61, 1 / 62])
+
+
+def test_zscore_normalize():
+    scaled = zscore_normalize(np.asarray([1.0, 2.0, 3.0], dtype=np.float32))
+
+    assert scaled.mean() == pytest.approx(0.0)
+    assert scaled.std() == pytest.approx(1.0)
+    assert zscore_normalize(np.full(3, 4.0, dtype=np.float32)).tolist() == [0.0, 0.0, 0.0]
+
+
+def test_top_k_matches_full_sort():
+    scores = np.random.default_rng(0).random(50).astype(np.float32)
+    full = top_k(scores, None)
+
+    assert [index for index, _ in full] == np.argsort(-scores, kind="stable").tolist()
+    for k in (1, 5, 49, 50, 80):
+        assert top_k(scores, k) == full[:k]
+
+
+@pytest.mark.parametrize("method", ["rrf", "zscore", "weighted"])
+def test_fuse_results_top_k_is_prefix_of_full_ranking(method):
+    retriever = FusionRetriever(alpha=0.6, method=method, rrf_k=60)
+    documents = [f"doc {i}" for i in range(len(VECTOR_SCORES))]
+
+    full = retriever.fuse_results(documents, VECTOR_SCORES, "query", bm25_scores=BM25_SCORES)
+    best = retriever.fuse_results(documents, VECTOR_SCORES, "query", bm25_scores=BM25_SCORES, k=3)
+
+    assert sorted(index for index, _ in full) == list(range(len(documents)))
+    assert [score for _, score in full] == sorted((score for _, score in full), reverse=True)
+    assert best == full[:3]
+
+
+def test_rrf_fusion_scores():
+    retriever = FusionRetriever(alpha=0.5, method="rrf", rrf_k=60)
+
+    fused = retriever.fuse_scores(
+        np.asarray(VECTOR_SCORES, dtype=np.float32),
+        np.asarray(BM25_SCORES, dtype=np.float32),
+        "rrf",
+    )
+
+    # Doc 1: vector rank 2, BM25 rank 1; doc 0: vector rank 1, BM25 rank 5
+    assert fused[1] == pytest.approx(0.5 / 62 + 0.5 / 61)
+    assert fused[0] == pytest.approx(0.5 / 61 + 0.5 / 65)
+    assert int(np.argmax(fused)) == 1
+
+
+def test_fuse_rankings():
+    retriever = FusionRetriever(rrf_k=60)
+
+    fused = retriever.fuse_rankings([["a", "b", "c"], ["b", "d"], ["b", "a"]], k=2)
+
+    assert [point_id for point_id, _ in fused] == ["b", "a"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 2 / 61)
@@ -0,0 +1,46 @@
+from src.core.document_processing.incremental import (
+    ChunkDiff,
+    chunk_hash,
+    document_id_for,
+    point_id_for,
+)
+
+
+def stored_chunks(document_id: str, texts: list[str]) -> dict[str, tuple[str, int]]:
+    return {
+        chunk_hash(text): (point_id_for(document_id, chunk_hash(text)), index)
+        for index, text in enumerate(texts)
+    }
+
+
+def test_chunk_diff_classifies_chunks():
+    document_id = document_id_for("report.pdf")
+    stored = stored_chunks(document_id, ["intro", "methods", "results", "appendix"])
+    diff = ChunkDiff(document_id, stored)
+
+    # New version: "methods" dropped, "discussion" inserted, "intro" repeated
+    indices = [diff.add(text) for text in ["intro", "results", "discussion", "intro", "appendix"]]
+
+    assert indices == [None, None, 2, None, None]
+    assert diff.chunk_count == 4
+    assert diff.added == 1
+    assert diff.kept == [stored[chunk_hash(t)][0] for t in ["intro", "results", "appendix"]]
+    assert diff.moved == {stored[chunk_hash("results")][0]: 1}
+    assert diff.removed == [stored[chunk_hash("methods")][0]]
+
+
+def test_chunk_diff_of_new_document():
+    diff = ChunkDiff(document_id_for("new.txt"), {})
+
+    assert [diff.add(text) for text in ["a", "b", "a", "c"]] == [0, 1, None, 2]
+    assert diff.added == 3
+    assert diff.kept == [] and diff.removed == []
+
+
+def test_ids_are_stable_per_document_key():
+    assert document_id_for("report.pdf") == document_id_for("report.pdf")
+    assert document_id_for("report.pdf") != document_id_for("other.pdf")
+    text_hash = chunk_hash("same text")
+    assert point_id_for(document_id_for("a"), text_hash) != point_id_for(
+        document_id_for("b"), text_hash
+    )
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from src.core.retrieval.inverted_index import InvertedIndex
+
+VOCABULARY = [f"term{i}" for i in range(40)]
+QUERIES = [["term1"], ["term2", "term7"], ["term3", "term3", "term11"], ["term0", "term39"]]
+
+
+def make_chunks(count: int, seed: int) -> dict[str, list[str]]:
+    rng = random.Random(seed)
+    return {f"p{seed}-{i}": rng.choices(VOCABULARY, k=rng.randint(5, 30)) for i in range(count)}
+
+
+def assert_same_scores(index: InvertedIndex, reference: InvertedIndex, point_ids: list[str]):
+    assert index.doc_count == reference.doc_count
+    for query in QUERIES:
+        assert index.score(query, point_ids) == pytest.approx(reference.score(query, point_ids))
+        hits = dict(index.search(query, k=10))
+        expected = dict(reference.search(query, k=10))
+        assert sorted(hits.values()) == pytest.approx(sorted(expected.values()))
+
+
+def test_incremental_updates_score_like_a_rebuild(tmp_path):
+    index = InvertedIndex(str(tmp_path / "incremental"), max_segments=3)
+    chunks: dict[str, list[str]] = {}
+    for seed in range(8):
+        batch = make_chunks(20, seed)
+        index.add(list(batch), list(batch.values()))
+        chunks.update(batch)
+
+    # Deletes and re-adds of existing IDs across segments
+    deleted = [f"p{seed}-{i}" for seed in (1, 4) for i in range(0, 20, 3)]
+    assert index.delete(deleted) == len(deleted)
+    for point_id in deleted:
+        del chunks[point_id]
+    replaced = {f"p2-{i}": ["term1", "term2", "term2"] for i in range(5)}
+    index.add(list(replaced), list(replaced.values()))
+    chunks.update(replaced)
+
+    assert len(index._segments) <= 3
+    reference = InvertedIndex(str(tmp_path / "rebuilt"))
+    reference.rebuild([(list(chunks), list(chunks.values()))])
+
+    point_ids = [*chunks, *deleted]
+    assert_same_scores(index, reference, point_ids)
+    assert index.score(["term1"], deleted) == [0.0] * len(deleted)
+
+    # Tombstones and segments survive a reload
+    reloaded = InvertedIndex(str(tmp_path / "incremental"), max_segments=3)
+    assert_same_scores(reloaded, reference, point_ids)
+
+
+def test_clear_removes_the_index(tmp_path):
+    index = InvertedIndex(str(tmp_path / "bm25"))
+    batch = make_chunks(5, 0)
+    index.add(list(batch), list(batch.values()))
+    assert index.exists
+
+    index.clear()
+
+    assert not index.exists
+    assert InvertedIndex(str(tmp_path / "bm25")).doc_count == 0
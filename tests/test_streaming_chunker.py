@@ -0,0 +1,44 @@
+import re
+
+from src.core.document_processing.document_processor import (
+    MIN_CHUNK_CHARS,
+    DocumentProcessor,
+    StreamingChunker,
+)
+
+
+def make_pages(count: int) -> list[str]:
+    words = ["alpha", "beta", "gamma", "delta", "eta", "theta", "iota", "kappa"]
+    pages = []
+    for page in range(count):
+        lines = [
+            " ".join(words[(page + line + i) % len(words)] for i in range(12)) + "."
+            for line in range(40)
+        ]
+        pages.append("\n".join(lines) + f" ENDPAGE{page}\n")
+    return pages
+
+
+def stream_chunks(pages: list[str], buffer_chars: int) -> list[str]:
+    chunker = StreamingChunker(DocumentProcessor._make_splitter(), buffer_chars)
+    chunks = [chunk for page in pages for chunk in chunker.feed(page)]
+    chunks.extend(chunker.flush())
+    return [chunk for chunk in chunks if len(chunk.strip()) >= MIN_CHUNK_CHARS]
+
+
+def test_streaming_matches_one_shot_split():
+    pages = make_pages(20)
+    # _chunk_text uses no instance state
+    processor = DocumentProcessor.__new__(DocumentProcessor)
+    expected = processor._chunk_text("".join(pages))
+
+    for buffer_chars in (1000, 4000, 20000):
+        assert stream_chunks(pages, buffer_chars) == expected
+
+
+def test_page_boundaries_keep_whitespace():
+    chunks = stream_chunks(make_pages(20), 4000)
+
+    markers = [word for chunk in chunks for word in chunk.split() if "ENDPAGE" in word]
+    assert markers
+    assert all(re.fullmatch(r"ENDPAGE\d+", word) for word in markers)
@@ -1,3 +1,5 @@
+import time
+
 import requests
 import streamlit as st
 
@@ -22,6 +24,27 @@ def upload_file(uploaded_file):
         return None
 
 
+def wait_for_job(job_id: str, status_text, poll_interval: float = 1.0):
+    while True:
+        try:
+            response = requests.get(f"{settings.API_URL}/api/jobs/{job_id}", timeout=10)
+            response.raise_for_status()
+            job = response.json()
+        except requests.exceptions.RequestException as e:
+            st.error(f"Failed to fetch job status: {e}")
+            return None
+
+        if job["status"] in ("completed", "failed"):
+            return job
+
+        progress = job["progress"]
+        status_text.text(
+            f"{job['stage']}: {progress.get('chunks_embedded', 0)}"
+            f"/{progress.get('chunks_total', '?')} chunks embedded"
+        )
+        time.sleep(poll_interval)
+
+
 def query_documents(question: str):
     try:
         response = requests.post(
@@ -54,11 +77,15 @@ def main():
 
         if uploaded_file and st.button("Upload"):
             with st.spinner("Processing..."):
-                result = upload_file(uploaded_file)
-                if result:
+                accepted = upload_file(uploaded_file)
+                job = wait_for_job(accepted["job_id"], st.empty()) if accepted else None
+                if job and job["status"] == "completed":
+                    result = job["results"][0]
                     st.success(
                         f"Uploaded {result['filename']} - {result['chunks_created']} chunks created"
                     )
+                elif job:
+                    st.error(f"Processing failed: {job['error']}")
 
         st.divider()
         st.subheader("Configuration")